@@ -1,40 +1,379 @@
 import argparse
 import sys
-from app.core.google import GoogleManager
-from app.core.ytdlp import YTDLPManager
-from app.core.videos import VideoManager
 from app.utils.logger import setup_logging
 
-logger = setup_logging(name="yt_manager_cli")
+# Commands import what they need when they run: the API client, yt-dlp wrapper and
+# download machinery are only loaded by the commands that use them, which keeps this
+# package's share of `add`, `queue` and `status` (imports and work) near 50 ms. The rest
+# of their run time is interpreter startup.
+
+# Separate files from the GUI's app.log. The daemon is the one long-running CLI process
+# and rotates its own daemon.log; every other command, the yt-dlp --exec callback
+# included, can run several at once, so they share cli.log and only append to it
+_DAEMON = sys.argv[1:2] == ['daemon']
+logger = setup_logging(name="yt_manager_cli", log_file="daemon.log" if _DAEMON else "cli.log", rotate=_DAEMON)
 
 def handle_downloaded(video_id: str, file_path: str):
     """Handles the download completion callback."""
+    from app.core.google import GoogleManager
+    from app.core.ytdlp import YTDLPManager
+    from app.core.videos import VideoManager
+
     # Instantiate managers
     google = GoogleManager()
     ytdlp = YTDLPManager()
     vm = VideoManager(google, ytdlp)
-    
+
     # Delegate to VideoManager
     vm.mark_download_complete(video_id, file_path)
 
+def _subscription_manager():
+    from app.db import video as db
+    from app.db import subscription as sub_db
+    from app.core.google import GoogleManager
+    from app.core.ytdlp import YTDLPManager
+    from app.core.videos import VideoManager
+    from app.core.subscriptions import SubscriptionManager
+
+    db.init_db()
+    sub_db.init_db()
+    google = GoogleManager()
+    ytdlp = YTDLPManager()
+    vm = VideoManager(google, ytdlp)
+    return SubscriptionManager(google, ytdlp, vm)
+
+def handle_subscribe(url: str):
+    """Registers a channel or playlist subscription and polls it immediately."""
+    sm = _subscription_manager()
+    if sm.add_subscription(url) is None:
+        sys.exit(1)
+
+def handle_poll():
+    """Polls every active subscription once."""
+    sm = _subscription_manager()
+    count = sm.poll_all()
+    logger.info("Queued %s new video(s) from subscriptions", count)
+
+def handle_add(inputs: list):
+    """Queues videos for download. Metadata and the download itself are left to the daemon."""
+    from app.core import heartbeat, urls
+    from app.db import video as db
+    from app.utils import metrics
+
+    video_ids = []
+    for text in inputs:
+        found = urls.extract_video_ids(text) or [urls.extract_video_id(text)]
+        if not found[0]:
+            logger.error("Could not extract video ID from: %s", text)
+            continue
+        video_ids.extend(found)
+    if not video_ids:
+        sys.exit(1)
+
+    db.init_db()
+    entries = [(urls.canonical_url(video_id), video_id) for video_id in dict.fromkeys(video_ids)]
+    queued = db.add_videos_bulk(entries, status='open', download_needed='yes')
+    # As VideoManager.add_videos_bulk records them; the metadata fetch is the daemon's
+    for db_id, _, outcome in queued:
+        metrics.record("video_reopened" if outcome == db.REOPENED else "video_added", video_id=db_id)
+    reopened = sum(outcome == db.REOPENED for _, _, outcome in queued)
+    print(f"Queued {len(queued)} video(s) ({reopened} reopened), {len(entries) - len(queued)} already known")
+    if heartbeat.read() is None:
+        print("Daemon not running; downloads start with `daemon` or the GUI")
+
+def handle_queue(limit: int):
+    """Lists downloads in progress and waiting, oldest first."""
+    from app.db import video as db
+
+    for value in ('downloading', 'yes'):
+        for video in db.get_videos_by_download_needed(value, limit=limit, columns=('id', 'video_id', 'title')):
+            state = 'active' if value == 'downloading' else 'queued'
+            print(f"{video.id:>6}  {state:<7} {video.video_id or '':<12} {video.title or ''}")
+
+def handle_status():
+    """Prints video counts per status and whether the daemon is alive."""
+    import collections
+    from app.db import video as db
+    from app.core import heartbeat
+    from app.core.tunables import tunables
+
+    db.init_db()
+    histogram = db.get_status_histogram()
+    counts = collections.Counter()
+    for (status, _), count in histogram.items():
+        counts[status] += count
+    for status, count in sorted(counts.items(), key=lambda item: str(item[0])):
+        print(f"{status or '-':<10} {count:>6}")
+    print(f"{'queued':<10} {db.status_counts.count(download_needed='yes', counts=histogram):>6}")
+    print(f"{'active':<10} {db.status_counts.count(download_needed='downloading', counts=histogram):>6}")
+    print(f"{'history':<10} {db.count_history_videos():>6}")
+
+    beat = heartbeat.read()
+    if beat is None:
+        print("daemon: not running")
+    elif not heartbeat.responding(beat[0], beat[1] or tunables.get('daemon_interval')):
+        print(f"daemon: not responding (last sweep {beat[0]:.0f}s ago)")
+    else:
+        print(f"daemon: running (last sweep {beat[0]:.0f}s ago)")
+
+def handle_archive(video_ids: list):
+    """Moves downloaded videos to the archive directory."""
+    from app.core.google import GoogleManager
+    from app.core.ytdlp import YTDLPManager
+    from app.core.videos import VideoManager
+
+    vm = VideoManager(GoogleManager(), YTDLPManager())
+    for video_id in video_ids:
+        vm.archive_video(video_id)
+
+def handle_retry(video_ids: list):
+    """Re-queues errored videos; all of them when no ids are given."""
+    from app.db import video as db
+
+    count = db.retry_videos(video_ids)
+    print(f"Re-queued {count} video(s)")
+
+def handle_history(query: str, limit: int):
+    """Lists closed/archived videos moved to history that match query."""
+    from app.db import video as db
+
+    db.init_db()
+    for video in db.search_history(query, limit, columns=('id', 'video_id', 'status', 'title')):
+        print(f"{video.id:>6}  {video.status:<7} {video.video_id or '':<12} {video.title or ''}")
+
+def handle_compact(days: int):
+    """Moves old closed/archived rows to history now, then vacuums and analyzes the DB.
+    days <= 0 (history_after_days 0 means never) moves nothing."""
+    from app.db import video as db
+
+    db.init_db()
+    size = db.DB_PATH.stat().st_size
+    moved = 0
+    if days <= 0:
+        print("History compaction disabled (days is 0); pass --days N to move rows")
+    else:
+        moved = db.compact_videos(days)
+    db.vacuum_and_analyze()
+    print(f"Moved {moved} video(s) to history; DB {size / 1024 ** 2:.1f} -> "
+          f"{db.DB_PATH.stat().st_size / 1024 ** 2:.1f} MiB")
+
+def handle_export(path: str, fmt: str):
+    """Writes the whole library, history included, to a JSON Lines or CSV file."""
+    from app.core import transfer
+    from app.db import video as db
+
+    db.init_db()
+    count = transfer.export_videos(path, fmt)
+    print(f"Exported {count} video(s) to {path}")
+
+def handle_import(path: str, fmt: str, replace: bool):
+    """Loads an export; videos already in the library are skipped unless replace."""
+    from app.core import transfer
+    from app.db import video as db
+
+    db.init_db()
+    written, read = transfer.import_videos(path, fmt, replace)
+    print(f"Imported {written} of {read} video(s)" + ("" if replace else f", {read - written} already known"))
+
+def handle_config(name: str, value: str, reset: bool):
+    """Lists the runtime settings, or changes one; running processes pick it up within
+    TUNABLES_POLL_SECONDS."""
+    from app.db import tunables as tunables_db
+    from app.core.tunables import tunables
+
+    tunables_db.init_db()
+    try:
+        if reset:
+            tunables.reset(name)
+        elif value is not None:
+            tunables.set(name, value)
+    except KeyError:
+        logger.error("Unknown setting: %s (see `config`)", name)
+        sys.exit(1)
+    except ValueError as e:
+        logger.error("Invalid value for %s", e)
+        sys.exit(1)
+
+    for tunable, current, overridden in tunables.describe():
+        if name and tunable.name != name:
+            continue
+        marker = '*' if overridden else ' '
+        print(f"{tunable.name:<28} {marker} {current!s:<12} {tunable.help}")
+        if overridden:
+            print(f"{'':<30} default: {tunable.default}")
+
+def handle_stats(days: int):
+    """Prints per-stage latency and error rates, then throughput per day."""
+    import datetime
+    from app.db import metrics as metrics_db
+    from app.settings import METRICS_RAW_DAYS
+
+    metrics_db.init_db()
+    metrics_db.rollup(METRICS_RAW_DAYS)
+
+    # Stage latencies from raw samples (kept for METRICS_RAW_DAYS)
+    window = min(days, METRICS_RAW_DAYS)
+    since = datetime.datetime.now() - datetime.timedelta(days=window)
+    samples = metrics_db.get_samples_since(since)
+    stages = {}
+    for sample in samples:
+        stages.setdefault(sample['stage'], []).append(sample)
+
+    print(f"Stages, last {window} day(s):")
+    print(f"{'stage':<28} {'count':>7} {'err%':>6} {'p50 ms':>9} {'p95 ms':>9} {'avg ms':>9}")
+    for stage, rows in sorted(stages.items()):
+        durations = sorted(r['duration_ms'] for r in rows if r['duration_ms'] is not None)
+        errors = sum(1 for r in rows if not r['ok'])
+        if durations:
+            p50 = f"{metrics_db.percentile(durations, 50):.1f}"
+            p95 = f"{metrics_db.percentile(durations, 95):.1f}"
+            avg = f"{sum(durations) / len(durations):.1f}"
+        else:
+            p50 = p95 = avg = "-"
+        print(f"{stage:<28} {len(rows):>7} {100 * errors / len(rows):>6.1f} {p50:>9} {p95:>9} {avg:>9}")
+
+    # Throughput per day: finished days from the rollups, today from raw samples
+    today = datetime.date.today()
+    first_day = (today - datetime.timedelta(days=days - 1)).isoformat()
+    per_day = {}
+    for row in metrics_db.get_daily(first_day):
+        per_day.setdefault(row['day'], {})[row['stage']] = (row['count'], row['errors'], row['bytes'])
+    for sample in metrics_db.get_samples_since(datetime.datetime.combine(today, datetime.time())):
+        count, errors, size = per_day.setdefault(today.isoformat(), {}).get(sample['stage'], (0, 0, 0))
+        per_day[today.isoformat()][sample['stage']] = (
+            count + 1, errors + (0 if sample['ok'] else 1), size + (sample['bytes'] or 0)
+        )
+
+    print("\nThroughput per day:")
+    print(f"{'day':<12} {'added':>7} {'downloads':>10} {'failed':>7} {'GiB':>8}")
+    for day, day_stages in sorted(per_day.items()):
+        added = day_stages.get('video_added', (0, 0, 0))[0]
+        count, errors, size = day_stages.get('download', (0, 0, 0))
+        print(f"{day:<12} {added:>7} {count - errors:>10} {errors:>7} {size / 1024 ** 3:>8.2f}")
+
+def handle_daemon(interval: int, profile: str):
+    """Runs the headless daemon in the foreground until interrupted."""
+    from app.utils.profiling import profiler
+
+    # Before the daemon's imports, so a startup profile includes them
+    profiler.start(profile)
+    with profiler.profiled("startup"):
+        from app.core.daemon import Daemon
+        daemon = Daemon(interval)
+    daemon.run()
+
+def _load_settings():
+    """Applies the runtime setting overrides (`config`), so commands use them too, e.g.
+    `archive` moves files to the archive_dir set there."""
+    from app.core.tunables import tunables
+
+    tunables.load()
+
 def main():
     parser = argparse.ArgumentParser(description="YT Manager CLI")
-    
+
     # Command flag
     parser.add_argument('--downloaded', action='store_true', help="Flag to indicate a download completion callback")
-    
+    parser.add_argument('--subscribe', type=str, metavar='URL', help="Subscribe to a channel or playlist URL")
+    parser.add_argument('--poll', action='store_true', help="Poll all subscriptions for new videos")
+
     # Parameters
     parser.add_argument('--videoid', type=str, help="The YouTube Video ID")
     parser.add_argument('--file_path', type=str, help="The downloaded file path")
 
+    # Subcommands
+    subparsers = parser.add_subparsers(dest='command')
+
+    add_parser = subparsers.add_parser('add', help="Queue videos by URL or ID")
+    add_parser.add_argument('inputs', nargs='+', metavar='URL')
+
+    queue_parser = subparsers.add_parser('queue', help="List active and queued downloads")
+    queue_parser.add_argument('--limit', type=int, default=50, help="Max rows per state (default: 50)")
+
+    subparsers.add_parser('status', help="Show video counts and daemon state")
+
+    archive_parser = subparsers.add_parser('archive', help="Archive downloaded videos")
+    archive_parser.add_argument('ids', nargs='+', type=int, metavar='ID', help="Row ids, as shown by `queue`")
+
+    retry_parser = subparsers.add_parser('retry', help="Re-queue videos in error")
+    retry_parser.add_argument('ids', nargs='*', type=int, metavar='ID', help="Row ids (default: all errored)")
+
+    history_parser = subparsers.add_parser('history', help="Search closed/archived videos moved to history")
+    history_parser.add_argument('query', nargs='?', default='', help="Words in the title or channel")
+    history_parser.add_argument('--limit', type=int, default=50, help="Max rows (default: 50)")
+
+    compact_parser = subparsers.add_parser('compact', help="Move old closed/archived videos to history now")
+    compact_parser.add_argument('--days', type=int, default=None,
+                                help="Unchanged for at least this many days, 1 or more "
+                                     "(default: the history_after_days setting; 0 there means never)")
+
+    export_parser = subparsers.add_parser('export', help="Back up the video library to JSON Lines or CSV")
+    export_parser.add_argument('path', help="Output file; a name ending in .gz is compressed")
+    export_parser.add_argument('--format', choices=('jsonl', 'csv'), default=None,
+                               help="Default: from the file extension, else jsonl")
+
+    import_parser = subparsers.add_parser('import', help="Load videos from an `export` file")
+    import_parser.add_argument('path', help="Input file; a name ending in .gz is decompressed")
+    import_parser.add_argument('--format', choices=('jsonl', 'csv'), default=None,
+                               help="Default: from the file extension, else jsonl")
+    import_parser.add_argument('--replace', action='store_true',
+                               help="Overwrite videos already in the library instead of skipping them")
+
+    config_parser = subparsers.add_parser('config', help="Show or change runtime settings (* = changed)")
+    config_parser.add_argument('name', nargs='?', default=None, help="Setting to show or change")
+    config_parser.add_argument('value', nargs='?', default=None, help="New value")
+    config_parser.add_argument('--reset', action='store_true', help="Go back to the default")
+
+    stats_parser = subparsers.add_parser('stats', help="Show per-stage latency, error rates and throughput")
+    stats_parser.add_argument('--days', type=int, default=7, help="Days to report (default: 7)")
+
+    daemon_parser = subparsers.add_parser('daemon', help="Run downloads, metadata and subscriptions headless")
+    daemon_parser.add_argument('--interval', type=int, default=None,
+                               help="Seconds between sweeps (default: the daemon_interval setting)")
+    daemon_parser.add_argument('--profile', metavar='TARGETS', default=None,
+                               help="Profile startup,refresh,memory,sample or all (default: $PROFILE)")
+
     args = parser.parse_args()
+    _load_settings()
 
     if args.downloaded:
         if not args.videoid or not args.file_path:
             logger.error("--videoid and --file_path are required with --downloaded")
             sys.exit(1)
-            
+
         handle_downloaded(args.videoid, args.file_path)
+    elif args.subscribe:
+        handle_subscribe(args.subscribe)
+    elif args.poll:
+        handle_poll()
+    elif args.command == 'add':
+        handle_add(args.inputs)
+    elif args.command == 'queue':
+        handle_queue(args.limit)
+    elif args.command == 'status':
+        handle_status()
+    elif args.command == 'archive':
+        handle_archive(args.ids)
+    elif args.command == 'retry':
+        handle_retry(args.ids)
+    elif args.command == 'history':
+        handle_history(args.query, args.limit)
+    elif args.command == 'compact':
+        from app.core.tunables import tunables
+        handle_compact(args.days if args.days is not None else tunables.get('history_after_days'))
+    elif args.command == 'export':
+        handle_export(args.path, args.format)
+    elif args.command == 'import':
+        handle_import(args.path, args.format, args.replace)
+    elif args.command == 'config':
+        if args.reset and (not args.name or args.value is not None):
+            parser.error("--reset takes a setting name and no value")
+        handle_config(args.name, args.value, args.reset)
+    elif args.command == 'stats':
+        handle_stats(args.days)
+    elif args.command == 'daemon':
+        from app.settings import PROFILE
+        handle_daemon(args.interval, args.profile if args.profile is not None else PROFILE)
     else:
         parser.print_help()
 
@@ -0,0 +1,405 @@
+import asyncio
+import json
+import os
+import secrets
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+from app.db import video as db
+from app.core import events, urls
+from app.core.progress import tracker
+from app.settings import API_HOST, API_ORIGINS, API_PORT, API_TOKEN, API_TOKEN_FILE
+from app.utils.logger import setup_logging
+from app.utils import metrics
+
+logger = setup_logging()
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+def api_token() -> str:
+    """API_TOKEN, or the token in API_TOKEN_FILE, generated there (readable by the user
+    only) the first time. The GUI and the daemon share it through the file."""
+    if API_TOKEN:
+        return API_TOKEN
+    try:
+        token = API_TOKEN_FILE.read_text().strip()
+        if token:
+            return token
+    except FileNotFoundError:
+        pass
+    token = secrets.token_urlsafe(24)
+    API_TOKEN_FILE.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(API_TOKEN_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        f.write(token)
+    logger.info("Generated an API token in %s", API_TOKEN_FILE)
+    return token
+
+REASONS = {200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request", 401: "Unauthorized",
+           404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+class ApiServer:
+    """Local HTTP/JSON API for scripts and the browser bookmarklet.
+
+        POST /videos        {"url": "..."}           queue one video (any URL or ID text)
+        POST /videos/batch  {"urls": ["...", ...]}   queue many in one transaction
+        GET  /videos        ?q=&sort=&desc=&limit=&after_key=&after_id=   active videos, keyset-paged
+        GET  /status        counts per status and download slots
+        GET  /events        server-sent events from the pipeline event bus
+
+    The asyncio loop runs on its own thread. DB reads run on the loop's default executor.
+    Adds are group-committed: one writer task takes every add request waiting at that
+    moment and inserts them in a single transaction on a dedicated thread, so concurrent
+    clients neither contend for the SQLite write lock nor pay one commit each.
+    Requests must send the token (api_token() unless one is given; "" turns the check
+    off) as a Bearer token or ?token=. CORS is granted to API_ORIGINS only, so other
+    web pages open in the browser can neither call it nor read its answers."""
+
+    MAX_BODY = 1024 * 1024
+    MAX_BATCH = 1000
+    MAX_GROUP = 5000  # Video IDs per group commit
+    SSE_QUEUE_SIZE = 256  # Events buffered per slow client before it is dropped
+    SSE_KEEPALIVE = 15.0
+
+    def __init__(self, video_manager, host: str = API_HOST, port: int = API_PORT,
+                 token: Optional[str] = None, origins: Tuple[str, ...] = API_ORIGINS):
+        self.video_manager = video_manager
+        self.host = host
+        self.port = port
+        self.token = api_token() if token is None else token
+        self.origins = origins
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.thread = None
+        self.ready = threading.Event()
+        self.writer_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="api-write")
+        self.add_queue: Optional[asyncio.Queue] = None
+        self.error: Optional[Exception] = None
+
+    def start(self) -> bool:
+        """Starts serving in the background. Returns False if the port could not be bound."""
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self.ready.wait(timeout=5)
+        if self.error:
+            logger.warning("API server not started on %s:%s: %s", self.host, self.port, self.error)
+            return False
+        logger.info("API server listening on http://%s:%s", self.host, self.port)
+        return True
+
+    def stop(self):
+        if self.loop and self.server and self.loop.is_running():
+            future = asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop)
+            try:
+                future.result(timeout=5)
+            except Exception as e:
+                logger.warning("API server shutdown: %s", e)
+        if self.thread:
+            self.thread.join(timeout=5)
+        self.writer_pool.shutdown(wait=False)
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.server = self.loop.run_until_complete(
+                asyncio.start_server(self._handle_connection, self.host, self.port)
+            )
+            # Port 0 picks a free port; report the real one
+            self.port = self.server.sockets[0].getsockname()[1]
+        except OSError as e:
+            self.error = e
+            self.ready.set()
+            self.loop.close()
+            return
+
+        self.add_queue = asyncio.Queue()
+        self.loop.create_task(self._write_adds())
+        self.ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+    async def _shutdown(self):
+        """Closes the listener and open connections (SSE streams), then stops the loop."""
+        self.server.close()
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.loop.call_soon(self.loop.stop)
+
+    # ----------------------------------------------------------------
+    # HTTP plumbing
+    # ----------------------------------------------------------------
+
+    ROUTES = ("/videos", "/videos/batch", "/status")
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        start = None
+        stage = "api.other"
+        ok = True
+        cors = ""
+        try:
+            method, path, query, headers, body = await self._read_request(reader)
+            start = time.perf_counter()
+            cors = self._cors_headers(headers.get("origin"))
+            if path in self.ROUTES:
+                stage = f"api.{method} {path}"
+            if method == "OPTIONS":
+                await self._send(writer, 204, None, cors)
+                return
+            self._check_token(headers, query)
+
+            if method == "GET" and path == "/events":
+                start = None  # A stream's lifetime is not a latency
+                await self._stream_events(writer, cors)
+                return
+
+            status, payload = await self._dispatch(method, path, query, body)
+            await self._send(writer, status, payload, cors)
+        except HttpError as e:
+            await self._send(writer, e.status, {"error": str(e)}, cors)
+        except (asyncio.IncompleteReadError, asyncio.CancelledError, ConnectionError):
+            # Client went away, or the server is shutting down
+            pass
+        except Exception as e:
+            ok = False
+            logger.error("API request failed: %s", e)
+            await self._send(writer, 500, {"error": str(e)}, cors)
+        finally:
+            writer.close()
+            if start is not None:
+                metrics.record(stage, (time.perf_counter() - start) * 1000, ok=ok)
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        parts = request_line.split()
+        if len(parts) != 3:
+            raise HttpError(400, "Malformed request line")
+        method, target, _ = parts
+
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1")
+            if line in ("\r\n", "\n", ""):
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise HttpError(400, "Malformed Content-Length")
+        if length < 0:
+            raise HttpError(400, "Malformed Content-Length")
+        if length > self.MAX_BODY:
+            raise HttpError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+
+        url = urllib.parse.urlsplit(target)
+        query = dict(urllib.parse.parse_qsl(url.query, keep_blank_values=True))
+        return method.upper(), url.path.rstrip("/") or "/", query, headers, body
+
+    def _check_token(self, headers: dict, query: dict):
+        if not self.token:
+            return
+        if headers.get("authorization") == f"Bearer {self.token}" or query.get("token") == self.token:
+            return
+        raise HttpError(401, "Missing or invalid token")
+
+    def _cors_headers(self, origin: Optional[str]) -> str:
+        # The bookmarklet calls us from youtube.com pages; any other page gets no CORS
+        # headers, so the browser keeps the response from it
+        if origin not in self.origins:
+            return "Vary: Origin\r\n"
+        return (
+            f"Access-Control-Allow-Origin: {origin}\r\n"
+            "Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n"
+            "Access-Control-Allow-Headers: Content-Type, Authorization\r\n"
+            "Vary: Origin\r\n"
+        )
+
+    async def _send(self, writer: asyncio.StreamWriter, status: int, payload, cors: str = ""):
+        body = b"" if payload is None else json.dumps(payload, default=str).encode()
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"{cors}"
+            "Connection: close\r\n\r\n"
+        )
+        try:
+            writer.write(head.encode() + body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    # ----------------------------------------------------------------
+    # Endpoints
+    # ----------------------------------------------------------------
+
+    async def _dispatch(self, method: str, path: str, query: dict, body: bytes) -> Tuple[int, dict]:
+        routes = {
+            ("POST", "/videos"): self._post_video,
+            ("POST", "/videos/batch"): self._post_batch,
+            ("GET", "/videos"): self._get_videos,
+            ("GET", "/status"): self._get_status,
+        }
+        handler = routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in routes):
+                raise HttpError(405, f"{method} not allowed on {path}")
+            raise HttpError(404, f"No route for {path}")
+        return await handler(query, body)
+
+    async def _post_video(self, query: dict, body: bytes):
+        url = self._json(body).get("url")
+        if not isinstance(url, str):
+            raise HttpError(400, "Expected {\"url\": \"...\"}")
+        return await self._add([url])
+
+    async def _post_batch(self, query: dict, body: bytes):
+        items = self._json(body).get("urls")
+        if not isinstance(items, list) or not all(isinstance(u, str) for u in items):
+            raise HttpError(400, "Expected {\"urls\": [\"...\", ...]}")
+        if len(items) > self.MAX_BATCH:
+            raise HttpError(413, f"At most {self.MAX_BATCH} URLs per batch")
+        return await self._add(items)
+
+    async def _add(self, texts: list):
+        video_ids = []
+        for text in texts:
+            video_ids.extend(urls.extract_video_ids(text) or [v for v in [urls.extract_video_id(text)] if v])
+        video_ids = list(dict.fromkeys(video_ids))
+        if not video_ids:
+            raise HttpError(400, "No YouTube video IDs found")
+
+        future = asyncio.get_running_loop().create_future()
+        await self.add_queue.put((video_ids, future))
+        queued = await future
+        return 201, {"queued": len(queued), "known": len(video_ids) - len(queued), "video_ids": video_ids}
+
+    async def _write_adds(self):
+        """Writer task: inserts everything queued by _add since the last commit in one go,
+        then tells each request which of its IDs were new."""
+        loop = asyncio.get_running_loop()
+        while True:
+            group = [await self.add_queue.get()]
+            size = len(group[0][0])
+            while not self.add_queue.empty() and size < self.MAX_GROUP:
+                group.append(self.add_queue.get_nowait())
+                size += len(group[-1][0])
+
+            video_ids = list(dict.fromkeys(v for ids, _ in group for v in ids))
+            try:
+                new_ids = await loop.run_in_executor(self.writer_pool, self._insert, video_ids)
+            except Exception as e:
+                for _, future in group:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            # An ID sent by two requests in the same group counts as new for the first one
+            claimed = set()
+            for ids, future in group:
+                mine = [v for v in ids if v in new_ids and v not in claimed]
+                claimed.update(mine)
+                if not future.done():
+                    future.set_result(mine)
+
+    def _insert(self, video_ids: list) -> set:
+        # Runs on the writer thread, the only API thread that writes
+        # Closed or failed ones are not known here: the add reopens them
+        known = db.get_existing_youtube_ids(video_ids, reopenable=False)
+        new_ids = [v for v in video_ids if v not in known]
+        if new_ids:
+            self.video_manager.add_videos_bulk([(urls.canonical_url(v), v) for v in new_ids])
+        return set(new_ids)
+
+    async def _get_videos(self, query: dict, body: bytes):
+        sort = query.get("sort", "create_dt")
+        if sort not in db.SORT_KEYS:
+            raise HttpError(400, f"sort must be one of {', '.join(db.SORT_KEYS)}")
+        try:
+            limit = max(1, min(int(query.get("limit", 100)), 500))
+            after = None
+            if "after_id" in query:
+                after = (db.parse_sort_key(sort, query.get("after_key")), int(query["after_id"]))
+        except ValueError:
+            raise HttpError(400, "limit and after_id must be integers, as must after_key for sort=duration")
+        descending = query.get("desc", "1") not in ("0", "false", "no")
+
+        loop = asyncio.get_running_loop()
+        videos = await loop.run_in_executor(
+            None, db.search_videos, query.get("q", ""), sort, descending, after, limit
+        )
+        next_page = None
+        if len(videos) == limit:
+            next_page = {"after_key": videos[-1].sort_key, "after_id": videos[-1].id}
+        return 200, {"videos": [video.to_dict() for video in videos], "next": next_page}
+
+    async def _get_status(self, query: dict, body: bytes):
+        loop = asyncio.get_running_loop()
+        counts = await loop.run_in_executor(None, db.count_videos_by_status)
+        _, summary = tracker.snapshot()
+        return 200, {"statuses": counts, "downloads": summary._asdict(), "video_cache": db.cache.stats()}
+
+    async def _stream_events(self, writer: asyncio.StreamWriter, cors: str = ""):
+        """Streams bus events as SSE until the client disconnects or falls too far behind."""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.SSE_QUEUE_SIZE)
+
+        def on_event(event: events.Event):
+            # Runs on the publishing thread
+            loop.call_soon_threadsafe(self._offer, queue, event)
+
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+            + cors.encode() + b"Connection: close\r\n\r\n"
+        )
+        unsubscribe = events.bus.subscribe(on_event)
+        try:
+            await writer.drain()
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), self.SSE_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    writer.write(b": keepalive\n\n")
+                else:
+                    if event is None:
+                        logger.warning("Dropping SSE client that fell behind")
+                        break
+                    data = json.dumps({"video_id": event.video_id, **event.data}, default=str)
+                    writer.write(f"event: {event.type}\ndata: {data}\n\n".encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            unsubscribe()
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, event: events.Event):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Replace the backlog with an end-of-stream marker
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)
+
+    @staticmethod
+    def _json(body: bytes) -> dict:
+        try:
+            data = json.loads(body or b"{}")
+        except ValueError:
+            raise HttpError(400, "Body is not valid JSON")
+        if not isinstance(data, dict):
+            raise HttpError(400, "Body must be a JSON object")
+        return data
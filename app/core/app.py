@@ -1,11 +1,18 @@
-import urllib.parse
 import subprocess
+import threading
 from app.db import video as db
+from app.db import subscription as sub_db
+from app.db.models import LIST_COLUMNS
 from app.core.google import GoogleManager
 from app.core.ytdlp import YTDLPManager
 from app.core.videos import VideoManager
 from app.core.downloader import DownloadManager
-from app.settings import DB_BROWSER_PATH, DB_PATH, TREESIZE, DOWNLOAD_DIR, ARCHIVE_DIR
+from app.core.subscriptions import SubscriptionManager
+from app.core.api import ApiServer
+from app.core import urls
+from app.core.tunables import tunables
+from app.core import heartbeat
+from app.settings import DB_BROWSER_PATH, DB_PATH, TREESIZE, API_ENABLED
 from app.utils.logger import setup_logging
 
 logger = setup_logging()
@@ -16,9 +23,32 @@ class YTManagerApp:
         self.ytdlp = YTDLPManager()
         self.download_manager = DownloadManager(self.ytdlp)
         self.video_manager = VideoManager(self.google, self.ytdlp, self.download_manager)
+        self.subscription_manager = SubscriptionManager(self.google, self.ytdlp, self.video_manager)
         db.init_db()
+        sub_db.init_db()
+        # Before anything reads a setting
+        tunables.start()
+        self._resume_interrupted_downloads()
         # Check if there are any pending downloads on startup
         self.download_manager.start_if_needed()
+        self.subscription_manager.start()
+        self.api_server = ApiServer(self.video_manager)
+        if API_ENABLED:
+            self.api_server.start()
+
+    def _resume_interrupted_downloads(self):
+        """Re-queues downloads a previous run left in 'downloading'; they continue from
+        their .part files. Left alone while a daemon is running: they may be its own,
+        and it does this itself when it starts."""
+        beat = heartbeat.read()
+        if beat:
+            age, interval = beat
+            if heartbeat.responding(age, interval or tunables.get('daemon_interval')):
+                return
+        reset = db.reset_stuck_downloads()
+        if reset:
+            logger.info("Re-queued %s download(s) interrupted by a previous run; they resume", reset)
+        threading.Thread(target=self.download_manager.collect_orphaned_parts, daemon=True).start()
 
     # ----------------------------------------------------------------
     # Utility / Shared Logic
@@ -26,45 +56,20 @@ class YTManagerApp:
 
     def extract_video_id(self, input_str: str) -> str:
         """Extracts video ID from YouTube URL or returns the input if it's a plain video ID."""
-        input_str = input_str.strip()
-        
-        # First, try to extract from URL
-        try:
-            parsed = urllib.parse.urlparse(input_str)
-            if parsed.hostname == 'youtu.be':
-                video_id = parsed.path[1:]
-                if video_id:
-                    return video_id
-            if parsed.hostname in ('www.youtube.com', 'youtube.com'):
-                if parsed.path == '/watch':
-                    p = urllib.parse.parse_qs(parsed.query)
-                    video_id = p.get('v', [None])[0]
-                    if video_id:
-                        return video_id
-        except Exception as e:
-            logger.debug(f"Error parsing as URL: {e}")
-        
-        # If URL parsing failed, check if input looks like a video ID
-        # YouTube video IDs are typically 11 characters, alphanumeric + '-' and '_'
-        # But we'll be lenient and accept anything that doesn't look like a URL
-        if input_str and not input_str.startswith(('http://', 'https://', 'www.')):
-            # Check if it looks like a valid video ID (reasonable length, no spaces)
-            if len(input_str) >= 8 and len(input_str) <= 20 and ' ' not in input_str:
-                logger.info(f"Treating input as plain video ID: {input_str}")
-                return input_str
-        
-        logger.error(f"Could not extract video ID from: {input_str}")
-        return None
+        video_id = urls.extract_video_id(input_str)
+        if not video_id:
+            logger.error("Could not extract video ID from: %s", input_str)
+        return video_id
 
     def open_db_browser(self):
         if not DB_BROWSER_PATH:
             logger.error("DB Browser path not configured.")
             return
         try:
-            logger.info(f"Opening DB Browser: {DB_BROWSER_PATH} with {DB_PATH}")
+            logger.info("Opening DB Browser: %s with %s", DB_BROWSER_PATH, DB_PATH)
             subprocess.Popen([DB_BROWSER_PATH, str(DB_PATH)])
         except Exception as e:
-            logger.error(f"Failed to open DB Browser: {e}")
+            logger.error("Failed to open DB Browser: %s", e)
 
     def open_treesize_new(self):
         if not TREESIZE:
@@ -73,12 +78,12 @@ class YTManagerApp:
         try:
             # Convert forward slashes to backslashes for Windows paths
             treesize_path = TREESIZE.replace('/', '\\')
-            download_dir = DOWNLOAD_DIR.replace('/', '\\')
-            logger.info(f"Opening TreeSize: {treesize_path} with {download_dir}")
+            download_dir = tunables.get('download_dir').replace('/', '\\')
+            logger.info("Opening TreeSize: %s with %s", treesize_path, download_dir)
             # Use shell=True to avoid elevation issues on Windows
             subprocess.Popen(f'"{treesize_path}" "{download_dir}"', shell=True)
         except Exception as e:
-            logger.error(f"Failed to open TreeSize: {e}")
+            logger.error("Failed to open TreeSize: %s", e)
 
     def open_treesize_archive(self):
         if not TREESIZE:
@@ -87,38 +92,93 @@ class YTManagerApp:
         try:
             # Convert forward slashes to backslashes for Windows paths
             treesize_path = TREESIZE.replace('/', '\\')
-            archive_dir = ARCHIVE_DIR.replace('/', '\\')
-            logger.info(f"Opening TreeSize: {treesize_path} with {archive_dir}")
+            archive_dir = tunables.get('archive_dir').replace('/', '\\')
+            logger.info("Opening TreeSize: %s with %s", treesize_path, archive_dir)
             # Use shell=True to avoid elevation issues on Windows
             subprocess.Popen(f'"{treesize_path}" "{archive_dir}"', shell=True)
         except Exception as e:
-            logger.error(f"Failed to open TreeSize: {e}")
+            logger.error("Failed to open TreeSize: %s", e)
 
     # ----------------------------------------------------------------
     # Delegate to VideoManager
     # ----------------------------------------------------------------
 
     def add_video(self, input_str: str):
-        """Adds a video by URL or video ID. Constructs canonical URL if needed."""
+        """Adds every video found in the input (URLs, pasted text or a plain video ID)."""
         input_str = input_str.strip()
-        video_id = self.extract_video_id(input_str)
-        if not video_id:
-            logger.error(f"Invalid URL or video ID: {input_str}")
+        # Channel and playlist URLs become subscriptions rather than single videos
+        if urls.parse_subscription_url(input_str):
+            self.add_subscription(input_str)
             return
-        
-        # If input was a plain video ID, construct the canonical URL
-        # Otherwise, use the provided URL
-        if input_str.startswith(('http://', 'https://', 'www.')):
-            url = input_str
-        else:
-            url = f"https://www.youtube.com/watch?v={video_id}"
-            logger.info(f"Constructed canonical URL from video ID: {url}")
-        
-        self.video_manager.add_video(url, video_id)
+
+        video_ids = urls.extract_video_ids(input_str)
+        if not video_ids:
+            video_id = self.extract_video_id(input_str)
+            if not video_id:
+                logger.error("Invalid URL or video ID: %s", input_str)
+                return
+            video_ids = [video_id]
+
+        self.add_videos(video_ids)
+
+    def add_videos(self, video_ids: list):
+        """Adds videos by ID using canonical URLs. Several IDs go through one bulk insert."""
+        if len(video_ids) == 1:
+            self.video_manager.add_video(urls.canonical_url(video_ids[0]), video_ids[0])
+        elif video_ids:
+            count = self.video_manager.add_videos_bulk([(urls.canonical_url(v), v) for v in video_ids])
+            logger.info("Added %s of %s video(s) from pasted text", count, len(video_ids))
+
+    def add_subscription(self, url: str):
+        """Subscribes to a channel or playlist URL; new uploads are queued on each poll."""
+        return self.subscription_manager.add_subscription(url)
+
+    def poll_subscriptions(self) -> int:
+        """Polls all subscriptions now instead of waiting for the next scheduled poll."""
+        return self.subscription_manager.poll_all()
 
     def get_all_videos(self):
         return self.video_manager.get_all_videos()
 
+    # The queue view's readers only fetch the columns it shows (LIST_COLUMNS)
+
+    def get_active_videos(self):
+        """Videos shown in the queue view (new, open, down, error), newest first."""
+        return self.video_manager.get_active_videos(LIST_COLUMNS)
+
+    def get_videos_changed_since(self, modified_dt):
+        """Videos of any status modified after modified_dt, for incremental refreshes."""
+        return self.video_manager.get_videos_changed_since(modified_dt, LIST_COLUMNS)
+
+    def get_videos_by_ids(self, video_ids: list):
+        return self.video_manager.get_videos_by_ids(video_ids, LIST_COLUMNS)
+
+    def search_videos(self, query: str = '', sort: str = 'create_dt', descending: bool = True,
+                      after=None, limit: int = 100):
+        """One page of active videos matching query, ordered by sort; pass the last row's
+        (sort_key, id) as after to get the next page."""
+        return self.video_manager.search_videos(query, sort, descending, after, limit, LIST_COLUMNS)
+
+    def get_status_counts(self) -> dict:
+        """Videos per status from the in-memory counts; never queries, safe on the UI thread."""
+        counts = {}
+        for (status, _), count in db.status_counts.peek().items():
+            counts[status] = counts.get(status, 0) + count
+        return counts
+
+    # Runtime settings (app.core.tunables); changes apply without a restart
+
+    def get_settings(self) -> list:
+        """(definition, current value, overridden) per setting."""
+        return tunables.describe()
+
+    def set_setting(self, name: str, text: str):
+        """Validates and applies a new value; raises ValueError if it is not accepted."""
+        return tunables.set(name, text)
+
+    def reset_setting(self, name: str):
+        tunables.reset(name)
+
     def play_video(self, video_id: int):
         self.video_manager.play_video(video_id)
 
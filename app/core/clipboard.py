@@ -0,0 +1,206 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+import pyperclip
+from app.utils.logger import setup_logging
+
+logger = setup_logging()
+
+class ClipboardBackend(ABC):
+    """Base class for clipboard change sources used by ClipboardMonitor.
+
+    wait_for_change() blocks for at most `timeout` seconds and returns the new clipboard
+    text when it changed, or None otherwise. Backends only read the clipboard (which on
+    Linux forks xclip/xsel via pyperclip) once they know something changed."""
+
+    name = "base"
+
+    @abstractmethod
+    def wait_for_change(self, timeout: float) -> Optional[str]:
+        ...
+
+    def read(self) -> str:
+        """Reads the current clipboard text."""
+        return pyperclip.paste()
+
+    def close(self):
+        """Releases any OS resources held by the backend."""
+        pass
+
+class PollingBackend(ClipboardBackend):
+    """Portable fallback: polls pyperclip, backing off while the clipboard is idle.
+
+    The interval starts at min_interval, doubles after every unchanged read up to
+    max_interval, and snaps back to min_interval as soon as the content changes."""
+
+    name = "poll"
+
+    def __init__(self, min_interval: float = 1.0, max_interval: float = 8.0):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.next_poll = 0.0
+        self.last_text: Optional[str] = None
+
+    def wait_for_change(self, timeout: float) -> Optional[str]:
+        now = time.monotonic()
+        if now < self.next_poll:
+            time.sleep(min(timeout, self.next_poll - now))
+            if time.monotonic() < self.next_poll:
+                return None
+
+        try:
+            text = self.read()
+        except Exception:
+            self.next_poll = time.monotonic() + self.interval
+            raise
+
+        changed = text != self.last_text
+        if changed:
+            self.last_text = text
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * 2, self.max_interval)
+        self.next_poll = time.monotonic() + self.interval
+        return text if changed else None
+
+class Win32Backend(ClipboardBackend):
+    """Windows: watches GetClipboardSequenceNumber, a plain syscall that changes on every copy."""
+
+    name = "win32"
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.user32 = ctypes.windll.user32
+        self.sequence = None
+
+    def wait_for_change(self, timeout: float) -> Optional[str]:
+        deadline = time.monotonic() + timeout
+        while True:
+            sequence = self.user32.GetClipboardSequenceNumber()
+            if sequence != self.sequence:
+                self.sequence = sequence
+                return self.read()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            time.sleep(min(self.interval, remaining))
+
+class XFixesBackend(ClipboardBackend):
+    """Linux/X11: blocks on XFixes selection-owner notifications for CLIPBOARD.
+
+    Every copy makes the copying app the new selection owner, so the X server wakes us
+    exactly once per copy and we stay asleep otherwise. Works under Xvfb as well.
+    The display is opened lazily so all Xlib calls happen on the monitor thread."""
+
+    name = "xfixes"
+
+    SELECTION_OWNER_NOTIFY_MASK = 1 << 0
+
+    def __init__(self):
+        self.xlib = _load_library("X11")
+        self.xfixes = _load_library("Xfixes")
+        if not self.xlib or not self.xfixes:
+            raise OSError("libX11/libXfixes not available")
+
+        self.xlib.XOpenDisplay.restype = ctypes.c_void_p
+        self.xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        self.xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+        self.xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        self.xlib.XInternAtom.restype = ctypes.c_ulong
+        self.xlib.XInternAtom.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int]
+        self.xlib.XConnectionNumber.argtypes = [ctypes.c_void_p]
+        self.xlib.XPending.argtypes = [ctypes.c_void_p]
+        self.xlib.XNextEvent.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+        self.xlib.XFlush.argtypes = [ctypes.c_void_p]
+        self.xlib.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        self.xfixes.XFixesQueryExtension.argtypes = [
+            ctypes.c_void_p, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int)
+        ]
+        self.xfixes.XFixesSelectSelectionInput.argtypes = [
+            ctypes.c_void_p, ctypes.c_ulong, ctypes.c_ulong, ctypes.c_ulong
+        ]
+
+        self.display = None
+        self.fd = None
+        # XEvent is a union padded to 24 longs
+        self.event = (ctypes.c_long * 24)()
+        self.primed = False
+
+    def _open(self):
+        display = self.xlib.XOpenDisplay(None)
+        if not display:
+            raise OSError("Cannot open X display")
+
+        event_base, error_base = ctypes.c_int(), ctypes.c_int()
+        if not self.xfixes.XFixesQueryExtension(display, ctypes.byref(event_base), ctypes.byref(error_base)):
+            self.xlib.XCloseDisplay(display)
+            raise OSError("XFixes extension not available")
+
+        root = self.xlib.XDefaultRootWindow(display)
+        clipboard = self.xlib.XInternAtom(display, b"CLIPBOARD", 0)
+        self.xfixes.XFixesSelectSelectionInput(display, root, clipboard, self.SELECTION_OWNER_NOTIFY_MASK)
+        self.xlib.XFlush(display)
+
+        self.display = display
+        self.fd = self.xlib.XConnectionNumber(display)
+
+    def wait_for_change(self, timeout: float) -> Optional[str]:
+        if self.display is None:
+            self._open()
+
+        # Report whatever is on the clipboard when monitoring starts
+        if not self.primed:
+            self.primed = True
+            return self.read()
+
+        if not self.xlib.XPending(self.display):
+            readable, _, _ = select.select([self.fd], [], [], timeout)
+            if not readable:
+                return None
+
+        changed = False
+        while self.xlib.XPending(self.display):
+            self.xlib.XNextEvent(self.display, ctypes.byref(self.event))
+            changed = True
+
+        return self.read() if changed else None
+
+    def close(self):
+        if self.display is not None:
+            self.xlib.XCloseDisplay(self.display)
+            self.display = None
+
+def _load_library(name: str):
+    path = ctypes.util.find_library(name)
+    if not path:
+        return None
+    try:
+        return ctypes.CDLL(path)
+    except OSError:
+        return None
+
+def create_backend(preferred: Optional[str] = None) -> ClipboardBackend:
+    """Picks the cheapest backend for this platform.
+
+    CLIPBOARD_BACKEND (poll, win32, xfixes) overrides the automatic choice."""
+    preferred = preferred or os.getenv("CLIPBOARD_BACKEND", "")
+
+    if preferred == PollingBackend.name:
+        return PollingBackend()
+
+    if sys.platform == 'win32' and preferred in ("", Win32Backend.name):
+        return Win32Backend()
+
+    if sys.platform.startswith('linux') and os.getenv("DISPLAY") and preferred in ("", XFixesBackend.name):
+        try:
+            return XFixesBackend()
+        except OSError as e:
+            logger.info("XFixes clipboard backend unavailable (%s), falling back to polling", e)
+
+    return PollingBackend()
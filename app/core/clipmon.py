@@ -1,7 +1,12 @@
 import threading
 import time
+from collections import OrderedDict
 import pyperclip
-from typing import Optional, Callable
+from typing import Optional, Callable, List
+from app.db import video as db
+from app.core import urls
+from app.core.clipboard import ClipboardBackend, PollingBackend, create_backend
+from app.core.tunables import tunables
 from app.utils.logger import setup_logging
 
 logger = setup_logging()
@@ -9,26 +14,41 @@ logger = setup_logging()
 class ClipboardMonitor:
     """Monitors clipboard for YouTube URLs and adds them to the video queue."""
     
-    def __init__(self, app_logic, callback: Optional[Callable[[str], None]] = None):
+    def __init__(self, app_logic, callback: Optional[Callable[[str], None]] = None,
+                 backend: Optional[ClipboardBackend] = None):
         """
         Initialize clipboard monitor.
         
         Args:
             app_logic: YTManagerApp instance for adding videos
             callback: Optional callback function to call when URL is detected (for UI updates)
+            backend: Clipboard change source; defaults to the cheapest one for this platform
         """
         self.app_logic = app_logic
         self.callback = callback
         self.monitoring = False
         self.monitor_thread: Optional[threading.Thread] = None
         self.last_clipboard = ""
-        self.check_interval = 1.0  # Check every 1 second
+        self.backend = backend or create_backend()
+        # LRU of video IDs already handled, so re-copying a link never re-adds it
+        self.seen_ids: "OrderedDict[str, None]" = OrderedDict()
+        self.seen_capacity = 2000
+        self.added_count = 0
+        self.duplicate_count = 0
         
+    @property
+    def check_interval(self) -> float:
+        """Longest a backend may block, so stop() stays responsive; read on every wait."""
+        return tunables.get('clipboard_check_interval')
+
     def start(self):
         """Start monitoring clipboard in a background thread."""
         if self.monitoring:
             logger.warning("Clipboard monitor is already running")
             return
+        if self.monitor_thread and self.monitor_thread.is_alive():
+            # Still finishing the wait it was in when stop() gave up on it
+            self.monitor_thread.join()
         
         self.monitoring = True
         self.monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
@@ -43,28 +63,81 @@ class ClipboardMonitor:
         
         self.monitoring = False
         if self.monitor_thread and self.monitor_thread.is_alive():
-            self.monitor_thread.join(timeout=2.0)
+            # A wait lasts up to check_interval; the thread closes the backend on its way out
+            self.monitor_thread.join(timeout=self.check_interval + 2.0)
+            if self.monitor_thread.is_alive():
+                logger.warning("Clipboard monitor thread still busy; it stops after its current wait")
+                return
+        else:
+            self.backend.close()
         logger.info("Clipboard monitor stopped")
     
-    def check_clipboard(self):
-        """Check clipboard for YouTube URLs and add them if found."""
+    def check_clipboard(self, current: Optional[str] = None):
+        """
+        Check clipboard for YouTube URLs and add them if found.
+        
+        Args:
+            current: Clipboard text already read by the backend; read it now if omitted
+        """
         try:
-            current = pyperclip.paste()
+            if current is None:
+                current = self.backend.read()
             
             # Only process if clipboard content changed
             if current != self.last_clipboard:
                 self.last_clipboard = current
                 
-                # Check if it's a YouTube URL
+                # A single paste may hold many links; pull out every video ID in one pass
                 if self._is_youtube_url(current):
-                    logger.info(f"Detected YouTube URL in clipboard: {current}")
-                    self.add_url(current)
+                    video_ids = urls.extract_video_ids(current)
+                    new_ids = self._filter_seen(video_ids)
+                    logger.info("Detected %s YouTube video(s) in clipboard, %s new", len(video_ids), len(new_ids))
+                    if self.add_videos(new_ids):
+                        self._mark_seen(video_ids)
+                    else:
+                        # Not handled: copying the same text again retries it
+                        self.last_clipboard = ""
                     
         except pyperclip.PyperclipException as e:
             # Clipboard might be empty or contain non-text
-            logger.debug(f"Clipboard access error (non-text or empty): {e}")
+            logger.debug("Clipboard access error (non-text or empty): %s", e)
         except Exception as e:
-            logger.error(f"Error checking clipboard: {e}")
+            logger.error("Error checking clipboard: %s", e)
+    
+    def _filter_seen(self, video_ids: List[str]) -> List[str]:
+        """
+        Drop video IDs that were already seen by this monitor or already exist in the DB.
+        
+        Args:
+            video_ids: Video IDs extracted from the clipboard
+        
+        Returns:
+            The IDs that still need adding
+        """
+        unseen = []
+        for video_id in video_ids:
+            if video_id in self.seen_ids:
+                self.seen_ids.move_to_end(video_id)
+                self.duplicate_count += 1
+            else:
+                unseen.append(video_id)
+        
+        if not unseen:
+            return []
+        
+        # One indexed lookup for everything the LRU did not know about; closed or
+        # failed videos go through, since adding them reopens them
+        existing = db.get_existing_youtube_ids(unseen, reopenable=False)
+        self.duplicate_count += len(existing)
+        return [v for v in unseen if v not in existing]
+    
+    def _mark_seen(self, video_ids: List[str]):
+        """Remember video IDs once they are in the DB, so copying them again is a no-op."""
+        for video_id in video_ids:
+            self.seen_ids[video_id] = None
+            self.seen_ids.move_to_end(video_id)
+        while len(self.seen_ids) > self.seen_capacity:
+            self.seen_ids.popitem(last=False)
     
     def _is_youtube_url(self, text: str) -> bool:
         """Check if text contains a YouTube URL."""
@@ -72,54 +145,57 @@ class ClipboardMonitor:
         if not text or not isinstance(text, str):
             return False
         
-        text = text.strip()
-        if not text:
-            return False
-        
-        # Check for common YouTube URL patterns
-        youtube_patterns = [
-            'youtube.com/watch',
-            'youtu.be/',
-            'youtube.com/embed',
-            'youtube.com/shorts'
-        ]
-        
-        text_lower = text.lower()
-        return any(pattern in text_lower for pattern in youtube_patterns)
+        return urls.contains_youtube_url(text)
     
-    def add_url(self, url: str):
+    def add_videos(self, video_ids: List[str]) -> bool:
         """
-        Add YouTube URL to video queue.
+        Add video IDs found in the clipboard to the video queue.
         
         Args:
-            url: YouTube URL to add
+            video_ids: YouTube video IDs, in clipboard order
+        
+        Returns:
+            False if adding them failed
         """
+        if not video_ids:
+            return True
         try:
-            logger.info(f"Adding URL from clipboard: {url}")
-            self.app_logic.add_video(url)
-            
-            # Call callback if provided (for UI updates)
-            if self.callback:
+            self.app_logic.add_videos(video_ids)
+            self.added_count += len(video_ids)
+        except Exception as e:
+            logger.error("Error adding videos from clipboard: %s", e)
+            return False
+        
+        # Call callback per canonical URL (for UI updates)
+        if self.callback:
+            for video_id in video_ids:
                 try:
-                    self.callback(url)
+                    self.callback(urls.canonical_url(video_id))
                 except Exception as e:
-                    logger.error(f"Error in callback: {e}")
-                    
-        except Exception as e:
-            logger.error(f"Error adding URL from clipboard: {e}")
+                    logger.error("Error in callback: %s", e)
+        return True
     
     def _monitor_loop(self):
         """Main monitoring loop that runs in background thread."""
-        logger.info("Clipboard monitor loop started")
+        logger.info("Clipboard monitor loop started (%s backend)", self.backend.name)
         
         while self.monitoring:
             try:
-                self.check_clipboard()
+                # Blocks until the clipboard changes or check_interval elapses
+                current = self.backend.wait_for_change(self.check_interval)
+                if current is not None:
+                    self.check_clipboard(current)
+            except pyperclip.PyperclipException as e:
+                logger.debug("Clipboard access error (non-text or empty): %s", e)
+            except OSError as e:
+                # Event-driven backends can fail at runtime (e.g. X display went away)
+                logger.warning("Clipboard backend %s failed (%s), falling back to polling", self.backend.name, e)
+                self.backend.close()
+                self.backend = PollingBackend(min_interval=self.check_interval)
             except Exception as e:
-                logger.error(f"Error in monitor loop: {e}")
-            
-            # Sleep for check interval
-            time.sleep(self.check_interval)
+                logger.error("Error in monitor loop: %s", e)
+                time.sleep(self.check_interval)
         
+        # Here rather than in stop(): the backend may still be in use until this thread exits
+        self.backend.close()
         logger.info("Clipboard monitor loop stopped")
-
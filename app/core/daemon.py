@@ -0,0 +1,138 @@
+import signal
+import threading
+import time
+from typing import Optional
+from app.db import video as db
+from app.db import subscription as sub_db
+from app.db import metrics as metrics_db
+from app.core.google import GoogleManager
+from app.core.ytdlp import YTDLPManager
+from app.core.videos import VideoManager
+from app.core.downloader import DownloadManager
+from app.core.subscriptions import SubscriptionManager
+from app.core.api import ApiServer
+from app.core.tunables import tunables
+from app.core import heartbeat
+from app.settings import API_ENABLED, METRICS_RAW_DAYS, THUMBNAIL_DIR
+from app.utils.logger import setup_logging
+
+logger = setup_logging()
+
+class Daemon:
+    """Headless service: downloads, metadata and subscriptions without the Tk GUI.
+
+    CLI commands only write to the DB; every `interval` seconds the daemon sweeps it for
+    work they left behind (queued downloads, rows without metadata). It is meant to be
+    the only process downloading, so rows still marked 'downloading' when it starts
+    belong to a process that died and are queued again."""
+
+    RETENTION_SWEEP_SECONDS = 3600
+
+    def __init__(self, interval: Optional[int] = None):
+        self.fixed_interval = interval  # None: the daemon_interval setting, read every sweep
+        self.google = GoogleManager()
+        self.ytdlp = YTDLPManager()
+        self.download_manager = DownloadManager(self.ytdlp)
+        self.video_manager = VideoManager(self.google, self.ytdlp, self.download_manager)
+        self.subscription_manager = SubscriptionManager(self.google, self.ytdlp, self.video_manager)
+        self.api_server = ApiServer(self.video_manager)
+        self.stop_event = threading.Event()
+        self.metadata_after_id = 0  # Rows up to this id were looked up once; a miss is not retried
+        self.next_retention_sweep = 0.0
+
+    def run(self):
+        """Runs until SIGINT/SIGTERM or stop(). Must be called on the main thread."""
+        db.init_db()
+        sub_db.init_db()
+        metrics_db.init_db()
+        tunables.start()
+
+        reset = db.reset_stuck_downloads()
+        if reset:
+            logger.info("Re-queued %s download(s) interrupted by a previous run; they resume", reset)
+
+        signal.signal(signal.SIGINT, lambda signum, frame: self.stop())
+        signal.signal(signal.SIGTERM, lambda signum, frame: self.stop())
+
+        logger.info("Daemon started (sweep every %ss)", self.interval)
+        self.subscription_manager.start()
+        if API_ENABLED:
+            self.api_server.start()
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    self.sweep()
+                except Exception as e:
+                    logger.error("Error in daemon sweep: %s", e)
+                heartbeat.beat(self.interval)
+                self.stop_event.wait(self.interval)
+        finally:
+            tunables.stop()
+            self.api_server.stop()
+            self.subscription_manager.stop()
+            self.download_manager.stop()
+            heartbeat.clear()
+            logger.info("Daemon stopped.")
+
+    @property
+    def interval(self) -> int:
+        return self.fixed_interval or tunables.get('daemon_interval')
+
+    def stop(self):
+        self.stop_event.set()
+
+    def sweep(self):
+        """One pass over the DB: metadata for new rows, queued downloads, and hourly
+        retention (thumbnail cache, orphaned partial downloads, metrics rollup, old rows
+        to history)."""
+        self.fetch_missing_metadata()
+        self.download_manager.start_if_needed()
+        if time.monotonic() >= self.next_retention_sweep:
+            self.next_retention_sweep = time.monotonic() + self.RETENTION_SWEEP_SECONDS
+            self.prune_thumbnails()
+            self.download_manager.collect_orphaned_parts()
+            metrics_db.rollup(METRICS_RAW_DAYS)
+            self.compact_history()
+
+    def fetch_missing_metadata(self) -> int:
+        """Fetches metadata for rows added without it (e.g. by `cli add`). Returns the count fetched."""
+        videos = db.get_videos_missing_metadata(tunables.get('metadata_batch'), ('id', 'video_id'),
+                                                after_id=self.metadata_after_id)
+        if not videos:
+            return 0
+
+        entries = [(v.id, v.video_id) for v in videos]
+        self.metadata_after_id = entries[-1][0]
+        self.video_manager.fetch_metadata_bulk(entries)
+        logger.info("Looked up metadata for %s video(s)", len(entries))
+        return len(entries)
+
+    def compact_history(self) -> int:
+        """Moves old closed/archived rows to videos_history, then frees the space they left.
+        Returns the count moved."""
+        days = tunables.get('history_after_days')
+        if days <= 0:
+            return 0
+        moved = db.compact_videos(days)
+        if moved:
+            db.vacuum_and_analyze()
+        return moved
+
+    def prune_thumbnails(self) -> int:
+        """Deletes cached thumbnails fetched more than thumbnail_retention_days ago. Returns the count removed."""
+        days = tunables.get('thumbnail_retention_days')
+        if days <= 0 or not THUMBNAIL_DIR.exists():
+            return 0
+
+        cutoff = time.time() - days * 86400
+        removed = 0
+        for path in THUMBNAIL_DIR.glob("*.jpg"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                pass
+        if removed:
+            logger.info("Pruned %s cached thumbnail(s)", removed)
+        return removed
@@ -1,9 +1,18 @@
+import datetime
+import os
 import threading
 import time
+from pathlib import Path
+from typing import Optional
 from app.db import video as db
-from app.core.ytdlp import YTDLPManager
-from app.settings import CONCURRENT_DOWNLOADS
-from app.utils.logger import setup_logging
+from app.db.models import Video, DOWNLOAD_COLUMNS
+from app.core.ytdlp import PART_PATTERNS, PART_SUFFIX, YTDLPManager, partial_owner
+from app.core import events
+from app.core.progress import DownloadProgress, ProgressThrottle, tracker
+from app.core.tunables import tunables
+from app.settings import PARTIAL_CHECKPOINT_SECONDS, PARTIAL_GC_AGE_HOURS
+from app.utils.logger import setup_logging, log_duration
+from app.utils import metrics
 
 logger = setup_logging()
 
@@ -15,7 +24,9 @@ class DownloadManager:
         self.running = False
         self.thread = None
         self.lock = threading.Lock()  # For thread-safe start/stop
-        self.check_interval = 30  # 30 seconds when active (much shorter)
+        self.wake = threading.Event()  # Set when a download completes, so its slot is refilled at once
+        # The limit and interval are read on each pass; a change wakes the loop to apply it
+        events.bus.subscribe(self._on_event)
         
     def start_if_needed(self):
         """Starts the download manager if there's work to do and it's not already running."""
@@ -23,10 +34,13 @@ class DownloadManager:
             if self.running:
                 return  # Already running
             
-            # Check if there's any work to do
-            queued_count = db.count_videos_by_download_needed('yes')
-            downloading_count = db.count_videos_by_download_needed('downloading')
+            # Check if there's any work to do. Counted afresh: rows may have been queued
+            # by another process (CLI, API of the daemon) since the counts were loaded
+            counts = db.status_counts.reload()
+            queued_count = db.status_counts.count(download_needed='yes', counts=counts)
+            downloading_count = db.status_counts.count(download_needed='downloading', counts=counts)
             
+            tracker.set_queued(queued_count)
             if queued_count == 0 and downloading_count == 0:
                 logger.debug("No downloads queued or in progress, DownloadManager not needed")
                 return
@@ -42,6 +56,7 @@ class DownloadManager:
             if not self.running:
                 return
             self.running = False
+            self.wake.set()
             if self.thread:
                 self.thread.join(timeout=10)
             logger.info("DownloadManager stopped.")
@@ -52,9 +67,11 @@ class DownloadManager:
             try:
                 self._process_downloads()
                 
-                # Check if we should continue running
-                queued_count = db.count_videos_by_download_needed('yes')
-                downloading_count = db.count_videos_by_download_needed('downloading')
+                # Check if we should continue running; in-memory counts, no query
+                counts = db.status_counts.snapshot()
+                queued_count = db.status_counts.count(download_needed='yes', counts=counts)
+                downloading_count = db.status_counts.count(download_needed='downloading', counts=counts)
+                tracker.set_queued(queued_count)
                 
                 # If nothing to do, shut down
                 if queued_count == 0 and downloading_count == 0:
@@ -62,77 +79,172 @@ class DownloadManager:
                     self.running = False
                     break
                 
-                # Sleep for check_interval seconds (shorter when active)
-                for _ in range(self.check_interval):
-                    if not self.running:
-                        break
-                    time.sleep(1)
+                # Sleep for download_check_interval seconds, or until a download finishes
+                self.wake.wait(tunables.get('download_check_interval'))
+                self.wake.clear()
                     
             except Exception as e:
-                logger.error(f"Error in DownloadManager loop: {e}")
+                logger.error("Error in DownloadManager loop: %s", e)
                 time.sleep(60)  # Wait a minute before retrying on error
     
     def _process_downloads(self):
         """Processes pending downloads up to the concurrent limit."""
         # Count currently downloading videos
-        downloading_count = db.count_videos_by_download_needed('downloading')
-        logger.debug(f"Currently downloading: {downloading_count}/{CONCURRENT_DOWNLOADS}")
+        downloading_count = db.status_counts.count(download_needed='downloading')
+        limit = tunables.get('concurrent_downloads')
+        tracker.limit = limit
+        logger.debug("Currently downloading: %s/%s", downloading_count, limit)
         
         # If we have fewer than the limit downloading, start more
-        if downloading_count < CONCURRENT_DOWNLOADS:
-            slots_available = CONCURRENT_DOWNLOADS - downloading_count
+        if downloading_count < limit:
+            slots_available = limit - downloading_count
             
             # Get videos queued for download
-            queued_videos = db.get_videos_by_download_needed('yes', limit=slots_available)
+            queued_videos = db.get_videos_by_download_needed('yes', limit=slots_available, columns=DOWNLOAD_COLUMNS)
             
             if queued_videos:
-                logger.info(f"Starting {len(queued_videos)} download(s)")
+                logger.info("Starting %s download(s)", len(queued_videos))
                 
                 for video in queued_videos:
                     self._start_download(video)
     
-    def _start_download(self, video: dict):
+    def _start_download(self, video: Video):
         """Starts a download for a single video."""
-        video_id = video['id']
-        youtube_id = video['video_id']
-        url = video['url']
+        video_id = video.id
+        youtube_id = video.video_id
+        url = video.url
         
         if not url or not youtube_id:
-            logger.error(f"Video {video_id} missing URL or video_id, skipping download")
+            logger.error("Video %s missing URL or video_id, skipping download", video_id)
             db.set_download_needed(video_id, 'no')
             db.update_video_status(video_id, 'error', 'Missing URL or video_id')
+            events.bus.publish(events.VIDEO_ERROR, video_id, error='Missing URL or video_id')
             return
         
         try:
             # Mark as downloading
             db.set_download_needed(video_id, 'downloading')
-            logger.info(f"Starting download for video {video_id} ({youtube_id})")
+            logger.info("Starting download for video %s (%s)", video_id, youtube_id)
+            tracker.start(video_id)
+            self._record_queue_wait(video)
+            events.bus.publish(events.DOWNLOAD_STARTED, video_id)
             
             # Start download in a separate thread (non-blocking)
             thread = threading.Thread(
                 target=self._download_video,
-                args=(video_id, youtube_id, url),
+                args=(video_id, youtube_id, url, video.partial_path),
                 daemon=True
             )
             thread.start()
             
         except Exception as e:
-            logger.error(f"Error starting download for video {video_id}: {e}")
+            logger.error("Error starting download for video %s: %s", video_id, e)
+            tracker.finish(video_id)
             db.set_download_needed(video_id, 'yes')  # Put back in queue
             db.update_video_status(video_id, 'error', str(e))
+            events.bus.publish(events.VIDEO_ERROR, video_id, error=str(e))
     
-    def _download_video(self, video_id: int, youtube_id: str, url: str):
-        """Downloads a video. This runs in a separate thread."""
+    def _download_video(self, video_id: int, youtube_id: str, url: str, partial_path: Optional[str] = None):
+        """Downloads a video. This runs in a separate thread.
+        A download interrupted before (partial_path) continues where it stopped."""
         try:
-            logger.info(f"Downloading video {video_id} ({youtube_id})")
+            logger.info("Downloading video %s (%s)", video_id, youtube_id)
             # This will spawn a subprocess that runs independently
             # The callback from yt-dlp will mark it as complete
-            self.ytdlp.download_video(url, youtube_id)
+            with log_duration(logger, "download", video_id), metrics.timed("download", video_id) as sample:
+                if partial_path:
+                    file_path = partial_path[:-len(PART_SUFFIX)]
+                else:
+                    file_path = self.ytdlp.resolve_filename(url)
+                    partial_path = file_path + PART_SUFFIX
+                resumed = _file_size(partial_path)
+                if resumed:
+                    logger.info("Resuming video %s at %s bytes", video_id, resumed)
+                    metrics.record("download_resumed", video_id=video_id, bytes=resumed)
+                # Recorded before yt-dlp starts, so a crash at any point leaves it owned
+                db.update_partial(video_id, partial_path, resumed)
+
+                file_path = self.ytdlp.download_video(
+                    url, youtube_id, on_progress=self._progress_reporter(video_id, partial_path), file_path=file_path
+                )
+                current = tracker.get(video_id)
+                sample.bytes = current.downloaded - resumed if current else None
             # Note: We don't update status here because the yt-dlp callback
-            # will handle that via mark_download_complete
+            # will handle that via mark_download_complete (in its own process),
+            # but the run has finished by now, so tell in-process listeners
+            events.bus.publish(events.DOWNLOAD_FINISHED, video_id, file_path=file_path)
+            # The callback process moved the row out of 'downloading': count again
+            db.status_counts.invalidate()
+            # Failures are re-queued and wait for the next pass, or they would spin
+            self.wake.set()
         except Exception as e:
-            logger.error(f"Download failed for video {video_id} ({youtube_id}): {e}")
+            logger.error("Download failed for video %s (%s): %s", video_id, youtube_id, e)
+            if partial_path:
+                # The retry continues from what is on disk; record how far this got
+                db.update_partial(video_id, partial_path, _file_size(partial_path))
             # Reset to 'yes' so it can be retried, or set to 'no' if we don't want retries
             db.set_download_needed(video_id, 'yes')
             db.update_video_status(video_id, 'error', str(e))
+            events.bus.publish(events.VIDEO_ERROR, video_id, error=str(e))
+        finally:
+            tracker.finish(video_id)
+
+    def _on_event(self, event: events.Event):
+        if event.type == events.SETTING_CHANGED and event.data['name'] in (
+            'concurrent_downloads', 'download_check_interval'
+        ):
+            self.wake.set()
+
+    def _record_queue_wait(self, video: Video):
+        """Records how long the video waited between being queued and starting."""
+        if not video.queued_dt:
+            return
+        wait_ms = (datetime.datetime.now() - video.queued_dt).total_seconds() * 1000
+        metrics.record("queue_wait", wait_ms, video.id)
+
+    def _progress_reporter(self, video_id: int, partial_path: str):
+        """Progress callback for one download: every update goes to the in-memory tracker
+        (the UI polls it), but DOWNLOAD_PROGRESS events are limited to one a second, and
+        the bytes done are written to the row every PARTIAL_CHECKPOINT_SECONDS."""
+        throttle = ProgressThrottle()
+        checkpoint = ProgressThrottle(PARTIAL_CHECKPOINT_SECONDS)
+
+        def report(progress: DownloadProgress):
+            tracker.update(video_id, progress)
+            if throttle.ready(progress):
+                events.bus.publish(events.DOWNLOAD_PROGRESS, video_id, **progress._asdict())
+            if checkpoint.ready(progress):
+                db.update_partial(video_id, partial_path, progress.downloaded)
+        return report
+
+    def collect_orphaned_parts(self) -> int:
+        """Deletes yt-dlp leftovers (.part files, fragments) in download_dir that no
+        queued or running download owns, once untouched for PARTIAL_GC_AGE_HOURS: a
+        younger one may belong to a download that is just starting. Returns the count removed."""
+        download_dir = Path(tunables.get('download_dir'))
+        if not download_dir.exists():
+            return 0
+
+        owned = db.get_owned_partial_paths()
+        cutoff = time.time() - PARTIAL_GC_AGE_HOURS * 3600
+        removed = 0
+        for pattern in PART_PATTERNS:
+            # The output template puts videos in per-uploader subdirectories
+            for path in download_dir.rglob(pattern):
+                try:
+                    if partial_owner(path) in owned or path.stat().st_mtime >= cutoff:
+                        continue
+                    path.unlink()
+                    removed += 1
+                except OSError:
+                    pass
+        if removed:
+            logger.info("Removed %s orphaned partial download file(s)", removed)
+        return removed
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
 
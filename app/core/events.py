@@ -0,0 +1,57 @@
+import threading
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+from app.utils.logger import setup_logging
+
+logger = setup_logging()
+
+# Event types
+VIDEO_ADDED = "video_added"
+METADATA_FETCHED = "metadata_fetched"
+DOWNLOAD_STARTED = "download_started"
+DOWNLOAD_PROGRESS = "download_progress"
+DOWNLOAD_FINISHED = "download_finished"
+VIDEO_ERROR = "video_error"
+SETTING_CHANGED = "setting_changed"  # No video_id; data has name and value
+
+class Event(NamedTuple):
+    type: str
+    video_id: Optional[int]  # Primary key of the affected row
+    data: Dict[str, Any]
+
+class EventBus:
+    """In-process publish/subscribe for pipeline events.
+
+    Subscribers are called synchronously on the publisher's thread, so they must be
+    quick and thread-safe (the UI just records the row id and repaints on its own timer)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers: List[Callable[[Event], None]] = []
+
+    def subscribe(self, callback: Callable[[Event], None]) -> Callable[[], None]:
+        """Registers a callback for every event. Returns a function that unsubscribes it."""
+        with self.lock:
+            self.subscribers.append(callback)
+
+        def unsubscribe():
+            with self.lock:
+                if callback in self.subscribers:
+                    self.subscribers.remove(callback)
+        return unsubscribe
+
+    def publish(self, event_type: str, video_id: Optional[int] = None, **data):
+        """Delivers an event to all current subscribers. Subscriber errors are logged, not raised."""
+        with self.lock:
+            subscribers = list(self.subscribers)
+        if not subscribers:
+            return
+
+        event = Event(event_type, video_id, data)
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error("Error in event subscriber for %s: %s", event_type, e)
+
+# Shared bus for the process
+bus = EventBus()
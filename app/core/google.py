@@ -1,34 +1,52 @@
-from googleapiclient.discovery import build
 from app.settings import YT_API_KEY
 from app.utils.logger import setup_logging
+from app.utils import metrics
 
 logger = setup_logging()
 
 class GoogleManager:
     def __init__(self):
         self.api_key = YT_API_KEY
-        self.youtube = None
-        if self.api_key:
-            try:
-                self.youtube = build('youtube', 'v3', developerKey=self.api_key)
-            except Exception as e:
-                logger.error(f"Failed to initialize Google API: {e}")
+        self._youtube = None
+        self._initialized = False
+
+    @property
+    def youtube(self):
+        """API client, built on first use: importing googleapiclient takes ~250 ms,
+        which CLI commands that never call the API should not pay."""
+        if not self._initialized:
+            self._initialized = True
+            if self.api_key:
+                try:
+                    from googleapiclient.discovery import build
+                    self._youtube = build('youtube', 'v3', developerKey=self.api_key)
+                except Exception as e:
+                    logger.error("Failed to initialize Google API: %s", e)
+        return self._youtube
 
     def get_video_info(self, video_id: str) -> dict:
         """Fetches video metadata from YouTube API."""
         if not self.youtube:
             logger.error("Google API not initialized.")
+            metrics.record('google.video_info', ok=False)
             return {}
 
-        try:
-            request = self.youtube.videos().list(
-                part="snippet,contentDetails",
-                id=video_id
-            )
-            response = request.execute()
+        # Errors are logged and answered with {}, so mark the sample failed by hand
+        with metrics.timed('google.video_info') as sample:
+            try:
+                request = self.youtube.videos().list(
+                    part="snippet,contentDetails",
+                    id=video_id
+                )
+                response = request.execute()
+            except Exception as e:
+                sample.ok = False
+                logger.error("Error fetching video info: %s", e)
+                return {}
 
+        try:
             if not response['items']:
-                logger.warning(f"No video found for ID: {video_id}")
+                logger.warning("No video found for ID: %s", video_id)
                 return {}
 
             item = response['items'][0]
@@ -42,6 +60,87 @@ class GoogleManager:
                 'duration': content_details['duration']
             }
         except Exception as e:
-            logger.error(f"Error fetching video info: {e}")
+            logger.error("Error fetching video info: %s", e)
             return {}
 
+    def get_videos_info(self, video_ids: list) -> dict:
+        """Fetches metadata for many videos, 50 IDs per API call. Returns {video_id: info}.
+        Each call is one google.videos_info sample."""
+        if not self.youtube:
+            logger.error("Google API not initialized.")
+            metrics.record('google.videos_info', ok=False)
+            return {}
+
+        results = {}
+        for i in range(0, len(video_ids), 50):
+            batch = video_ids[i:i + 50]
+            with metrics.timed('google.videos_info') as sample:
+                try:
+                    response = self.youtube.videos().list(
+                        part="snippet,contentDetails",
+                        id=",".join(batch),
+                        maxResults=50
+                    ).execute()
+                except Exception as e:
+                    sample.ok = False
+                    logger.error("Error fetching info for batch of %s videos: %s", len(batch), e)
+                    continue
+
+            for item in response.get('items', []):
+                snippet = item['snippet']
+                results[item['id']] = {
+                    'title': snippet['title'],
+                    'channel': snippet['channelTitle'],
+                    'published_dt': snippet['publishedAt'],
+                    'duration': item['contentDetails']['duration']
+                }
+        return results
+
+    def get_uploads_playlist_id(self, channel_ref: str) -> str:
+        """Resolves a channel ID (UC...), @handle or legacy username to its uploads playlist ID."""
+        # Channel IDs map directly onto their uploads playlist, no API call needed
+        if channel_ref.startswith('UC') and len(channel_ref) == 24:
+            return 'UU' + channel_ref[2:]
+
+        if not self.youtube:
+            logger.error("Google API not initialized.")
+            return None
+
+        try:
+            if channel_ref.startswith('@'):
+                request = self.youtube.channels().list(part="contentDetails", forHandle=channel_ref)
+            else:
+                request = self.youtube.channels().list(part="contentDetails", forUsername=channel_ref)
+            response = request.execute()
+
+            if not response.get('items'):
+                logger.warning("No channel found for: %s", channel_ref)
+                return None
+
+            return response['items'][0]['contentDetails']['relatedPlaylists']['uploads']
+        except Exception as e:
+            logger.error("Error resolving channel %s: %s", channel_ref, e)
+            return None
+
+    def iter_playlist_video_ids(self, playlist_id: str):
+        """Yields video IDs from a playlist page by page (50 per call).
+        Stop iterating to stop paging - no further pages are requested."""
+        if not self.youtube:
+            logger.error("Google API not initialized.")
+            return
+
+        page_token = None
+        while True:
+            response = self.youtube.playlistItems().list(
+                part="contentDetails",
+                playlistId=playlist_id,
+                maxResults=50,
+                pageToken=page_token
+            ).execute()
+
+            for item in response.get('items', []):
+                yield item['contentDetails']['videoId']
+
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
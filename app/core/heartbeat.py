@@ -0,0 +1,34 @@
+import os
+import time
+from typing import Optional, Tuple
+from app.settings import DAEMON_HEARTBEAT_FILE
+
+# The daemon rewrites DAEMON_HEARTBEAT_FILE after every sweep, with its sweep interval
+# as the content: it may have been started with --interval, which other processes
+# cannot see in the settings. It counts as gone after MISSED_BEATS intervals without one.
+MISSED_BEATS = 3
+
+def beat(interval: float):
+    DAEMON_HEARTBEAT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = DAEMON_HEARTBEAT_FILE.with_name(DAEMON_HEARTBEAT_FILE.name + ".tmp")
+    tmp.write_text(f"{interval:g}")
+    os.replace(tmp, DAEMON_HEARTBEAT_FILE)
+
+def clear():
+    DAEMON_HEARTBEAT_FILE.unlink(missing_ok=True)
+
+def read() -> Optional[Tuple[float, Optional[float]]]:
+    """(seconds since the last sweep, the daemon's interval), or None if no daemon left a
+    heartbeat. The interval is None in a heartbeat without one."""
+    try:
+        age = time.time() - DAEMON_HEARTBEAT_FILE.stat().st_mtime
+        text = DAEMON_HEARTBEAT_FILE.read_text().strip()
+    except FileNotFoundError:
+        return None
+    try:
+        return age, float(text)
+    except ValueError:
+        return age, None
+
+def responding(age: float, interval: float) -> bool:
+    return age <= MISSED_BEATS * interval
@@ -0,0 +1,102 @@
+import threading
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+from app.settings import CONCURRENT_DOWNLOADS
+
+class DownloadProgress(NamedTuple):
+    downloaded: int = 0  # Bytes
+    total: Optional[int] = None  # Bytes; None until yt-dlp knows or estimates it
+    speed: Optional[float] = None  # Bytes per second
+    eta: Optional[int] = None  # Seconds
+
+    @property
+    def percent(self) -> Optional[float]:
+        if not self.total:
+            return None
+        return min(100.0, 100.0 * self.downloaded / self.total)
+
+class ProgressSummary(NamedTuple):
+    active: int  # Downloads running now
+    limit: int  # Concurrency limit
+    queued: int  # Videos waiting for a slot, as last counted by DownloadManager
+    speed: float  # Aggregate bytes per second
+
+class ProgressTracker:
+    """In-memory snapshot of running downloads, keyed by row id.
+
+    Download threads write to it as yt-dlp reports progress; the UI reads it on a timer.
+    Reads copy a handful of small tuples, so polling it is far cheaper than querying
+    the videos table."""
+
+    def __init__(self, limit: int = CONCURRENT_DOWNLOADS):
+        self.lock = threading.Lock()
+        self.limit = limit
+        self.downloads: Dict[int, DownloadProgress] = {}
+        self.queued = 0
+
+    def start(self, video_id: int):
+        with self.lock:
+            self.downloads[video_id] = DownloadProgress()
+
+    def update(self, video_id: int, progress: DownloadProgress):
+        with self.lock:
+            if video_id in self.downloads:
+                self.downloads[video_id] = progress
+
+    def finish(self, video_id: int):
+        with self.lock:
+            self.downloads.pop(video_id, None)
+
+    def set_queued(self, count: int):
+        self.queued = count
+
+    def get(self, video_id: int) -> Optional[DownloadProgress]:
+        with self.lock:
+            return self.downloads.get(video_id)
+
+    def snapshot(self) -> Tuple[Dict[int, DownloadProgress], ProgressSummary]:
+        """Returns a copy of the running downloads and the footer totals."""
+        with self.lock:
+            downloads = dict(self.downloads)
+        speed = sum(p.speed or 0 for p in downloads.values())
+        return downloads, ProgressSummary(len(downloads), self.limit, self.queued, speed)
+
+class ProgressThrottle:
+    """Lets a progress report through at most once per interval, plus the final one."""
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self.next_time = 0.0
+
+    def ready(self, progress: DownloadProgress) -> bool:
+        now = time.monotonic()
+        done = progress.total is not None and progress.downloaded >= progress.total
+        if now < self.next_time and not done:
+            return False
+        self.next_time = now + self.interval
+        return True
+
+def format_bytes(count: Optional[float]) -> str:
+    if count is None:
+        return "?"
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if count < 1024 or unit == "GiB":
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1024
+
+def format_eta(seconds: Optional[int]) -> str:
+    if seconds is None:
+        return "--:--"
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+def progress_bar(percent: Optional[float], width: int = 10) -> str:
+    """Text bar for a Treeview cell, e.g. '█████░░░░░  52%'."""
+    if percent is None:
+        return "░" * width + "   ?%"
+    filled = int(round(percent / 100 * width))
+    return "█" * filled + "░" * (width - filled) + f" {percent:3.0f}%"
+
+# Shared tracker for the process
+tracker = ProgressTracker()
@@ -0,0 +1,193 @@
+import threading
+import time
+from typing import Optional
+from app.db import subscription as sub_db
+from app.core.google import GoogleManager
+from app.core.ytdlp import YTDLPManager
+from app.core.urls import canonical_url, parse_subscription_url
+from app.core.tunables import tunables
+from app.utils.logger import setup_logging
+
+logger = setup_logging()
+
+class SubscriptionManager:
+    """Polls subscribed channels and playlists and queues their new videos."""
+
+    def __init__(self, google_manager: GoogleManager, ytdlp_manager: YTDLPManager, video_manager):
+        self.google = google_manager
+        self.ytdlp = ytdlp_manager
+        self.video_manager = video_manager
+        self.running = False
+        self.thread = None
+        self.lock = threading.Lock()  # For thread-safe start/stop
+        self.poll_lock = threading.Lock()  # One poll pass at a time
+        self.max_channel_scan = 200  # Four API pages
+
+    def add_subscription(self, url: str) -> Optional[int]:
+        """Registers a channel or playlist URL and polls it once in the background."""
+        parsed = parse_subscription_url(url)
+        if not parsed:
+            logger.error("Not a channel or playlist URL: %s", url)
+            return None
+
+        kind, source_id = parsed
+        sub_id = sub_db.add_subscription(kind, source_id, url)
+        logger.info("Subscribed to %s %s (subscription %s)", kind, source_id, sub_id)
+
+        thread = threading.Thread(target=self.poll_all)
+        thread.start()
+        return sub_id
+
+    def start(self):
+        """Starts the periodic poll loop."""
+        with self.lock:
+            if self.running:
+                return
+            self.running = True
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+            logger.info("SubscriptionManager started.")
+
+    def stop(self):
+        """Stops the periodic poll loop."""
+        with self.lock:
+            if not self.running:
+                return
+            self.running = False
+            if self.thread:
+                self.thread.join(timeout=10)
+            logger.info("SubscriptionManager stopped.")
+
+    def _run(self):
+        """Main loop: poll everything, then sleep for subscription_poll_interval seconds,
+        read every second so a change applies to the current wait."""
+        while self.running:
+            try:
+                self.poll_all()
+            except Exception as e:
+                logger.error("Error in SubscriptionManager loop: %s", e)
+
+            started = time.monotonic()
+            while self.running and time.monotonic() - started < tunables.get('subscription_poll_interval'):
+                time.sleep(1)
+
+    def poll_all(self) -> int:
+        """Polls every active subscription. Returns the number of videos queued."""
+        if not self.poll_lock.acquire(blocking=False):
+            logger.debug("Subscription poll already in progress")
+            return 0
+
+        try:
+            total = 0
+            for sub in sub_db.get_active_subscriptions():
+                total += self.poll_subscription(sub)
+            if total:
+                logger.info("Subscription poll queued %s new video(s)", total)
+            return total
+        finally:
+            self.poll_lock.release()
+
+    def poll_subscription(self, sub: dict) -> int:
+        """Fetches entries newer than last_seen_id for one subscription and bulk-adds them.
+        Errors, DB ones included, are recorded on the subscription, so poll_all goes on."""
+        try:
+            playlist_id = sub['playlist_id']
+            if self.google.youtube and not playlist_id:
+                playlist_id = self._resolve_playlist_id(sub)
+
+            new_ids = listed = self._fetch_new_ids(sub, playlist_id)
+            if sub['kind'] == 'playlist':
+                new_ids = self._new_playlist_entries(sub, listed)
+            elif not sub['last_seen_id']:
+                # First poll: queue the newest subscription_backfill (maybe none), but
+                # listed[0] still becomes last_seen_id so later polls see new uploads
+                new_ids = listed[:tunables.get('subscription_backfill')]
+
+            added = 0
+            if new_ids:
+                added = self.video_manager.add_videos_bulk(
+                    [(canonical_url(v), v) for v in new_ids]
+                )
+            if sub['kind'] == 'playlist' and listed:
+                sub_db.add_entry_ids(sub['id'], listed)
+
+            # Entries are newest-first for channels, so the first one is the new high-water mark
+            last_seen_id = listed[0] if listed and sub['kind'] == 'channel' else None
+            sub_db.update_subscription_poll(sub['id'], last_seen_id, playlist_id)
+        except Exception as e:
+            logger.error("Error polling subscription %s (%s): %s", sub['id'], sub['source_id'], e)
+            try:
+                sub_db.update_subscription_poll(sub['id'], None, error_msg=str(e))
+            except Exception as record_error:
+                logger.error("Could not record the error for subscription %s: %s", sub['id'], record_error)
+            return 0
+
+        logger.info("Polled %s %s: %s new, %s queued", sub['kind'], sub['source_id'], len(new_ids), added)
+        return added
+
+    def _resolve_playlist_id(self, sub: dict) -> Optional[str]:
+        if sub['kind'] == 'playlist':
+            return sub['source_id']
+        return self.google.get_uploads_playlist_id(sub['source_id'])
+
+    def _new_playlist_entries(self, sub: dict, listed: list) -> list:
+        """Entries of a playlist not seen by an earlier poll. The first poll only picks up
+        the last subscription_backfill of them, where a playlist grows, not all of it."""
+        known = sub_db.get_entry_ids(sub['id'])
+        new_ids = [v for v in listed if v not in known]
+        if not known:
+            backfill = tunables.get('subscription_backfill')
+            new_ids = new_ids[-backfill:] if backfill else []
+        return new_ids
+
+    def _fetch_new_ids(self, sub: dict, playlist_id: Optional[str]) -> list:
+        """Returns new video IDs, newest first for channels.
+
+        Channel uploads are listed newest-first, so paging stops at last_seen_id and a
+        steady-state poll costs a single page. Playlists are ordered by position, so they
+        are listed in full (in position order) and _new_playlist_entries picks the new ones."""
+        is_channel = sub['kind'] == 'channel'
+        last_seen_id = sub['last_seen_id']
+        # First poll of a channel only lists its newest uploads, not the whole back catalogue;
+        # at least one, for last_seen_id, even when subscription_backfill is 0
+        limit = None
+        if is_channel and not last_seen_id:
+            limit = max(tunables.get('subscription_backfill'), 1)
+
+        if playlist_id:
+            source = self.google.iter_playlist_video_ids(playlist_id)
+        else:
+            source = self.ytdlp.iter_playlist_video_ids(self._listing_url(sub), limit=limit)
+
+        ids = []
+        seen = set()
+        try:
+            for video_id in source:
+                if is_channel and video_id == last_seen_id:
+                    break
+                if video_id not in seen:
+                    seen.add(video_id)
+                    ids.append(video_id)
+                if limit is not None and len(ids) >= limit:
+                    break
+                # Guard against a last_seen_id that was removed from the channel
+                if is_channel and len(ids) >= self.max_channel_scan:
+                    logger.warning("last_seen_id %s not found for %s, stopping scan", last_seen_id, sub['source_id'])
+                    break
+        finally:
+            source.close()
+
+        return ids
+
+    def _listing_url(self, sub: dict) -> str:
+        """URL yt-dlp should flat-extract for this subscription."""
+        if sub['kind'] == 'playlist':
+            return f"https://www.youtube.com/playlist?list={sub['source_id']}"
+
+        source_id = sub['source_id']
+        if source_id.startswith('@'):
+            return f"https://www.youtube.com/{source_id}/videos"
+        if source_id.startswith('UC'):
+            return f"https://www.youtube.com/channel/{source_id}/videos"
+        # /user/ and /c/ names: reuse the URL the user subscribed with
+        return sub['url'].rstrip('/') + '/videos'
@@ -0,0 +1,73 @@
+import csv
+import gzip
+import json
+from pathlib import Path
+from typing import Any, Dict, IO, Iterator, Optional, Tuple
+from app.core import urls
+from app.db import video as db
+from app.db.models import VIDEO_COLUMNS
+from app.utils.logger import setup_logging
+
+logger = setup_logging()
+
+# Library backups: the videos table, history included, as JSON Lines (one object per
+# row, lossless) or CSV (a header row; NULL and '' both read back as NULL). A name
+# ending in .gz is gzipped. Both directions stream, so memory use does not grow with
+# the library.
+
+def detect_format(path: str) -> str:
+    """The format named by the file extension, ignoring .gz; jsonl if there is none."""
+    suffixes = [s.lower() for s in Path(path).suffixes if s.lower() != '.gz']
+    if suffixes and suffixes[-1] == '.csv':
+        return 'csv'
+    return 'jsonl'
+
+def _open(path: str, mode: str) -> IO[str]:
+    # newline='' leaves line endings inside CSV fields to the csv module
+    if path.lower().endswith('.gz'):
+        # Level 6: most of the size gain of 9 at a fraction of the time
+        return gzip.open(path, mode + 't', encoding='utf-8', newline='', compresslevel=6)
+    return open(path, mode, encoding='utf-8', newline='')
+
+def export_videos(path: str, fmt: Optional[str] = None, batch_size: int = 5000) -> int:
+    """Writes every video to path. Returns the number of rows."""
+    fmt = fmt or detect_format(path)
+    count = 0
+    with _open(path, 'w') as out:
+        if fmt == 'csv':
+            writer = csv.writer(out)
+            writer.writerow(VIDEO_COLUMNS)
+            for row in db.iter_video_rows(batch_size):
+                writer.writerow(row)
+                count += 1
+        else:
+            encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+            for row in db.iter_video_rows(batch_size):
+                out.write(encode(dict(zip(VIDEO_COLUMNS, row))))
+                out.write('\n')
+                count += 1
+    logger.info("Exported %s video(s) to %s", count, path)
+    return count
+
+def read_rows(stream: IO[str], fmt: str) -> Iterator[Dict[str, Any]]:
+    """Rows of an export, one dict at a time. A row without a URL gets the canonical one
+    of its video ID; one with neither is skipped."""
+    if fmt == 'csv':
+        rows = ({k: v or None for k, v in row.items()} for row in csv.DictReader(stream))
+    else:
+        rows = (json.loads(line) for line in stream if line.strip())
+    for number, row in enumerate(rows, 1):
+        if not row.get('url'):
+            if not row.get('video_id'):
+                logger.warning("Skipping row %s: no url or video_id", number)
+                continue
+            row['url'] = urls.canonical_url(row['video_id'])
+        yield row
+
+def import_videos(path: str, fmt: Optional[str] = None, replace: bool = False,
+                  batch_size: int = 5000) -> Tuple[int, int]:
+    """Loads an export from path into the videos table. Videos already
+    present are skipped, or overwritten with replace. Returns (rows written, rows read)."""
+    fmt = fmt or detect_format(path)
+    with _open(path, 'r') as stream:
+        return db.import_videos(read_rows(stream, fmt), batch_size, replace)
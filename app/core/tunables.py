@@ -0,0 +1,167 @@
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from app.db import tunables as tunables_db
+from app.core import events
+from app.settings import (
+    ARCHIVE_DIR, CONCURRENT_DOWNLOADS, DAEMON_INTERVAL, DOWNLOAD_DIR, HISTORY_AFTER_DAYS,
+    SUBSCRIPTION_BACKFILL, SUBSCRIPTION_POLL_INTERVAL, THUMBNAIL_RETENTION_DAYS, TUNABLES_POLL_SECONDS
+)
+from app.utils.logger import setup_logging
+
+logger = setup_logging()
+
+def directory(text: str) -> str:
+    """Parser for path settings: the directory, created if missing."""
+    if not text.strip():
+        raise ValueError("must not be empty")
+    try:
+        Path(text).mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        raise ValueError(f"cannot create directory: {e}")
+    return text
+
+class Tunable(NamedTuple):
+    name: str
+    parse: Callable[[str], Any]  # Text (UI, CLI, DB) to value; raises ValueError
+    default: Any  # From app.settings, i.e. the environment
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+    help: str = ""
+
+# Settings running components read each time they use them, so a change applies
+# without a restart
+TUNABLES = (
+    Tunable('concurrent_downloads', int, CONCURRENT_DOWNLOADS, 1, 32,
+            "Downloads running at once; lowering it lets running downloads finish"),
+    Tunable('download_check_interval', float, 30.0, 1, 3600,
+            "Seconds between download scheduler passes (a finished download also starts one)"),
+    Tunable('clipboard_check_interval', float, 1.0, 0.1, 10,
+            "Seconds the clipboard monitor waits for a change before checking again"),
+    Tunable('metadata_batch', int, 50, 1, 50,
+            "Videos the daemon looks up metadata for per sweep (one API call)"),
+    Tunable('daemon_interval', int, DAEMON_INTERVAL, 1, 3600,
+            "Seconds between daemon sweeps"),
+    Tunable('subscription_poll_interval', int, SUBSCRIPTION_POLL_INTERVAL, 60, 7 * 86400,
+            "Seconds between subscription polls"),
+    Tunable('subscription_backfill', int, SUBSCRIPTION_BACKFILL, 0, 50,
+            "Videos queued when a channel (newest uploads) or playlist (last entries) is first polled"),
+    Tunable('history_after_days', int, HISTORY_AFTER_DAYS, 0, None,
+            "Days before closed/archived videos move to history (0 = never)"),
+    Tunable('thumbnail_retention_days', int, THUMBNAIL_RETENTION_DAYS, 0, None,
+            "Days cached thumbnails are kept (0 = forever)"),
+    Tunable('download_dir', directory, DOWNLOAD_DIR,
+            help="Where new downloads go; running downloads finish where they started"),
+    Tunable('archive_dir', directory, ARCHIVE_DIR,
+            help="Where archived videos are moved"),
+)
+
+class Tunables:
+    """Registry of runtime settings: a default per setting, overridden by rows of the
+    tunables table.
+
+    Values are read with get() wherever they are used, so new ones take effect at the
+    next use. set() and reset() write the table and apply the change at once in this
+    process; other processes pick it up within TUNABLES_POLL_SECONDS, once start()
+    has been called. Either way each change is published as a SETTING_CHANGED event,
+    for components that must act on it straight away."""
+
+    def __init__(self, definitions: Tuple[Tunable, ...]):
+        self.definitions: Dict[str, Tunable] = {t.name: t for t in definitions}
+        self.lock = threading.Lock()
+        self.values: Dict[str, Any] = {t.name: t.default for t in definitions}
+        self.overrides: Dict[str, str] = {}
+        self.thread: Optional[threading.Thread] = None
+        self.stop_event = threading.Event()
+        self.loaded = False  # The first load logs nothing: it only applies stored overrides
+
+    def get(self, name: str) -> Any:
+        return self.values[name]
+
+    def parse(self, name: str, text: str) -> Any:
+        """The value text stands for; raises KeyError for an unknown setting, ValueError
+        for a value it does not accept."""
+        tunable = self.definitions[name]
+        try:
+            value = tunable.parse(text.strip())
+        except ValueError as e:
+            raise ValueError(f"{name}: {e}") from None
+        if tunable.minimum is not None and value < tunable.minimum:
+            raise ValueError(f"{name}: must be at least {tunable.minimum:g}")
+        if tunable.maximum is not None and value > tunable.maximum:
+            raise ValueError(f"{name}: must be at most {tunable.maximum:g}")
+        return value
+
+    def set(self, name: str, text: str) -> Any:
+        """Validates, stores and applies a new value. Returns it."""
+        value = self.parse(name, text)
+        tunables_db.set_value(name, str(value))
+        with self.lock:
+            overrides = dict(self.overrides, **{name: str(value)})
+        self._apply(overrides)
+        return value
+
+    def reset(self, name: str):
+        """Goes back to the default."""
+        if name not in self.definitions:
+            raise KeyError(name)
+        tunables_db.delete_value(name)
+        with self.lock:
+            overrides = {k: v for k, v in self.overrides.items() if k != name}
+        self._apply(overrides)
+
+    def load(self):
+        """Reads the overrides from the DB and applies what changed."""
+        self._apply(tunables_db.get_values())
+
+    def describe(self) -> List[Tuple[Tunable, Any, bool]]:
+        """(definition, current value, overridden) per setting, for the UI and CLI."""
+        with self.lock:
+            return [(t, self.values[t.name], t.name in self.overrides) for t in self.definitions.values()]
+
+    def start(self):
+        """Loads the overrides, then keeps polling for changes made by other processes."""
+        tunables_db.init_db()
+        self.load()
+        if self.thread is None:
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self._watch, daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=5)
+            self.thread = None
+
+    def _watch(self):
+        while not self.stop_event.wait(TUNABLES_POLL_SECONDS):
+            try:
+                self.load()
+            except Exception as e:
+                logger.error("Error reading settings: %s", e)
+
+    def _apply(self, overrides: Dict[str, str]):
+        changed = []
+        with self.lock:
+            for name, tunable in self.definitions.items():
+                value = tunable.default
+                if name in overrides:
+                    try:
+                        value = self.parse(name, overrides[name])
+                    except ValueError as e:
+                        # E.g. a range narrowed since the value was stored; warn once
+                        if overrides[name] != self.overrides.get(name):
+                            logger.warning("Ignoring stored setting %s", e)
+                if value != self.values[name]:
+                    self.values[name] = value
+                    changed.append((name, value))
+            self.overrides = overrides
+            quiet, self.loaded = not self.loaded, True
+        for name, value in changed:
+            if not quiet:
+                logger.info("Setting %s = %s", name, value)
+            events.bus.publish(events.SETTING_CHANGED, name=name, value=value)
+
+# Shared registry for the process
+tunables = Tunables(TUNABLES)
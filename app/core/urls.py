@@ -0,0 +1,82 @@
+import re
+import urllib.parse
+from typing import List, Optional, Tuple
+
+# One pattern for every YouTube URL shape we accept. It starts at the "youtu" literal
+# rather than at an optional scheme/subdomain, so the regex engine can skip ahead to
+# candidate positions and a scan over arbitrary text stays a single cheap linear pass.
+# Scheme and subdomain (www., m., music.) never affect the ID, so they are not matched.
+_VIDEO_URL_RE = re.compile(r"""
+    youtu
+    (?<![A-Za-z0-9-]youtu)                   # host must start here (not notyoutube.com)
+    (?:
+        be(?:-nocookie)?\.com/
+        (?:
+            watch\?(?:[^\s&#]*&)*?v=         # /watch?v=ID, v= anywhere in the query
+          | (?:shorts|embed|live|v|e)/       # /shorts/ID, /embed/ID, /live/ID ...
+        )
+      | \.be/                                # youtu.be/ID
+    )
+    ([A-Za-z0-9_-]{11})
+    (?![A-Za-z0-9_-])
+""", re.VERBOSE | re.IGNORECASE)
+
+# A bare video ID typed into the entry box. IDs are 11 characters today; stay lenient.
+_PLAIN_ID_RE = re.compile(r"[A-Za-z0-9_-]{8,20}")
+
+def canonical_url(video_id: str) -> str:
+    """Returns the canonical watch URL for a video ID."""
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+def extract_video_ids(text: str) -> List[str]:
+    """Returns every video ID found in text, in order of first appearance, without duplicates."""
+    if not text:
+        return []
+    return list(dict.fromkeys(_VIDEO_URL_RE.findall(text)))
+
+def extract_video_id(text: str) -> Optional[str]:
+    """Returns the first video ID in a URL, or the input itself if it is a bare video ID."""
+    if not text:
+        return None
+    text = text.strip()
+
+    match = _VIDEO_URL_RE.search(text)
+    if match:
+        return match.group(1)
+    if _PLAIN_ID_RE.fullmatch(text):
+        return text
+    return None
+
+def contains_youtube_url(text: str) -> bool:
+    """Checks whether text contains at least one YouTube video URL."""
+    if not text or not isinstance(text, str):
+        return False
+    return _VIDEO_URL_RE.search(text) is not None
+
+def parse_subscription_url(input_str: str) -> Optional[Tuple[str, str]]:
+    """Parses a channel or playlist URL into (kind, source_id), or None if it is neither."""
+    input_str = input_str.strip()
+    try:
+        parsed = urllib.parse.urlparse(input_str)
+    except Exception:
+        return None
+
+    hostname = parsed.hostname
+    if not hostname or not (hostname == 'youtube.com' or hostname.endswith('.youtube.com')):
+        return None
+
+    # A watch URL with &list= is a single video, not a subscription
+    if parsed.path == '/playlist':
+        playlist_id = urllib.parse.parse_qs(parsed.query).get('list', [None])[0]
+        if playlist_id:
+            return ('playlist', playlist_id)
+        return None
+
+    parts = [p for p in parsed.path.split('/') if p]
+    if not parts:
+        return None
+    if parts[0].startswith('@'):
+        return ('channel', parts[0])
+    if parts[0] in ('channel', 'user', 'c') and len(parts) > 1:
+        return ('channel', parts[1])
+    return None
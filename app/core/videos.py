@@ -5,10 +5,14 @@ import subprocess
 import sys
 from pathlib import Path
 from app.db import video as db
+from app.db.models import VIDEO_COLUMNS
 from app.core.google import GoogleManager
 from app.core.ytdlp import YTDLPManager
-from app.settings import PLAYER_EXE_PATH, ARCHIVE_DIR
-from app.utils.logger import setup_logging
+from app.core import events
+from app.core.tunables import tunables
+from app.settings import PLAYER_EXE_PATH
+from app.utils.logger import setup_logging, log_duration
+from app.utils import metrics
 
 logger = setup_logging()
 
@@ -19,24 +23,73 @@ class VideoManager:
         self.download_manager = download_manager
 
     def add_video(self, url: str, video_id: str):
-        """Adds a video to the database and starts background processing for metadata."""
-        logger.info(f"Adding video: {url} (ID: {video_id})")
-        v_id = db.add_video(url, video_id)
-        db.update_video_status(v_id, 'open')
-        # Set download_needed to 'no' initially - user will mark as 'yes' to queue for download
-        db.set_download_needed(v_id, 'no')
-        self.queue_video_for_download(v_id)
+        """Adds a video, queued for download, and fetches its metadata in the background.
+        A video added before is reopened if it was closed or failed, else left alone;
+        either way its metadata is not fetched again."""
+        logger.info("Adding video: %s (ID: %s)", url, video_id)
+        v_id, outcome = db.add_video(url, video_id)
+        if outcome == db.EXISTS:
+            logger.info("Video %s is already in the queue as %s", video_id, v_id)
+            return
+
+        metrics.record("video_reopened" if outcome == db.REOPENED else "video_added", video_id=v_id)
+        events.bus.publish(events.VIDEO_ADDED, v_id)
+        if self.download_manager:
+            self.download_manager.start_if_needed()
+        if outcome == db.REOPENED:
+            logger.info("Reopened video %s", v_id)
+            return
 
         # Run background task for metadata only
         thread = threading.Thread(target=self._process_video, args=(v_id, video_id, url))
         thread.start()
 
+    def add_videos_bulk(self, entries: list) -> int:
+        """Adds many (url, video_id) pairs in one transaction, queued for download.
+        Known YouTube IDs are reopened or left alone as in add_video. Metadata of the new
+        ones is fetched in batches on one thread. Returns the count queued."""
+        queued = db.add_videos_bulk(entries, status='open', download_needed='yes')
+        if not queued:
+            return 0
+
+        inserted = [(db_id, video_id) for db_id, video_id, outcome in queued if outcome == db.ADDED]
+        logger.info("Bulk added %s video(s), reopened %s", len(inserted), len(queued) - len(inserted))
+        for db_id, _, outcome in queued:
+            metrics.record("video_reopened" if outcome == db.REOPENED else "video_added", video_id=db_id)
+            events.bus.publish(events.VIDEO_ADDED, db_id)
+        if self.download_manager:
+            self.download_manager.start_if_needed()
+
+        if inserted:
+            thread = threading.Thread(target=self.fetch_metadata_bulk, args=(inserted,))
+            thread.start()
+        return len(queued)
+
+    def fetch_metadata_bulk(self, inserted: list):
+        """Fetches metadata for (db_id, video_id) pairs, 50 per API call."""
+        try:
+            infos = self.google.get_videos_info([video_id for _, video_id in inserted])
+            for db_id, video_id in inserted:
+                info = infos.get(video_id)
+                if info:
+                    db.update_video_metadata(
+                        db_id,
+                        info.get('title', ''),
+                        info.get('channel', ''),
+                        info.get('duration', ''),
+                        info.get('published_dt', '')
+                    )
+                    events.bus.publish(events.METADATA_FETCHED, db_id)
+        except Exception as e:
+            logger.error("Error processing bulk metadata: %s", e)
+
     def _process_video(self, db_id: int, video_id: str, url: str):
         """Fetches metadata for a video. Downloads are handled by DownloadManager."""
-        logger.info(f"Processing video {db_id} ({video_id})")
+        logger.info("Processing video %s (%s)", db_id, video_id)
         try:
             # Fetch Metadata only - downloads are handled by DownloadManager
-            info = self.google.get_video_info(video_id)
+            with log_duration(logger, "metadata", db_id):
+                info = self.google.get_video_info(video_id)
             if info:
                 db.update_video_metadata(
                     db_id, 
@@ -48,24 +101,38 @@ class VideoManager:
                 # Update URL to canonical YouTube format
                 canonical_url = f"https://www.youtube.com/watch?v={video_id}"
                 db.update_video_url(db_id, canonical_url)
-                logger.info(f"Updated URL for video {db_id} to canonical format: {canonical_url}")
+                logger.info("Updated URL for video %s to canonical format: %s", db_id, canonical_url)
+                events.bus.publish(events.METADATA_FETCHED, db_id)
             
         except Exception as e:
-            logger.error(f"Error processing video {video_id}: {e}")
+            logger.error("Error processing video %s: %s", video_id, e)
             db.update_video_status(db_id, 'error', str(e))
+            events.bus.publish(events.VIDEO_ERROR, db_id, error=str(e))
 
     def get_all_videos(self):
         return db.get_all_videos()
 
+    def get_active_videos(self, columns=VIDEO_COLUMNS):
+        return db.get_videos_by_status(db.ACTIVE_STATUSES, columns)
+
+    def get_videos_changed_since(self, modified_dt, columns=VIDEO_COLUMNS):
+        return db.get_videos_changed_since(modified_dt, columns)
+
+    def get_videos_by_ids(self, video_ids: list, columns=VIDEO_COLUMNS):
+        return db.get_videos_by_ids(video_ids, columns)
+
+    def search_videos(self, query: str, sort: str, descending: bool, after, limit: int, columns=VIDEO_COLUMNS):
+        return db.search_videos(query, sort, descending, after, limit, columns)
+
     def play_video(self, video_id: int):
         video = db.get_video_by_id(video_id)
-        if not video or not video['file_path']:
+        if not video or not video.file_path:
             logger.warning("Video or file not found.")
             return
 
-        file_path = video['file_path']
+        file_path = video.file_path
         if not os.path.exists(file_path):
-             logger.error(f"File not found on disk: {file_path}")
+             logger.error("File not found on disk: %s", file_path)
              db.update_video_status(video_id, 'error', 'File not found')
              return
 
@@ -74,52 +141,52 @@ class VideoManager:
             return
 
         try:
-            logger.info(f'Playing video: "{PLAYER_EXE_PATH}" "{file_path}"')
+            logger.info('Playing video: "%s" "%s"', PLAYER_EXE_PATH, file_path)
             subprocess.Popen(f'"{PLAYER_EXE_PATH}" "{file_path}"', shell=True)
             db.mark_video_viewed(video_id)
         except Exception as e:
-            logger.error(f"Failed to play video: {e}")
+            logger.error("Failed to play video: %s", e)
 
     def delete_video(self, video_id: int):
         video = db.get_video_by_id(video_id)
         if not video:
             return
 
-        file_path = video['file_path']
+        file_path = video.file_path
         if file_path and os.path.exists(file_path):
             try:
                 os.remove(file_path)
-                logger.info(f"Deleted file: {file_path}")
+                logger.info("Deleted file: %s", file_path)
             except Exception as e:
-                logger.error(f"Failed to delete file: {e}")
+                logger.error("Failed to delete file: %s", e)
         
         db.delete_video_record(video_id)
 
     def archive_video(self, video_id: int):
         video = db.get_video_by_id(video_id)
-        if not video or not video['file_path']:
+        if not video or not video.file_path:
             return
 
-        file_path = video['file_path']
+        file_path = video.file_path
         if not os.path.exists(file_path):
-            logger.error(f"File not found for archiving: {file_path}")
+            logger.error("File not found for archiving: %s", file_path)
             return
 
         try:
             filename = os.path.basename(file_path)
-            dest_path = Path(ARCHIVE_DIR) / filename
+            dest_path = Path(tunables.get('archive_dir')) / filename
             shutil.move(file_path, dest_path)
-            logger.info(f"Archived file to: {dest_path}")
+            logger.info("Archived file to: %s", dest_path)
             
             db.update_video_filepath(video_id, str(dest_path))
             db.update_video_status(video_id, 'archive')
         except Exception as e:
-            logger.error(f"Failed to archive file: {e}")
+            logger.error("Failed to archive file: %s", e)
             db.update_video_status(video_id, 'error', f"Archive failed: {e}")
 
     def queue_video_for_download(self, video_id: int):
         """Marks a video as queued for download."""
-        logger.info(f"Queueing video {video_id} for download")
+        logger.info("Queueing video %s for download", video_id)
         db.set_download_needed(video_id, 'yes')
         # Start DownloadManager if available
         if self.download_manager:
@@ -127,30 +194,33 @@ class VideoManager:
 
     def mark_download_complete(self, youtube_id: str, file_path: str):
         """Updates the video record upon download completion."""
-        logger.info(f"Handling download completion for ID: {youtube_id}")
+        logger.info("Handling download completion for ID: %s", youtube_id)
         
         video = db.get_video_by_youtube_id(youtube_id)
         if not video:
-            logger.error(f"Video with YouTube ID {youtube_id} not found in database.")
+            logger.error("Video with YouTube ID %s not found in database.", youtube_id)
             return
 
-        db_id = video['id']
+        db_id = video.id
+        # Set download_needed to 'down' to indicate download is complete. First, so a
+        # progress checkpoint still in flight cannot record the partial file again
+        # after update_video_filepath has cleared it
+        db.set_download_needed(db_id, 'down')
         db.update_video_filepath(db_id, file_path)
         db.update_video_status(db_id, 'down')
-        # Set download_needed to 'down' to indicate download is complete
-        db.set_download_needed(db_id, 'down')
-        logger.info(f"Successfully marked video {db_id} as 'down'.")
+        logger.info("Successfully marked video %s as 'down'.", db_id)
+        events.bus.publish(events.DOWNLOAD_FINISHED, db_id, file_path=file_path)
 
     def open_web_url(self, video_id: int):
         """Opens the video URL in the default browser."""
         video = db.get_video_by_id(video_id)
-        if not video or not video['url']:
-            logger.warning(f"Video {video_id} or URL not found.")
+        if not video or not video.url:
+            logger.warning("Video %s or URL not found.", video_id)
             return
 
-        url = video['url']
+        url = video.url
         try:
-            logger.info(f"Opening URL in browser: {url}")
+            logger.info("Opening URL in browser: %s", url)
             # Cross-platform URL opening - let OS decide the browser
             # subprocess.Popen doesn't wait for process output or error codes
             if sys.platform == 'win32':
@@ -161,4 +231,4 @@ class VideoManager:
                 # Linux and other Unix-like systems
                 subprocess.Popen(['xdg-open', url])
         except Exception as e:
-            logger.error(f"Failed to open URL in browser: {e}")
+            logger.error("Failed to open URL in browser: %s", e)
@@ -1,33 +1,90 @@
 import subprocess
 import os
 import sys
+from collections import deque
 from pathlib import Path
-from app.settings import YTDLP_CONFIG_PATH, DOWNLOAD_DIR, BASE_DIR
+from typing import Callable, Optional
+from app.core.progress import DownloadProgress
+from app.core.tunables import tunables
+from app.settings import YTDLP_CONFIG_PATH, YTDLP_PATH, YTDLP_CALLBACK
 from app.utils.logger import setup_logging
 
 logger = setup_logging()
 
+# Machine-readable progress line; NA marks fields yt-dlp does not know (yet)
+PROGRESS_PREFIX = "ytm-progress"
+PROGRESS_TEMPLATE = (
+    f"download:{PROGRESS_PREFIX} %(progress.downloaded_bytes)s "
+    "%(progress.total_bytes,progress.total_bytes_estimate)s %(progress.speed)s %(progress.eta)s"
+)
+
+def parse_progress_line(line: str) -> Optional[DownloadProgress]:
+    """Parses a PROGRESS_TEMPLATE line, or returns None for any other output."""
+    if not line.startswith(PROGRESS_PREFIX):
+        return None
+    fields = line.split()[1:]
+    if len(fields) != 4:
+        return None
+
+    def number(value: str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+
+    downloaded, total, speed, eta = (number(field) for field in fields)
+    return DownloadProgress(
+        downloaded=int(downloaded or 0),
+        total=int(total) if total else None,
+        speed=speed,
+        eta=int(eta) if eta is not None else None,
+    )
+
+# yt-dlp downloads into FILE + PART_SUFFIX and renames it when done; fragmented
+# formats also leave FILE.part-FragN pieces and a FILE.ytdl state file
+PART_SUFFIX = ".part"
+PART_PATTERNS = ("*.part", "*.part-Frag*", "*.ytdl")
+
+def partial_owner(path: Path) -> str:
+    """The .part path a yt-dlp leftover (PART_PATTERNS) belongs to."""
+    name = path.name
+    if name.endswith(".ytdl"):
+        name = name[:-len(".ytdl")] + PART_SUFFIX
+    elif ".part-Frag" in name:
+        name = name[:name.index(".part-Frag")] + PART_SUFFIX
+    return str(path.with_name(name))
+
 class YTDLPManager:
-    def download_video(self, url: str, video_id: str) -> str:
-        """Downloads the video using yt-dlp and returns the file path."""
+    def _common_args(self) -> list:
+        return [
+            YTDLP_PATH,
+            "--config-location", str(YTDLP_CONFIG_PATH),
+            "--paths", f"home:{tunables.get('download_dir')}", # Combine key and value
+        ]
+
+    def resolve_filename(self, url: str) -> str:
+        """The path yt-dlp will download url to."""
+        logger.info("Resolving filename for %s", url)
+        result = subprocess.run(self._common_args() + ["--print", "filename", url],
+                                capture_output=True, text=True, check=True)
+        return result.stdout.strip()
+
+    def download_video(self, url: str, video_id: str,
+                       on_progress: Optional[Callable[[DownloadProgress], None]] = None,
+                       file_path: Optional[str] = None) -> str:
+        """Downloads the video using yt-dlp and returns the file path.
+        on_progress, if given, is called from this thread with each progress update.
+        With file_path (from resolve_filename, possibly in an earlier run) the video is
+        written there, continuing from file_path + PART_SUFFIX if it exists."""
         try:
             # 1. Get the filename first
-            
-            cmd_common = [
-                "yt-dlp",
-                "--config-location", str(YTDLP_CONFIG_PATH),
-                "--paths", f"home:{DOWNLOAD_DIR}", # Combine key and value
-            ]
-            
-            cmd_get_filename = cmd_common + ["--print", "filename", url]
-            
-            logger.info(f"Resolving filename for {url}")
-            result = subprocess.run(cmd_get_filename, capture_output=True, text=True, check=True)
-            file_path = result.stdout.strip()
+            cmd_common = self._common_args()
+            if file_path is None:
+                file_path = self.resolve_filename(url)
             
             # 2. Download the video with exec callback
             # Use the batch file wrapper to handle quoting and environment
-            callback_bat = BASE_DIR / "run_callback.bat"
+            callback_bat = YTDLP_CALLBACK
             
             # We wrap video_id in quotes to prevent issues if it starts with a dash
             # However, argparse might still treat it as a flag if we are not careful.
@@ -36,20 +93,69 @@ class YTDLPManager:
             
             exec_cmd = f'"{callback_bat}" --downloaded --videoid="{video_id}" --file_path {{}}'
             
-            cmd_download = cmd_common + ["--exec", exec_cmd, url]
+            cmd_download = cmd_common + [
+                # The exact path, even if download_dir or the metadata in the output
+                # template changed since it was resolved, so an existing .part is found
+                "--output", file_path.replace("%", "%%"), "--continue",
+                "--exec", exec_cmd,
+                "--newline", "--progress-template", PROGRESS_TEMPLATE,
+                url
+            ]
             
-            logger.info(f"Downloading {url} with callback...")
-            subprocess.run(cmd_download, check=True)
+            logger.info("Downloading %s with callback...", url)
+            self._run_download(cmd_download, on_progress)
             
             # Verify file exists
             if not os.path.exists(file_path):
-                logger.warning(f"Expected file {file_path} not found after download.")
+                logger.warning("Expected file %s not found after download.", file_path)
                 
             return file_path
 
         except subprocess.CalledProcessError as e:
-            logger.error(f"yt-dlp error: {e.stderr if e.stderr else e}")
+            logger.error("yt-dlp error: %s", e.stderr if e.stderr else e)
             raise e
         except Exception as e:
-            logger.error(f"Error in download: {e}")
+            logger.error("Error in download: %s", e)
             raise e
+
+    def _run_download(self, cmd: list, on_progress: Optional[Callable[[DownloadProgress], None]]):
+        """Runs yt-dlp, turning its progress lines into on_progress calls.
+        Raises CalledProcessError carrying the last lines of output on failure."""
+        tail = deque(maxlen=20)
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                text=True, errors="replace", bufsize=1)
+        with proc:
+            for line in proc.stdout:
+                line = line.rstrip()
+                progress = parse_progress_line(line)
+                if progress is None:
+                    tail.append(line)
+                    logger.debug("yt-dlp: %s", line)
+                elif on_progress:
+                    on_progress(progress)
+
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd, stderr="\n".join(tail))
+
+    def iter_playlist_video_ids(self, url: str, limit: int = None):
+        """Yields video IDs from a channel or playlist URL using yt-dlp flat extraction.
+        IDs are streamed as yt-dlp prints them; closing the generator kills the process,
+        so a caller that stops at a known ID never waits for the full listing."""
+        # The download config forces --no-playlist, so it is deliberately not used here
+        cmd = [YTDLP_PATH, "--flat-playlist", "--ignore-errors", "--print", "id"]
+        if limit:
+            cmd += ["--playlist-end", str(limit)]
+        cmd.append(url)
+
+        logger.info("Listing entries for %s", url)
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        try:
+            for line in proc.stdout:
+                video_id = line.strip()
+                if video_id:
+                    yield video_id
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+            proc.stdout.close()
+            proc.wait()
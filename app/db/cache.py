@@ -0,0 +1,146 @@
+import collections
+import datetime
+import threading
+from typing import Callable, Dict, Iterable, Optional
+from app.db.models import Video
+from app.settings import DB_BUSY_TIMEOUT
+
+class VideoCache:
+    """Bounded identity map of full Video rows, keyed by primary key and by YouTube ID.
+
+    Writers in app.db.video invalidate the rows they change once they have committed.
+    Commits by other processes (daemon, CLI) are found through PRAGMA data_version on
+    a connection the cache keeps open: when it moves, the rows modified since the last
+    check are dropped. That relies on every writer stamping modified_dt, as the
+    incremental queue refresh already does. Cached records are shared; treat them as
+    read-only."""
+
+    def __init__(self, size: int, connect: Callable):
+        self.size = size
+        self.connect = connect
+        self.lock = threading.Lock()
+        self.rows: collections.OrderedDict = collections.OrderedDict()  # id -> Video, oldest use first
+        self.youtube_ids: Dict[str, int] = {}
+        # Bumped by every invalidation: a row read before a write committed is not stored
+        self.generation = 0
+        self.conn = None
+        self.data_version = None
+        self.synced_at: Optional[datetime.datetime] = None
+        self.hits = self.misses = self.invalidations = 0
+
+    def get(self, video_id: int) -> Optional[Video]:
+        """The cached row, or None on a miss."""
+        if not self.size:
+            return None
+        with self.lock:
+            self._sync()
+            video = self.rows.get(video_id)
+            if video is None:
+                self.misses += 1
+                return None
+            self.rows.move_to_end(video_id)
+            self.hits += 1
+            return video
+
+    def get_by_youtube_id(self, youtube_id: str) -> Optional[Video]:
+        if not self.size:
+            return None
+        with self.lock:
+            self._sync()
+            video_id = self.youtube_ids.get(youtube_id)
+            if video_id is None:
+                self.misses += 1
+                return None
+            self.rows.move_to_end(video_id)
+            self.hits += 1
+            return self.rows[video_id]
+
+    def token(self) -> int:
+        """Take before reading a row from the DB, and hand to put() with it."""
+        return self.generation
+
+    def put(self, video: Video, token: int):
+        """Stores a row read with all columns, unless a write came in since token()."""
+        if not self.size:
+            return
+        with self.lock:
+            if token != self.generation:
+                return
+            self._drop(video.id)
+            self.rows[video.id] = video
+            if video.video_id:
+                self.youtube_ids[video.video_id] = video.id
+            while len(self.rows) > self.size:
+                _, oldest = self.rows.popitem(last=False)
+                self._unmap(oldest)
+
+    def invalidate(self, video_ids: Iterable[int] = (), youtube_ids: Iterable[str] = ()):
+        """Drops rows after a write; call once it has committed."""
+        with self.lock:
+            self.generation += 1
+            for video_id in video_ids:
+                self._drop(video_id)
+            for youtube_id in youtube_ids:
+                video_id = self.youtube_ids.get(youtube_id)
+                if video_id is not None:
+                    self._drop(video_id)
+
+    def clear(self, close: bool = False):
+        """Drops every row, e.g. after a write to many rows. close also closes the
+        version connection, for when the DB file changes (init_db)."""
+        with self.lock:
+            self.generation += 1
+            self.rows.clear()
+            self.youtube_ids.clear()
+            if close and self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+    def stats(self) -> Dict[str, float]:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.rows), "capacity": self.size,
+                "hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+    def _sync(self):
+        # Under the lock. data_version only moves for commits on other connections,
+        # so every in-process write moves it too; most are then already invalidated.
+        if self.conn is None:
+            self.conn = self.connect(check_same_thread=False)
+            self.conn.row_factory = None
+            self.data_version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+            self.synced_at = datetime.datetime.now()
+            # Rows cached before the connection existed have not been checked
+            self.rows.clear()
+            self.youtube_ids.clear()
+            return
+
+        version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+        if version == self.data_version:
+            return
+        now = datetime.datetime.now()
+        # Rows being read now may predate the commit that moved it
+        self.generation += 1
+        if self.rows:
+            # A writer stamps modified_dt before it commits, and may wait up to the
+            # busy timeout for the lock in between
+            since = self.synced_at - datetime.timedelta(seconds=DB_BUSY_TIMEOUT + 5)
+            changed = self.conn.execute('SELECT id FROM videos WHERE modified_dt > ?', (since,)).fetchall()
+            for (video_id,) in changed:
+                self._drop(video_id)
+        self.data_version = version
+        self.synced_at = now
+
+    def _drop(self, video_id: int):
+        video = self.rows.pop(video_id, None)
+        if video is not None:
+            self._unmap(video)
+            self.invalidations += 1
+
+    def _unmap(self, video: Video):
+        if video.video_id and self.youtube_ids.get(video.video_id) == video.id:
+            del self.youtube_ids[video.video_id]
@@ -0,0 +1,73 @@
+import collections
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+Key = Tuple[Optional[str], Optional[str]]  # (status, download_needed)
+
+class StatusCounts:
+    """In-memory histogram of videos by (status, download_needed).
+
+    Loaded with one GROUP BY query, then kept in step by the state-transition
+    functions of app.db.video as they commit, so asking whether there is work costs
+    no query. Writes by other processes are picked up by reload(), which
+    DownloadManager calls whenever it starts, and by the reload that snapshot() does
+    once the counts are MAX_AGE seconds old."""
+
+    MAX_AGE = 60
+
+    def __init__(self, load: Callable[[], Dict[Key, int]]):
+        self.load = load
+        self.lock = threading.Lock()
+        self.counts: collections.Counter = collections.Counter()
+        self.loaded_at: Optional[float] = None  # Monotonic; None until loaded, or after invalidate()
+        self.moves = 0  # Transitions applied; a load that overlaps one may have missed it
+
+    def reload(self) -> Dict[Key, int]:
+        moves = self.moves
+        counts = collections.Counter(self.load())
+        with self.lock:
+            self.counts = counts
+            # A transition that committed during the query may be counted twice or
+            # not at all: keep the result, but load again on the next snapshot()
+            self.loaded_at = time.monotonic() if self.moves == moves else None
+            return dict(counts)
+
+    def snapshot(self) -> Dict[Key, int]:
+        """The counts, loaded first if they never were or are stale."""
+        with self.lock:
+            if self.loaded_at is not None and time.monotonic() - self.loaded_at < self.MAX_AGE:
+                return dict(self.counts)
+        return self.reload()
+
+    def peek(self) -> Dict[Key, int]:
+        """The counts as they are, never querying; for the UI thread."""
+        with self.lock:
+            return dict(self.counts)
+
+    def count(self, status: Optional[str] = None, download_needed: Optional[str] = None,
+              counts: Optional[Dict[Key, int]] = None) -> int:
+        """Rows matching the given status and/or download_needed, from counts or a snapshot()."""
+        if counts is None:
+            counts = self.snapshot()
+        return sum(n for (s, d), n in counts.items()
+                   if (status is None or s == status) and (download_needed is None or d == download_needed))
+
+    def add(self, key: Key, n: int = 1):
+        with self.lock:
+            self.counts[key] += n
+            self.moves += 1
+
+    def move(self, old: Key, new: Key):
+        if old == new:
+            return
+        with self.lock:
+            self.counts[old] -= 1
+            self.counts[new] += 1
+            self.moves += 1
+
+    def invalidate(self):
+        """After a write to many rows: the next snapshot() loads again."""
+        with self.lock:
+            self.loaded_at = None
+            self.moves += 1
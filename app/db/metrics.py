@@ -0,0 +1,119 @@
+import datetime
+import math
+from typing import List, Dict, Any, Optional, Tuple
+from app.db.video import get_db_connection
+from app.utils.logger import setup_logging
+
+logger = setup_logging()
+
+def init_db():
+    """Initializes the metrics tables: raw samples and their per-day rollups."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    # One row per timed call or counted event; duration_ms is NULL for plain counters
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS metrics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            stage TEXT NOT NULL,
+            video_id INTEGER,
+            duration_ms REAL,
+            bytes INTEGER,
+            ok INTEGER DEFAULT 1,
+            create_dt TIMESTAMP
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_metrics_create_dt ON metrics (create_dt)')
+
+    # Raw samples are folded into this table per day and stage, then pruned
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS metrics_daily (
+            day TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            count INTEGER,
+            errors INTEGER,
+            total_ms REAL,
+            p50_ms REAL,
+            p95_ms REAL,
+            bytes INTEGER,
+            PRIMARY KEY (day, stage)
+        )
+    ''')
+
+    conn.commit()
+    conn.close()
+
+def add_samples(samples: List[Tuple[str, Optional[int], Optional[float], Optional[int], bool, datetime.datetime]]):
+    """Inserts (stage, video_id, duration_ms, bytes, ok, create_dt) samples in one transaction."""
+    if not samples:
+        return
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.executemany('''
+        INSERT INTO metrics (stage, video_id, duration_ms, bytes, ok, create_dt)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', samples)
+    conn.commit()
+    conn.close()
+
+def get_samples_since(since: datetime.datetime) -> List[Dict[str, Any]]:
+    """Retrieves raw samples recorded after the given time."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT stage, video_id, duration_ms, bytes, ok, create_dt FROM metrics
+        WHERE create_dt > ? ORDER BY create_dt
+    ''', (since,))
+    rows = cursor.fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
+
+def get_daily(since_day: str) -> List[Dict[str, Any]]:
+    """Retrieves rollup rows from since_day (YYYY-MM-DD) on."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT * FROM metrics_daily WHERE day >= ? ORDER BY day, stage', (since_day,))
+    rows = cursor.fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
+
+def rollup(keep_raw_days: int) -> int:
+    """Folds raw samples of finished days into metrics_daily and deletes raw samples
+    older than keep_raw_days. Re-running is safe: a day's rollup is rebuilt from
+    whatever raw samples remain. Returns the number of (day, stage) rows written."""
+    today = datetime.date.today()
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    cursor.execute('''
+        SELECT substr(create_dt, 1, 10) AS day, stage, duration_ms, bytes, ok FROM metrics
+        WHERE create_dt < ? ORDER BY day, stage
+    ''', (datetime.datetime.combine(today, datetime.time()),))
+    groups: Dict[Tuple[str, str], List] = {}
+    for row in cursor.fetchall():
+        groups.setdefault((row['day'], row['stage']), []).append(row)
+
+    for (day, stage), rows in groups.items():
+        durations = sorted(r['duration_ms'] for r in rows if r['duration_ms'] is not None)
+        cursor.execute('''
+            INSERT OR REPLACE INTO metrics_daily (day, stage, count, errors, total_ms, p50_ms, p95_ms, bytes)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            day, stage, len(rows), sum(1 for r in rows if not r['ok']), sum(durations),
+            percentile(durations, 50), percentile(durations, 95),
+            sum(r['bytes'] or 0 for r in rows)
+        ))
+
+    cutoff = datetime.datetime.combine(today - datetime.timedelta(days=keep_raw_days), datetime.time())
+    cursor.execute('DELETE FROM metrics WHERE create_dt < ?', (cutoff,))
+
+    conn.commit()
+    conn.close()
+    return len(groups)
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
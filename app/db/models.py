@@ -0,0 +1,112 @@
+import datetime
+import functools
+from itertools import repeat
+from typing import Any, Callable, Dict, Optional, Sequence
+
+# Columns of the videos table, in the order the readers in app.db.video select them
+VIDEO_COLUMNS = (
+    'id', 'url', 'video_id', 'title', 'channel', 'duration', 'duration_secs', 'file_path',
+    'status', 'download_needed', 'viewed', 'error_msg', 'create_dt', 'modified_dt',
+    'published_dt', 'download_dt', 'view_dt', 'delete_dt', 'queued_dt', 'partial_path', 'partial_bytes',
+)
+TIMESTAMP_COLUMNS = frozenset(
+    ('create_dt', 'modified_dt', 'published_dt', 'download_dt', 'view_dt', 'delete_dt', 'queued_dt')
+)
+
+# Projections: only the columns a caller reads
+# Queue view rows (VideoListModel, MainWindow._row_values, thumbnails)
+LIST_COLUMNS = (
+    'id', 'video_id', 'title', 'channel', 'duration_secs', 'status', 'error_msg',
+    'create_dt', 'modified_dt', 'published_dt',
+)
+# What DownloadManager needs to start a download
+DOWNLOAD_COLUMNS = ('id', 'url', 'video_id', 'queued_dt', 'partial_path')
+
+def parse_timestamp(value: Any) -> Optional[datetime.datetime]:
+    """Stored timestamp (ISO 8601 text, as written by sqlite3 or the API) to datetime.
+    Unparseable values read as None."""
+    if value is None or isinstance(value, datetime.datetime):
+        return value
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+class Video:
+    """One row of the videos table, with typed values: timestamps are datetimes.
+
+    A slotted record costs about a third of the dict the readers used to return, and
+    attribute reads are cheaper than string-keyed lookups. A record read with a column
+    projection only has those attributes; reading another raises AttributeError."""
+
+    __slots__ = VIDEO_COLUMNS + ('sort_key',)
+
+    id: int
+    url: str
+    video_id: Optional[str]
+    title: Optional[str]
+    channel: Optional[str]
+    duration: Optional[str]  # ISO 8601, as the API returns it
+    duration_secs: Optional[int]
+    file_path: Optional[str]
+    status: str
+    download_needed: str
+    viewed: str
+    error_msg: Optional[str]
+    create_dt: Optional[datetime.datetime]
+    modified_dt: Optional[datetime.datetime]
+    published_dt: Optional[datetime.datetime]
+    download_dt: Optional[datetime.datetime]
+    view_dt: Optional[datetime.datetime]
+    delete_dt: Optional[datetime.datetime]
+    queued_dt: Optional[datetime.datetime]
+    partial_path: Optional[str]  # yt-dlp's .part file while a download is unfinished
+    partial_bytes: Optional[int]  # Bytes in it at the last checkpoint
+    sort_key: Any  # Only on search_videos results: the keyset value of the row
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def loader(names: Sequence[str]) -> Callable[[tuple], 'Video']:
+        """Function building records from plain row tuples with the given column names.
+        Built once per projection, so the column checks are not paid per row."""
+        unknown = set(names) - set(Video.__slots__)
+        if unknown:
+            raise ValueError(f"Not a Video field: {', '.join(sorted(unknown))}")
+        timestamps = [i for i, name in enumerate(names) if name in TIMESTAMP_COLUMNS]
+        new = object.__new__
+        fromisoformat = datetime.datetime.fromisoformat
+
+        def load(row: tuple) -> 'Video':
+            if timestamps:
+                row = list(row)
+                for i in timestamps:
+                    value = row[i]
+                    if value is not None:
+                        try:
+                            row[i] = fromisoformat(value)
+                        except (TypeError, ValueError):
+                            row[i] = None
+            video = new(Video)
+            # map() runs the setattr loop in C
+            list(map(setattr, repeat(video), names, row))
+            return video
+        return load
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The attributes that are set, e.g. for JSON."""
+        return {name: getattr(self, name) for name in self.__slots__ if hasattr(self, name)}
+
+    def _values(self) -> tuple:
+        # sort_key is how the row was fetched, not its data
+        return tuple(getattr(self, name, None) for name in VIDEO_COLUMNS)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Video):
+            return NotImplemented
+        return self._values() == other._values()
+
+    __hash__ = None  # Mutable, compared by value
+
+    def __repr__(self) -> str:
+        return (f"Video(id={getattr(self, 'id', None)!r}, video_id={getattr(self, 'video_id', None)!r}, "
+                f"status={getattr(self, 'status', None)!r})")
@@ -0,0 +1,146 @@
+import datetime
+from typing import Iterable, List, Dict, Any, Optional, Set
+from app.db.video import get_db_connection
+from app.utils.logger import setup_logging
+
+logger = setup_logging()
+
+def init_db():
+    """Initializes the database with the subscriptions table."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS subscriptions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            source_id TEXT NOT NULL,
+            url TEXT NOT NULL,
+            playlist_id TEXT,
+            last_seen_id TEXT,
+            active TEXT DEFAULT 'yes',
+            error_msg TEXT,
+            create_dt TIMESTAMP,
+            modified_dt TIMESTAMP,
+            last_poll_dt TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_subscriptions_source
+        ON subscriptions (kind, source_id)
+    ''')
+    # Playlist entries already handled, queued or not: a playlist has no newest-first
+    # order, so this is what tells its new entries apart
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS subscription_entries (
+            subscription_id INTEGER NOT NULL,
+            video_id TEXT NOT NULL,
+            PRIMARY KEY (subscription_id, video_id)
+        ) WITHOUT ROWID
+    ''')
+
+    conn.commit()
+    conn.close()
+    logger.info("Subscriptions table initialized.")
+
+def add_subscription(kind: str, source_id: str, url: str) -> int:
+    """Adds a channel or playlist subscription. Returns the existing ID if already subscribed."""
+    existing = get_subscription_by_source(kind, source_id)
+    if existing:
+        return existing['id']
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    now = datetime.datetime.now()
+
+    cursor.execute('''
+        INSERT INTO subscriptions (kind, source_id, url, create_dt, modified_dt)
+        VALUES (?, ?, ?, ?, ?)
+    ''', (kind, source_id, url, now, now))
+
+    new_id = cursor.lastrowid
+    conn.commit()
+    conn.close()
+    return new_id
+
+def get_subscription_by_source(kind: str, source_id: str) -> Optional[Dict[str, Any]]:
+    """Retrieves a subscription by its kind and source ID."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT * FROM subscriptions WHERE kind = ? AND source_id = ?', (kind, source_id))
+    row = cursor.fetchone()
+    conn.close()
+    if row:
+        return dict(row)
+    return None
+
+def get_active_subscriptions() -> List[Dict[str, Any]]:
+    """Retrieves all active subscriptions, least recently polled first."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT * FROM subscriptions
+        WHERE active = 'yes'
+        ORDER BY last_poll_dt IS NOT NULL, last_poll_dt ASC
+    ''')
+    rows = cursor.fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
+
+def update_subscription_poll(sub_id: int, last_seen_id: Optional[str], playlist_id: Optional[str] = None, error_msg: str = None):
+    """Records the result of a poll. last_seen_id is only moved forward when new entries were found."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    now = datetime.datetime.now()
+
+    query = 'UPDATE subscriptions SET last_poll_dt = ?, modified_dt = ?, error_msg = ?'
+    params = [now, now, error_msg]
+
+    if last_seen_id:
+        query += ', last_seen_id = ?'
+        params.append(last_seen_id)
+    if playlist_id:
+        query += ', playlist_id = ?'
+        params.append(playlist_id)
+
+    query += ' WHERE id = ?'
+    params.append(sub_id)
+
+    cursor.execute(query, params)
+    conn.commit()
+    conn.close()
+
+def get_entry_ids(sub_id: int) -> Set[str]:
+    """Video IDs already seen in a playlist subscription."""
+    conn = get_db_connection()
+    try:
+        rows = conn.execute('SELECT video_id FROM subscription_entries WHERE subscription_id = ?',
+                            (sub_id,)).fetchall()
+    finally:
+        conn.close()
+    return {row[0] for row in rows}
+
+def add_entry_ids(sub_id: int, video_ids: Iterable[str]):
+    """Records video IDs seen in a playlist subscription."""
+    conn = get_db_connection()
+    try:
+        conn.executemany('INSERT OR IGNORE INTO subscription_entries (subscription_id, video_id) VALUES (?, ?)',
+                         [(sub_id, v) for v in video_ids])
+        conn.commit()
+    finally:
+        conn.close()
+
+def set_subscription_active(sub_id: int, active: str):
+    """Enables ('yes') or disables ('no') polling for a subscription."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    now = datetime.datetime.now()
+
+    cursor.execute('''
+        UPDATE subscriptions
+        SET active = ?, modified_dt = ?
+        WHERE id = ?
+    ''', (active, now, sub_id))
+
+    conn.commit()
+    conn.close()
@@ -0,0 +1,54 @@
+import datetime
+import sqlite3
+from typing import Dict
+from app.db.video import get_db_connection
+from app.utils.logger import setup_logging
+
+logger = setup_logging()
+
+def init_db():
+    """Initializes the database with the tunables table: runtime settings overridden
+    from the UI or CLI, as text. A setting without a row uses its default."""
+    conn = get_db_connection()
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS tunables (
+            name TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            modified_dt TIMESTAMP
+        )
+    ''')
+    conn.commit()
+    conn.close()
+
+def get_values() -> Dict[str, str]:
+    """Every overridden setting, name -> value. None before init_db has created the table,
+    so short-lived readers (CLI commands) need not create it."""
+    conn = get_db_connection()
+    try:
+        return dict(conn.execute('SELECT name, value FROM tunables').fetchall())
+    except sqlite3.OperationalError as e:
+        if 'no such table' not in str(e):
+            raise
+        return {}
+    finally:
+        conn.close()
+
+def set_value(name: str, value: str):
+    conn = get_db_connection()
+    try:
+        conn.execute('''
+            INSERT INTO tunables (name, value, modified_dt) VALUES (?, ?, ?)
+            ON CONFLICT (name) DO UPDATE SET value = excluded.value, modified_dt = excluded.modified_dt
+        ''', (name, value, datetime.datetime.now()))
+        conn.commit()
+    finally:
+        conn.close()
+
+def delete_value(name: str):
+    """Drops an override, so the setting goes back to its default."""
+    conn = get_db_connection()
+    try:
+        conn.execute('DELETE FROM tunables WHERE name = ?', (name,))
+        conn.commit()
+    finally:
+        conn.close()
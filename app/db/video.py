@@ -1,99 +1,536 @@
 import sqlite3
 import datetime
-from typing import List, Dict, Any, Optional
-from app.settings import DB_PATH
+import re
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Sequence, Set, Tuple
+from app.db.cache import VideoCache
+from app.db.counters import StatusCounts
+from app.db.models import Video, VIDEO_COLUMNS
+from app.settings import DB_PATH, DB_BUSY_TIMEOUT, VIDEO_CACHE_SIZE
 from app.utils.logger import setup_logging
+from app.utils.metrics import timed_call
 
 logger = setup_logging()
 
-def get_db_connection():
-    """Establishes a connection to the SQLite database."""
-    conn = sqlite3.connect(DB_PATH)
+# Statuses shown in the queue view
+ACTIVE_STATUSES = ('new', 'open', 'down', 'error')
+# Statuses a row does not leave; compact_videos moves old ones to videos_history
+TERMINAL_STATUSES = ('closed', 'archive')
+# Statuses add_video and add_videos_bulk reopen when the video is added again
+REOPEN_STATUSES = ('closed', 'error')
+# Outcomes of add_video (add_videos_bulk returns the first two)
+ADDED, REOPENED, EXISTS = 'added', 'reopened', 'exists'
+# Sortable columns of the queue view -> (column, value used for NULL). NULLs are folded
+# into a value so keyset comparisons work; the same expressions back the sort indexes.
+SORT_KEYS = {
+    'create_dt': ('create_dt', None),
+    'channel': ('channel', "''"),
+    'duration': ('duration_secs', '0'),
+    'published_dt': ('published_dt', "''"),
+}
+
+def parse_sort_key(sort: str, text: Optional[str]) -> Any:
+    """A sort_key that went through text (a query string) back to the type search_videos
+    compares it as. SQLite orders every INTEGER before any TEXT, so a duration cursor
+    bound as text would match every row or none. Raises ValueError."""
+    if text is None or sort != 'duration':
+        return text
+    return int(text)
+
+# Set by init_db: whether this SQLite build has FTS5 (search falls back to LIKE otherwise)
+fts_enabled = False
+
+# Columns after id, shared by videos and videos_history
+_TABLE_COLUMNS = '''
+    url TEXT NOT NULL,
+    video_id TEXT,
+    title TEXT,
+    channel TEXT,
+    duration TEXT,
+    file_path TEXT,
+    status TEXT DEFAULT 'new',
+    download_needed TEXT DEFAULT 'no',
+    viewed TEXT DEFAULT 'no',
+    error_msg TEXT,
+    create_dt TIMESTAMP,
+    modified_dt TIMESTAMP,
+    published_dt TIMESTAMP,
+    download_dt TIMESTAMP,
+    view_dt TIMESTAMP,
+    delete_dt TIMESTAMP,
+    duration_secs INTEGER,
+    queued_dt TIMESTAMP,
+    partial_path TEXT,
+    partial_bytes INTEGER
+'''
+
+_ISO_DURATION_RE = re.compile(r"P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?")
+
+def get_db_connection(check_same_thread: bool = True):
+    """Establishes a connection to the SQLite database.
+    Writers that find the DB locked wait up to DB_BUSY_TIMEOUT seconds instead of failing."""
+    conn = sqlite3.connect(DB_PATH, timeout=DB_BUSY_TIMEOUT, check_same_thread=check_same_thread)
     conn.row_factory = sqlite3.Row
     return conn
 
+# Rows looked up one at a time (get_video_by_id, get_video_by_youtube_id); every
+# writer below invalidates what it changes
+cache = VideoCache(VIDEO_CACHE_SIZE, get_db_connection)
+
 def init_db():
-    """Initializes the database with the videos table."""
+    """Initializes the database: the videos table, its history table and the
+    videos_all view over both."""
+    # The DB file may have changed (tests, benchmarks): drop rows and the version connection
+    cache.clear(close=True)
+    status_counts.invalidate()
     conn = get_db_connection()
     cursor = conn.cursor()
+    # Only takes effect on a new DB file; vacuum_and_analyze converts older ones
+    cursor.execute('PRAGMA auto_vacuum=INCREMENTAL')
+    # WAL lets readers (UI, API, CLI) run while a writer commits; the setting is persistent
+    cursor.execute('PRAGMA journal_mode=WAL')
     
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS videos (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            url TEXT NOT NULL,
-            video_id TEXT,
-            title TEXT,
-            channel TEXT,
-            duration TEXT,
-            file_path TEXT,
-            status TEXT DEFAULT 'new',
-            download_needed TEXT DEFAULT 'no',
-            viewed TEXT DEFAULT 'no',
-            error_msg TEXT,
-            create_dt TIMESTAMP,
-            modified_dt TIMESTAMP,
-            published_dt TIMESTAMP,
-            download_dt TIMESTAMP,
-            view_dt TIMESTAMP,
-            delete_dt TIMESTAMP
-        )
+    # AUTOINCREMENT: ids are never reused, so they stay unique across both tables
+    cursor.execute(f'CREATE TABLE IF NOT EXISTS videos (id INTEGER PRIMARY KEY AUTOINCREMENT, {_TABLE_COLUMNS})')
+    # Cold storage: closed and archived rows moved out of videos by compact_videos
+    cursor.execute(f'CREATE TABLE IF NOT EXISTS videos_history (id INTEGER PRIMARY KEY, {_TABLE_COLUMNS})')
+    added = False
+    for table in ('videos', 'videos_history'):
+        added |= _ensure_column(cursor, table, 'duration_secs', 'INTEGER')
+        added |= _ensure_column(cursor, table, 'queued_dt', 'TIMESTAMP')
+        added |= _ensure_column(cursor, table, 'partial_path', 'TEXT')
+        added |= _ensure_column(cursor, table, 'partial_bytes', 'INTEGER')
+    _backfill_duration_secs(cursor)
+
+    _dedup_videos(cursor)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_videos_history_video_id ON videos_history (video_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_videos_modified_dt ON videos (modified_dt)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_videos_status_create_dt ON videos (status, create_dt)')
+    # Covers the status histogram and the download_needed counts
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_videos_status_download_needed ON videos (status, download_needed)')
+    # Sort indexes for the queue view, limited to active rows so they stay small
+    for name in SORT_KEYS:
+        cursor.execute(f'''
+            CREATE INDEX IF NOT EXISTS idx_videos_active_{name}
+            ON videos ({_sort_expr(name)}, id) WHERE {_active_filter()}
+        ''')
+
+    global fts_enabled
+    fts_enabled = _init_fts(cursor, 'videos')
+    _init_fts(cursor, 'videos_history')
+
+    # Lookups that must also find moved rows read this view; recreated when the
+    # tables gain a column
+    if added:
+        cursor.execute('DROP VIEW IF EXISTS videos_all')
+    cursor.execute(f'''
+        CREATE VIEW IF NOT EXISTS videos_all AS
+        SELECT {_columns(VIDEO_COLUMNS)} FROM videos
+        UNION ALL
+        SELECT {_columns(VIDEO_COLUMNS)} FROM videos_history
     ''')
     
     conn.commit()
     conn.close()
     logger.info("Database initialized.")
 
-def add_video(url: str, video_id: str) -> int:
-    """Adds a new video to the database."""
+def _dedup_videos(cursor):
+    """Migration: keeps one row per YouTube ID, then makes video_id UNIQUE so add_video
+    can upsert. The row kept is the furthest along (downloaded, archived, open, new,
+    error, closed), then the one with a file, then the oldest. Metadata the kept row
+    lacks is fetched again by the daemon."""
+    if cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_videos_video_id_unique'"
+    ).fetchone():
+        return
+
+    cursor.execute('''
+        DELETE FROM videos WHERE id IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY video_id
+                    ORDER BY CASE status WHEN 'down' THEN 0 WHEN 'archive' THEN 1 WHEN 'open' THEN 2
+                                         WHEN 'new' THEN 3 WHEN 'error' THEN 4 ELSE 5 END,
+                             file_path IS NULL, id
+                ) AS rank
+                FROM videos
+                WHERE video_id IN (
+                    SELECT video_id FROM videos WHERE video_id IS NOT NULL
+                    GROUP BY video_id HAVING COUNT(*) > 1
+                )
+            ) WHERE rank > 1
+        )
+    ''')
+    if cursor.rowcount:
+        logger.info("Removed %s duplicate video row(s)", cursor.rowcount)
+    # The unique index replaces the plain one
+    cursor.execute('DROP INDEX IF EXISTS idx_videos_video_id')
+    cursor.execute('CREATE UNIQUE INDEX idx_videos_video_id_unique ON videos (video_id)')
+
+def _ensure_column(cursor, table: str, column: str, decl: str) -> bool:
+    """Adds a column to an existing table if an older schema lacks it. Returns True if added."""
+    columns = {row[1] for row in cursor.execute(f'PRAGMA table_info({table})')}
+    if column in columns:
+        return False
+    cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {decl}')
+    logger.info("Added column %s.%s", table, column)
+    return True
+
+def _backfill_duration_secs(cursor):
+    rows = cursor.execute('''
+        SELECT id, duration FROM videos
+        WHERE duration_secs IS NULL AND duration IS NOT NULL AND duration != ''
+    ''').fetchall()
+    if rows:
+        cursor.executemany('UPDATE videos SET duration_secs = ? WHERE id = ?',
+                           [(duration_to_seconds(duration), row_id) for row_id, duration in rows])
+
+def _init_fts(cursor, table: str) -> bool:
+    """Creates the FTS5 index on title/channel of table and the triggers that keep it
+    in sync. Returns False if this SQLite build has no FTS5."""
+    fts = f'{table}_fts'
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts,)
+    ).fetchone()
+    try:
+        cursor.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts}
+            USING fts5(title, channel, content='{table}', content_rowid='id')
+        ''')
+    except sqlite3.OperationalError as e:
+        logger.warning("FTS5 not available, search falls back to LIKE: %s", e)
+        return False
+
+    cursor.executescript(f'''
+        CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts} (rowid, title, channel) VALUES (new.id, new.title, new.channel);
+        END;
+        CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts} ({fts}, rowid, title, channel) VALUES ('delete', old.id, old.title, old.channel);
+        END;
+        CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF title, channel ON {table} BEGIN
+            INSERT INTO {fts} ({fts}, rowid, title, channel) VALUES ('delete', old.id, old.title, old.channel);
+            INSERT INTO {fts} (rowid, title, channel) VALUES (new.id, new.title, new.channel);
+        END;
+    ''')
+    if not exists:
+        # Index rows that predate the FTS table
+        cursor.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+    return True
+
+def _active_filter(prefix: str = '') -> str:
+    # Spelled out as literals (not bound parameters) so SQLite can match the partial indexes
+    return f"{prefix}status IN (" + ", ".join(f"'{s}'" for s in ACTIVE_STATUSES) + ")"
+
+def _sort_expr(sort: str, prefix: str = '') -> str:
+    column, null_value = SORT_KEYS[sort]
+    if null_value is None:
+        return f"{prefix}{column}"
+    return f"IFNULL({prefix}{column}, {null_value})"
+
+def _columns(columns: Sequence[str], prefix: str = '') -> str:
+    # Column names are interpolated into SQL, so only known ones pass
+    unknown = set(columns) - set(VIDEO_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown videos column(s): {', '.join(sorted(unknown))}")
+    return ', '.join(prefix + column for column in columns)
+
+def _select_videos(sql: str, params: Sequence[Any] = ()) -> List[Video]:
+    """Runs a SELECT on videos and returns its rows as Video records.
+    Rows come back as plain tuples: no sqlite3.Row or dict per row."""
+    conn = get_db_connection()
+    conn.row_factory = None
+    try:
+        cursor = conn.execute(sql, params)
+        load = Video.loader(tuple(column[0] for column in cursor.description))
+        return [load(row) for row in cursor.fetchall()]
+    finally:
+        conn.close()
+
+def duration_to_seconds(duration: str) -> Optional[int]:
+    """Converts an ISO 8601 duration from the API (e.g. 'PT1H2M3S') to seconds."""
+    match = _ISO_DURATION_RE.fullmatch(duration or '')
+    if not match or not any(match.groups()):
+        return None
+    days, hours, minutes, seconds = (int(g) if g else 0 for g in match.groups())
+    return ((days * 24 + hours) * 60 + minutes) * 60 + seconds
+
+def add_video(url: str, video_id: str) -> Tuple[int, str]:
+    """Adds a video, open and queued for download, unless its YouTube ID already has a row.
+
+    An existing row that was closed or failed is reopened and queued again instead; any
+    other existing row is left alone. A closed row in videos_history is moved back first.
+    Returns (row id, ADDED | REOPENED | EXISTS)."""
     conn = get_db_connection()
     cursor = conn.cursor()
     now = datetime.datetime.now()
-    
-    cursor.execute('''
-        INSERT INTO videos (url, video_id, status, create_dt, modified_dt)
-        VALUES (?, ?, ?, ?, ?)
-    ''', (url, video_id, 'new', now, now))
-    
-    new_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
-    return new_id
+    restored = None
+    try:
+        # The write lock comes first, so the state read below is the one the upsert meets
+        cursor.execute('BEGIN IMMEDIATE')
+        old = cursor.execute('SELECT id, status, download_needed FROM videos WHERE video_id = ?', (video_id,)).fetchone()
+        if old is None:
+            old = restored = _restore_from_history(cursor, video_id)
+        if old is not None and old['status'] not in REOPEN_STATUSES:
+            conn.rollback()
+            return old['id'], EXISTS
+
+        cursor.execute(f'''
+            INSERT INTO videos (url, video_id, status, download_needed, create_dt, modified_dt, queued_dt)
+            VALUES (?, ?, 'open', 'yes', ?, ?, ?)
+            ON CONFLICT (video_id) DO UPDATE SET
+                status = 'open', download_needed = 'yes', error_msg = NULL, delete_dt = NULL,
+                modified_dt = excluded.modified_dt, queued_dt = excluded.queued_dt
+            WHERE videos.status IN ({', '.join(f"'{s}'" for s in REOPEN_STATUSES)})
+        ''', (url, video_id, now, now, now))
+        row_id = old['id'] if old is not None else cursor.lastrowid
+        conn.commit()
+    finally:
+        conn.close()
+
+    cache.invalidate([row_id], youtube_ids=[video_id])
+    if old is None:
+        status_counts.add(('open', 'yes'))
+        return row_id, ADDED
+    if restored is not None:
+        status_counts.add((restored['status'], restored['download_needed']))
+    status_counts.move((old['status'], old['download_needed']), ('open', 'yes'))
+    return row_id, REOPENED
 
-def get_all_videos() -> List[Dict[str, Any]]:
-    """Retrieves all videos from the database."""
+def _restore_from_history(cursor, video_id: str) -> Optional[sqlite3.Row]:
+    """Moves the newest videos_history row of a YouTube ID back to videos if add_video
+    would reopen it. Returns its (id, status, download_needed), or None if there is none."""
+    row = cursor.execute(
+        'SELECT id, status, download_needed FROM videos_history WHERE video_id = ? ORDER BY id DESC LIMIT 1',
+        (video_id,)
+    ).fetchone()
+    if row is not None and row['status'] in REOPEN_STATUSES:
+        columns = _columns(VIDEO_COLUMNS)
+        cursor.execute(f'INSERT INTO videos ({columns}) SELECT {columns} FROM videos_history WHERE id = ?', (row['id'],))
+        cursor.execute('DELETE FROM videos_history WHERE id = ?', (row['id'],))
+    return row
+
+@timed_call('db.add_videos_bulk')
+def add_videos_bulk(entries: List[Tuple[str, str]], status: str = 'open',
+                    download_needed: str = 'yes') -> List[Tuple[int, str, str]]:
+    """Adds (url, video_id) pairs in one transaction, by add_video's rule: a YouTube ID
+    whose row (live or in videos_history) was closed or failed is reopened as
+    status/download_needed, one with any other row is left alone.
+    Returns (id, video_id, ADDED | REOPENED) for the rows added or reopened."""
+    if not entries:
+        return []
+
+    video_ids = list(dict.fromkeys(video_id for _, video_id in entries))
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute('SELECT * FROM videos ORDER BY create_dt DESC')
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(row) for row in rows]
+    now = datetime.datetime.now()
+    queued_dt = now if download_needed == 'yes' else None
+    done, restored, moved = set(), [], []
+    try:
+        # The write lock comes first, so the states read below are the ones the writes meet
+        cursor.execute('BEGIN IMMEDIATE')
+        live, in_history = {}, set()
+        # Stay well below SQLite's bound-parameter limit
+        for i in range(0, len(video_ids), 500):
+            chunk = video_ids[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            live.update((row['video_id'], row) for row in cursor.execute(
+                f'SELECT id, video_id, status, download_needed FROM videos WHERE video_id IN ({placeholders})', chunk))
+            in_history.update(row[0] for row in cursor.execute(
+                f'SELECT video_id FROM videos_history WHERE video_id IN ({placeholders})', chunk))
+
+        for url, video_id in entries:
+            if video_id in done:
+                continue
+            done.add(video_id)
+            old = live.get(video_id)
+            if old is None and video_id in in_history:
+                old = _restore_from_history(cursor, video_id)
+                if old is not None and old['status'] in REOPEN_STATUSES:
+                    restored.append(old)
+            if old is None:
+                cursor.execute('''
+                    INSERT INTO videos (url, video_id, status, download_needed, create_dt, modified_dt, queued_dt)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (url, video_id, status, download_needed, now, now, queued_dt))
+                moved.append((cursor.lastrowid, video_id, None))
+            elif old['status'] in REOPEN_STATUSES:
+                cursor.execute('''
+                    UPDATE videos SET status = ?, download_needed = ?, error_msg = NULL, delete_dt = NULL,
+                        modified_dt = ?, queued_dt = ?
+                    WHERE id = ?
+                ''', (status, download_needed, now, queued_dt, old['id']))
+                moved.append((old['id'], video_id, (old['status'], old['download_needed'])))
+        conn.commit()
+    finally:
+        conn.close()
+
+    reopened = [(row_id, video_id) for row_id, video_id, old in moved if old is not None]
+    if reopened:
+        cache.invalidate([row_id for row_id, _ in reopened], youtube_ids=[v for _, v in reopened])
+    for row in restored:
+        status_counts.add((row['status'], row['download_needed']))
+    added = len(moved) - len(reopened)
+    if added:
+        status_counts.add((status, download_needed), added)
+    for _, _, old in moved:
+        if old is not None:
+            status_counts.move(old, (status, download_needed))
+    return [(row_id, video_id, ADDED if old is None else REOPENED) for row_id, video_id, old in moved]
+
+def get_existing_youtube_ids(youtube_ids: List[str], reopenable: bool = True) -> Set[str]:
+    """Returns the subset of the given YouTube IDs that already have a row, live or moved
+    to videos_history. reopenable=False leaves out the ones an add would reopen: a closed
+    or failed live row, or, with no live row, a closed or failed one in history."""
+    found = set()
+    if not youtube_ids:
+        return found
 
-def get_video_by_id(video_id: int) -> Optional[Dict[str, Any]]:
-    """Retrieves a video by its primary key ID."""
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute('SELECT * FROM videos WHERE id = ?', (video_id,))
-    row = cursor.fetchone()
+    # Stay well below SQLite's bound-parameter limit
+    for i in range(0, len(youtube_ids), 500):
+        chunk = youtube_ids[i:i + 500]
+        placeholders = ','.join('?' * len(chunk))
+        if reopenable:
+            cursor.execute(f'SELECT video_id FROM videos_all WHERE video_id IN ({placeholders})', chunk)
+        else:
+            settled = f"status NOT IN ({', '.join(repr(s) for s in REOPEN_STATUSES)})"
+            cursor.execute(f'''
+                SELECT video_id FROM videos WHERE video_id IN ({placeholders}) AND {settled}
+                UNION
+                SELECT video_id FROM videos_history WHERE video_id IN ({placeholders}) AND {settled}
+                    AND video_id NOT IN (SELECT video_id FROM videos WHERE video_id IN ({placeholders}))
+            ''', chunk * 3)
+        found.update(row[0] for row in cursor.fetchall())
     conn.close()
-    if row:
-        return dict(row)
-    return None
+    return found
+
+def get_all_videos(columns: Sequence[str] = VIDEO_COLUMNS) -> List[Video]:
+    """Retrieves all videos from the database, videos_history included."""
+    return _select_videos(f'SELECT {_columns(columns)} FROM videos_all ORDER BY create_dt DESC')
+
+@timed_call('db.get_videos_by_status')
+def get_videos_by_status(statuses=ACTIVE_STATUSES, columns: Sequence[str] = VIDEO_COLUMNS) -> List[Video]:
+    """Retrieves videos in the given statuses, newest first."""
+    placeholders = ','.join('?' * len(statuses))
+    return _select_videos(
+        f'SELECT {_columns(columns)} FROM videos WHERE status IN ({placeholders}) ORDER BY create_dt DESC',
+        list(statuses)
+    )
+
+@timed_call('db.search_videos')
+def search_videos(query: str = '', sort: str = 'create_dt', descending: bool = True,
+                  after: Optional[Tuple[Any, int]] = None, limit: int = 100,
+                  columns: Sequence[str] = VIDEO_COLUMNS) -> List[Video]:
+    """Searches active videos by title/channel and returns one page in the given order.
+
+    Pagination is keyset-based: pass the (sort_key, id) of the last row of the previous
+    page as `after`. Each row carries its sort_key for that purpose. Deep pages cost the
+    same as the first one, unlike OFFSET."""
+    sort_expr = _sort_expr(sort, 'v.')
+    direction = 'DESC' if descending else 'ASC'
+    sql = f'SELECT {_columns(columns, "v.")}, {sort_expr} AS sort_key FROM videos v'
+    where = [_active_filter('v.')]
+    params: List[Any] = []
 
-def get_video_by_youtube_id(youtube_id: str) -> Optional[Dict[str, Any]]:
-    """Retrieves a video by its YouTube ID."""
+    query = (query or '').strip()
+    if query and fts_enabled:
+        sql += ' JOIN videos_fts f ON f.rowid = v.id'
+        where.append('videos_fts MATCH ?')
+        params.append(_fts_query(query))
+    elif query:
+        where.append('(v.title LIKE ? OR v.channel LIKE ?)')
+        params.extend([f'%{query}%', f'%{query}%'])
+
+    if after is not None:
+        where.append(f"({sort_expr}, v.id) {'<' if descending else '>'} (?, ?)")
+        params.extend(after)
+
+    sql += ' WHERE ' + ' AND '.join(where)
+    sql += f' ORDER BY {sort_expr} {direction}, v.id {direction} LIMIT ?'
+    params.append(limit)
+    return _select_videos(sql, params)
+
+def _fts_query(query: str) -> str:
+    """Turns free text into an FTS5 query: every word must match, as a prefix."""
+    terms = [term.replace('"', '""') for term in query.split()]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+def search_history(query: str = '', limit: int = 100, columns: Sequence[str] = VIDEO_COLUMNS) -> List[Video]:
+    """Searches rows moved to videos_history by title/channel, most recently changed first."""
+    sql = f'SELECT {_columns(columns, "h.")} FROM videos_history h'
+    params: List[Any] = []
+    query = (query or '').strip()
+    if query and fts_enabled:
+        sql += ' JOIN videos_history_fts f ON f.rowid = h.id WHERE videos_history_fts MATCH ?'
+        params.append(_fts_query(query))
+    elif query:
+        sql += ' WHERE (h.title LIKE ? OR h.channel LIKE ?)'
+        params.extend([f'%{query}%', f'%{query}%'])
+    sql += ' ORDER BY h.modified_dt DESC LIMIT ?'
+    params.append(limit)
+    return _select_videos(sql, params)
+
+@timed_call('db.get_videos_changed_since')
+def get_videos_changed_since(modified_dt: datetime.datetime, columns: Sequence[str] = VIDEO_COLUMNS) -> List[Video]:
+    """Retrieves videos of any status modified after the given time, oldest change first."""
+    return _select_videos(
+        f'SELECT {_columns(columns)} FROM videos WHERE modified_dt > ? ORDER BY modified_dt ASC', (modified_dt,)
+    )
+
+@timed_call('db.get_videos_by_ids')
+def get_videos_by_ids(video_ids: List[int], columns: Sequence[str] = VIDEO_COLUMNS) -> List[Video]:
+    """Retrieves several videos by primary key in one query."""
+    if not video_ids:
+        return []
+    placeholders = ','.join('?' * len(video_ids))
+    return _select_videos(f'SELECT {_columns(columns)} FROM videos WHERE id IN ({placeholders})', list(video_ids))
+
+def get_video_by_id(video_id: int) -> Optional[Video]:
+    """Retrieves a video by its primary key ID, live or in history, from the cache when it has the row.
+    The record is shared with other callers: do not modify it."""
+    video = cache.get(video_id)
+    if video is None:
+        token = cache.token()
+        rows = _select_videos(f'SELECT {_columns(VIDEO_COLUMNS)} FROM videos_all WHERE id = ?', (video_id,))
+        if rows:
+            video = rows[0]
+            cache.put(video, token)
+    return video
+
+def get_video_by_youtube_id(youtube_id: str) -> Optional[Video]:
+    """Retrieves a video by its YouTube ID, live or in history, from the cache when it has the row.
+    The record is shared with other callers: do not modify it."""
+    video = cache.get_by_youtube_id(youtube_id)
+    if video is None:
+        token = cache.token()
+        # The newest row wins: a video added again after its old row was moved to history
+        rows = _select_videos(
+            f'SELECT {_columns(VIDEO_COLUMNS)} FROM videos_all WHERE video_id = ? ORDER BY id DESC LIMIT 1', (youtube_id,)
+        )
+        if rows:
+            video = rows[0]
+            cache.put(video, token)
+    return video
+
+def _update_row(video_id: int, query: str, params: Sequence[Any]):
+    """Runs an UPDATE of one row that may change its status or download_needed, and
+    moves the row between status_counts once committed. The write lock is taken
+    before the old state is read, so no other writer can slip in between."""
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute('SELECT * FROM videos WHERE video_id = ?', (youtube_id,))
-    row = cursor.fetchone()
+    cursor.execute('BEGIN IMMEDIATE')
+    old = cursor.execute('SELECT status, download_needed FROM videos WHERE id = ?', (video_id,)).fetchone()
+    cursor.execute(query, params)
+    new = cursor.execute('SELECT status, download_needed FROM videos WHERE id = ?', (video_id,)).fetchone()
+    conn.commit()
     conn.close()
-    if row:
-        return dict(row)
-    return None
+    cache.invalidate([video_id])
+    if old and new:
+        status_counts.move(tuple(old), tuple(new))
 
 def update_video_status(video_id: int, status: str, error_msg: str = None):
     """Updates the status of a video."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
     now = datetime.datetime.now()
     
     query = 'UPDATE videos SET status = ?, modified_dt = ?'
@@ -117,10 +554,9 @@ def update_video_status(video_id: int, status: str, error_msg: str = None):
     query += ' WHERE id = ?'
     params.append(video_id)
     
-    cursor.execute(query, params)
-    conn.commit()
-    conn.close()
+    _update_row(video_id, query, params)
 
+@timed_call('db.update_video_metadata')
 def update_video_metadata(video_id: int, title: str, channel: str, duration: str, published_dt: str):
     """Updates the metadata of a video."""
     conn = get_db_connection()
@@ -129,27 +565,56 @@ def update_video_metadata(video_id: int, title: str, channel: str, duration: str
     
     cursor.execute('''
         UPDATE videos 
-        SET title = ?, channel = ?, duration = ?, published_dt = ?, modified_dt = ?
+        SET title = ?, channel = ?, duration = ?, duration_secs = ?, published_dt = ?, modified_dt = ?
         WHERE id = ?
-    ''', (title, channel, duration, published_dt, now, video_id))
+    ''', (title, channel, duration, duration_to_seconds(duration), published_dt, now, video_id))
     
     conn.commit()
     conn.close()
+    cache.invalidate([video_id])
 
 def update_video_filepath(video_id: int, file_path: str):
-    """Updates the file path of a video."""
+    """Updates the file path of a video. The file is complete, so the partial one is forgotten."""
     conn = get_db_connection()
     cursor = conn.cursor()
     now = datetime.datetime.now()
     
     cursor.execute('''
         UPDATE videos 
-        SET file_path = ?, modified_dt = ?
+        SET file_path = ?, partial_path = NULL, partial_bytes = NULL, modified_dt = ?
         WHERE id = ?
     ''', (file_path, now, video_id))
     
     conn.commit()
     conn.close()
+    cache.invalidate([video_id])
+
+def update_partial(video_id: int, partial_path: Optional[str], partial_bytes: Optional[int]):
+    """Records the unfinished download of a video: its .part file and the bytes in it,
+    so a restarted download resumes from there. Only while the row is 'downloading':
+    a late checkpoint must not bring back the partial of a download already completed."""
+    conn = get_db_connection()
+    try:
+        conn.execute('''
+            UPDATE videos SET partial_path = ?, partial_bytes = ?, modified_dt = ?
+            WHERE id = ? AND download_needed = 'downloading'
+        ''', (partial_path, partial_bytes, datetime.datetime.now(), video_id))
+        conn.commit()
+    finally:
+        conn.close()
+    cache.invalidate([video_id])
+
+def get_owned_partial_paths() -> Set[str]:
+    """.part files of downloads that are queued or running, so may still be resumed."""
+    conn = get_db_connection()
+    try:
+        rows = conn.execute('''
+            SELECT partial_path FROM videos
+            WHERE partial_path IS NOT NULL AND download_needed IN ('yes', 'downloading')
+        ''').fetchall()
+    finally:
+        conn.close()
+    return {row[0] for row in rows}
 
 def update_video_url(video_id: int, url: str):
     """Updates the URL of a video."""
@@ -165,6 +630,7 @@ def update_video_url(video_id: int, url: str):
     
     conn.commit()
     conn.close()
+    cache.invalidate([video_id])
 
 def mark_video_viewed(video_id: int):
     """Marks a video as viewed."""
@@ -180,6 +646,7 @@ def mark_video_viewed(video_id: int):
     
     conn.commit()
     conn.close()
+    cache.invalidate([video_id])
 
 def delete_video_record(video_id: int):
     """Deletes a video record from the database (Soft delete per PRD: status=closed)."""
@@ -188,36 +655,28 @@ def delete_video_record(video_id: int):
     update_video_status(video_id, 'closed')
 
 def set_download_needed(video_id: int, value: str):
-    """Sets the download_needed status for a video. Valid values: 'no', 'yes', 'downloading', 'down'."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    """Sets the download_needed status for a video. Valid values: 'no', 'yes', 'downloading', 'down'.
+    Queueing ('yes') also stamps queued_dt, from which the queue wait is measured."""
     now = datetime.datetime.now()
     
-    cursor.execute('''
+    _update_row(video_id, '''
         UPDATE videos 
-        SET download_needed = ?, modified_dt = ?
+        SET download_needed = ?, modified_dt = ?,
+            queued_dt = CASE WHEN ? = 'yes' THEN ? ELSE queued_dt END
         WHERE id = ?
-    ''', (value, now, video_id))
-    
-    conn.commit()
-    conn.close()
+    ''', (value, now, value, now, video_id))
 
-def get_videos_by_download_needed(value: str, limit: int = None) -> List[Dict[str, Any]]:
+@timed_call('db.get_videos_by_download_needed')
+def get_videos_by_download_needed(value: str, limit: int = None, columns: Sequence[str] = VIDEO_COLUMNS) -> List[Video]:
     """Retrieves videos by download_needed status. Returns ordered by create_dt ASC."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    query = 'SELECT * FROM videos WHERE download_needed = ? ORDER BY create_dt ASC'
+    query = f'SELECT {_columns(columns)} FROM videos WHERE download_needed = ? ORDER BY create_dt ASC'
     params = [value]
     
     if limit:
         query += ' LIMIT ?'
         params.append(limit)
     
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(row) for row in rows]
+    return _select_videos(query, params)
 
 def count_videos_by_download_needed(value: str) -> int:
     """Counts videos by download_needed status."""
@@ -227,4 +686,229 @@ def count_videos_by_download_needed(value: str) -> int:
     cursor.execute('SELECT COUNT(*) FROM videos WHERE download_needed = ?', (value,))
     count = cursor.fetchone()[0]
     conn.close()
-    return count
\ No newline at end of file
+    return count
+
+def count_videos_by_status() -> Dict[str, int]:
+    """Counts videos per status."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    cursor.execute('SELECT status, COUNT(*) FROM videos GROUP BY status')
+    counts = {row[0]: row[1] for row in cursor.fetchall()}
+    conn.close()
+    return counts
+
+def get_status_histogram() -> Dict[Tuple[str, str], int]:
+    """Counts videos per (status, download_needed) in one query over the covering index."""
+    conn = get_db_connection()
+    rows = conn.execute('SELECT status, download_needed, COUNT(*) FROM videos GROUP BY status, download_needed').fetchall()
+    conn.close()
+    return {(status, download_needed): count for status, download_needed, count in rows}
+
+def count_history_videos() -> int:
+    """Counts rows moved to videos_history."""
+    conn = get_db_connection()
+    count = conn.execute('SELECT COUNT(*) FROM videos_history').fetchone()[0]
+    conn.close()
+    return count
+
+# Counts per (status, download_needed) for the download scheduler and the UI footer;
+# the state transitions in this module keep them in step
+status_counts = StatusCounts(get_status_histogram)
+
+def get_videos_missing_metadata(limit: int = 50, columns: Sequence[str] = VIDEO_COLUMNS,
+                                after_id: int = 0) -> List[Video]:
+    """Retrieves active videos that have no title yet, in insertion (id) order. after_id
+    is a cursor: the id of the last row an earlier call returned."""
+    return _select_videos(f'''
+        SELECT {_columns(columns)} FROM videos
+        WHERE id > ? AND (title IS NULL OR title = '') AND {_active_filter()}
+        ORDER BY id ASC LIMIT ?
+    ''', (after_id, limit))
+
+def reset_stuck_downloads() -> int:
+    """Puts rows left in 'downloading' by a process that died back in the queue.
+    Only safe to call when no download is running. Returns the number of rows reset."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    now = datetime.datetime.now()
+    
+    cursor.execute('''
+        UPDATE videos SET download_needed = 'yes', modified_dt = ?
+        WHERE download_needed = 'downloading'
+    ''', (now,))
+    count = cursor.rowcount
+    conn.commit()
+    conn.close()
+    if count:
+        cache.clear()
+        status_counts.invalidate()
+    return count
+
+def retry_videos(video_ids: List[int] = None) -> int:
+    """Re-queues errored videos for download and clears their error; all of them if no
+    ids are given. Returns the number of rows re-queued."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    now = datetime.datetime.now()
+    
+    query = '''
+        UPDATE videos SET status = 'open', error_msg = NULL, download_needed = 'yes', modified_dt = ?, queued_dt = ?
+        WHERE status = 'error'
+    '''
+    params = [now, now]
+    if video_ids:
+        query += f" AND id IN ({','.join('?' * len(video_ids))})"
+        params.extend(video_ids)
+    
+    cursor.execute(query, params)
+    count = cursor.rowcount
+    conn.commit()
+    conn.close()
+    if video_ids:
+        cache.invalidate(video_ids)
+    elif count:
+        cache.clear()
+    if count:
+        status_counts.invalidate()
+    return count
+
+@timed_call('db.compact_videos')
+def compact_videos(older_than_days: int, batch_size: int = 5000) -> int:
+    """Moves rows in a terminal status, unchanged for older_than_days, from videos to
+    videos_history, batch_size rows per transaction so other writers are not held up
+    for long. They stay readable through videos_all and search_history.
+    Returns the number of rows moved."""
+    cutoff = datetime.datetime.now() - datetime.timedelta(days=older_than_days)
+    terminal = ', '.join(f"'{s}'" for s in TERMINAL_STATUSES)
+    batch = f'''
+        SELECT {{}} FROM videos WHERE status IN ({terminal}) AND modified_dt < ?
+        ORDER BY id LIMIT ?
+    '''
+    columns = _columns(VIDEO_COLUMNS)
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    moved = 0
+    try:
+        while True:
+            cursor.execute('BEGIN IMMEDIATE')
+            # Both statements pick the same rows: same filter and order, one transaction
+            cursor.execute(f'INSERT INTO videos_history ({columns}) ' + batch.format(columns), (cutoff, batch_size))
+            count = cursor.rowcount
+            if count:
+                cursor.execute('DELETE FROM videos WHERE id IN (' + batch.format('id') + ')', (cutoff, batch_size))
+            conn.commit()
+            moved += count
+            if count < batch_size:
+                break
+    finally:
+        conn.close()
+
+    if moved:
+        # Moved rows read the same through videos_all, but leave the live counts
+        cache.clear()
+        status_counts.invalidate()
+        logger.info("Moved %s closed/archived video(s) to history", moved)
+    return moved
+
+def vacuum_and_analyze():
+    """Returns free pages to the file system and refreshes the planner statistics,
+    e.g. after compact_videos. A DB created before incremental auto-vacuum is converted
+    with one full VACUUM; later runs only free what is on the freelist."""
+    conn = get_db_connection()
+    try:
+        if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:  # 2 = INCREMENTAL
+            logger.info("Converting the DB to incremental auto-vacuum (one full VACUUM)")
+            conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+            conn.execute('VACUUM')
+        else:
+            # Frees one page per step: fetch every row, or it stops after the first
+            conn.execute('PRAGMA incremental_vacuum').fetchall()
+        # Sample at most this many index rows per index, so ANALYZE stays fast on big tables
+        conn.execute('PRAGMA analysis_limit=1000')
+        conn.execute('ANALYZE')
+        conn.commit()
+    finally:
+        conn.close()
+
+def iter_video_rows(batch_size: int = 5000) -> Iterator[tuple]:
+    """Every row, live and history, as plain tuples of VIDEO_COLUMNS with the values as
+    stored (timestamps stay ISO text). Fetched batch_size at a time, so memory stays
+    flat whatever the size of the table; the rows are one consistent snapshot."""
+    conn = get_db_connection()
+    conn.row_factory = None
+    try:
+        cursor = conn.execute(f'SELECT {_columns(VIDEO_COLUMNS)} FROM videos_all')
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        conn.close()
+
+@timed_call('db.import_videos')
+def import_videos(rows: Iterable[Dict[str, Any]], batch_size: int = 5000, replace: bool = False) -> Tuple[int, int]:
+    """Inserts rows (dicts of VIDEO_COLUMNS; id and unknown keys are ignored, missing
+    ones are NULL), batch_size per transaction. A row whose YouTube ID is already in
+    videos is skipped, or with replace overwrites the columns it has; one already in
+    videos_history is always skipped. Returns (rows written, rows read).
+
+    Written rows get modified_dt = now, so the GUI's incremental refresh and the
+    cross-process cache sync see them. A download in flight where the export was made
+    is queued again from the start: its partial file is on that machine, not here."""
+    columns = [c for c in VIDEO_COLUMNS if c != 'id']
+    modified = columns.index('modified_dt')
+    download_needed = columns.index('download_needed')
+    partial = [columns.index('partial_path'), columns.index('partial_bytes')]
+    placeholders = ', '.join('?' for _ in columns)
+    if replace:
+        conflict = 'DO UPDATE SET ' + ', '.join(f'{c} = excluded.{c}' for c in columns if c != 'video_id')
+    else:
+        conflict = 'DO NOTHING'
+    # "WHERE" keeps the ON CONFLICT from being parsed as a join constraint
+    query = f'''
+        INSERT INTO videos ({_columns(columns)})
+        SELECT {placeholders} WHERE NOT EXISTS (SELECT 1 FROM videos_history WHERE video_id = ?)
+        ON CONFLICT (video_id) {conflict}
+    '''
+    conn = get_db_connection()
+    written = read = 0
+    try:
+        batch = []
+        now = datetime.datetime.now()
+        for row in rows:
+            values = [row.get(c) for c in columns]
+            values[modified] = now
+            if values[download_needed] == 'downloading':
+                values[download_needed] = 'yes'
+            for i in partial:
+                values[i] = None
+            values.append(row.get('video_id'))
+            batch.append(values)
+            if len(batch) >= batch_size:
+                written += _import_batch(conn, query, batch)
+                read += len(batch)
+                batch = []
+                now = datetime.datetime.now()
+        if batch:
+            written += _import_batch(conn, query, batch)
+            read += len(batch)
+    finally:
+        conn.close()
+
+    if written:
+        cache.clear()
+        status_counts.invalidate()
+    logger.info("Imported %s of %s video(s)", written, read)
+    return written, read
+
+def _import_batch(conn, query: str, batch: List[list]) -> int:
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        cursor = conn.executemany(query, batch)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return cursor.rowcount
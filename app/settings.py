@@ -1,3 +1,4 @@
+import logging
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -6,7 +7,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 BASE_DIR = Path(__file__).parent.parent.resolve()
-DB_PATH = BASE_DIR / "app" / "db" / "yt-manager.db"
+DB_PATH = Path(os.getenv("DB_PATH", BASE_DIR / "app" / "db" / "yt-manager.db"))
 
 # Paths from Env
 YT_API_KEY = os.getenv("YT_API_KEY", "")
@@ -19,8 +20,76 @@ ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", r"N:\Videos\_fromMPC")
 # YTDLP Config Path
 YTDLP_CONFIG_PATH = BASE_DIR / "app" / "config" / "ytdlp-config.txt"
 
+# yt-dlp executable, and the script it runs (--exec) when a download completes
+YTDLP_PATH = os.getenv("YTDLP_PATH", "yt-dlp")
+YTDLP_CALLBACK = Path(os.getenv("YTDLP_CALLBACK", BASE_DIR / "run_callback.bat"))
+
+# Thumbnails shown in the queue view, cached on disk after the first fetch
+SHOW_THUMBNAILS = os.getenv("SHOW_THUMBNAILS", "yes").lower() in ("1", "yes", "true")
+THUMBNAIL_DIR = Path(os.getenv("THUMBNAIL_DIR", BASE_DIR / "app" / "cache" / "thumbnails"))
+THUMBNAIL_URL = os.getenv("THUMBNAIL_URL", "https://i.ytimg.com/vi/{video_id}/mqdefault.jpg")
+
 # Concurrent Downloads Limit
-CONCURRENT_DOWNLOADS = 4
+CONCURRENT_DOWNLOADS = int(os.getenv("CONCURRENT_DOWNLOADS", "4"))
+
+# Settings marked tunable (app.core.tunables) take their defaults from here, can be
+# changed at runtime from the UI or `cli config`, and are re-read from the DB by
+# running processes every TUNABLES_POLL_SECONDS
+TUNABLES_POLL_SECONDS = float(os.getenv("TUNABLES_POLL_SECONDS", "5"))
+
+# Unfinished downloads: how often the bytes in a row's .part file are recorded, and
+# how old (hours) a .part file no queued row owns must be before it is deleted
+PARTIAL_CHECKPOINT_SECONDS = float(os.getenv("PARTIAL_CHECKPOINT_SECONDS", "15"))
+PARTIAL_GC_AGE_HOURS = float(os.getenv("PARTIAL_GC_AGE_HOURS", "1"))
+
+# Subscriptions: seconds between polls, and how many of a channel's newest
+# uploads to queue the first time it is polled
+SUBSCRIPTION_POLL_INTERVAL = int(os.getenv("SUBSCRIPTION_POLL_INTERVAL", "3600"))
+SUBSCRIPTION_BACKFILL = int(os.getenv("SUBSCRIPTION_BACKFILL", "5"))
+
+# Headless daemon: seconds between sweeps, the heartbeat file CLI status reads,
+# and how long unused thumbnails stay in the disk cache
+DAEMON_INTERVAL = int(os.getenv("DAEMON_INTERVAL", "10"))
+DAEMON_HEARTBEAT_FILE = Path(os.getenv("DAEMON_HEARTBEAT_FILE", BASE_DIR / "app" / "cache" / "daemon.heartbeat"))
+THUMBNAIL_RETENTION_DAYS = int(os.getenv("THUMBNAIL_RETENTION_DAYS", "30"))
+# Closed and archived rows unchanged for this many days move to videos_history in
+# the daemon's hourly sweep (0 = never)
+HISTORY_AFTER_DAYS = int(os.getenv("HISTORY_AFTER_DAYS", "90"))
+
+# Logging: rotating files in LOG_DIR; LOG_JSON=yes writes JSON lines to the file
+LOG_DIR = Path(os.getenv("LOG_DIR", BASE_DIR / "app" / "logs"))
+LOG_LEVEL = getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO)
+LOG_JSON = os.getenv("LOG_JSON", "no").lower() in ("1", "yes", "true")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+LOG_BACKUPS = int(os.getenv("LOG_BACKUPS", "5"))
+
+# Pipeline metrics: samples are buffered and written every METRICS_FLUSH_SECONDS;
+# raw samples older than METRICS_RAW_DAYS are kept only as per-day rollups
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "yes").lower() in ("1", "yes", "true")
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+METRICS_RAW_DAYS = int(os.getenv("METRICS_RAW_DAYS", "14"))
+
+# Profiling, off unless PROFILE (or --profile) names targets, comma-separated:
+# startup, refresh (cProfile), memory (tracemalloc), sample (thread-stack sampler)
+PROFILE = os.getenv("PROFILE", "")
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", LOG_DIR / "profiles"))
+PROFILE_SAMPLE_MS = float(os.getenv("PROFILE_SAMPLE_MS", "20"))
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "25"))
+
+# Local HTTP API (GUI and daemon). Requests need a Bearer token: API_TOKEN, or else one
+# generated into API_TOKEN_FILE on first use. Browsers may call it only from API_ORIGINS
+API_ENABLED = os.getenv("API_ENABLED", "yes").lower() in ("1", "yes", "true")
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("API_PORT", "8765"))
+API_TOKEN = os.getenv("API_TOKEN", "")
+API_TOKEN_FILE = Path(os.getenv("API_TOKEN_FILE", BASE_DIR / "app" / "cache" / "api.token"))
+API_ORIGINS = tuple(o.strip() for o in os.getenv("API_ORIGINS", "https://www.youtube.com").split(",") if o.strip())
+
+# Rows kept by the in-process lookup cache (get_video_by_id/get_video_by_youtube_id); 0 turns it off
+VIDEO_CACHE_SIZE = int(os.getenv("VIDEO_CACHE_SIZE", "4096"))
+
+# Seconds a connection waits for another writer's lock before "database is locked"
+DB_BUSY_TIMEOUT = float(os.getenv("DB_BUSY_TIMEOUT", "30"))
 
 # Ensure directories exist
 Path(DOWNLOAD_DIR).mkdir(exist_ok=True)
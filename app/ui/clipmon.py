@@ -23,6 +23,7 @@ class ClipboardMonitorWindow(tk.Toplevel):
         self.app_logic = app_logic
         self.on_close_callback = on_close_callback
         self.clipboard_monitor: Optional[ClipboardMonitor] = None
+        self._stats_after_id: Optional[str] = None
         
         self.title("Clipboard Monitor")
         self.geometry("600x400")
@@ -45,6 +46,10 @@ class ClipboardMonitorWindow(tk.Toplevel):
             font=("Arial", 10, "bold")
         ).pack(side="left")
         
+        # Added / duplicate counters, refreshed from the monitor on a timer
+        self.stats_var = tk.StringVar(value="Added: 0   Duplicates skipped: 0")
+        ttk.Label(top_frame, textvariable=self.stats_var).pack(side="right")
+        
         # Middle frame with Listbox and scrollbar
         mid_frame = ttk.Frame(self, padding=10)
         mid_frame.pack(fill="both", expand=True)
@@ -87,9 +92,9 @@ class ClipboardMonitorWindow(tk.Toplevel):
             self.url_listbox.insert(tk.END, url)
             # Auto-scroll to bottom
             self.url_listbox.see(tk.END)
-            logger.info(f"Added URL to listbox: {url}")
+            logger.info("Added URL to listbox: %s", url)
         except Exception as e:
-            logger.error(f"Error adding URL to listbox: {e}")
+            logger.error("Error adding URL to listbox: %s", e)
     
     def _start_monitoring(self):
         """Start clipboard monitoring."""
@@ -100,24 +105,37 @@ class ClipboardMonitorWindow(tk.Toplevel):
             )
             self.clipboard_monitor.start()
             logger.info("Clipboard monitoring started")
+            self._update_stats()
         except Exception as e:
-            logger.error(f"Error starting clipboard monitor: {e}")
+            logger.error("Error starting clipboard monitor: %s", e)
+    
+    def _update_stats(self):
+        """Show the monitor's added/duplicate counters; reschedules itself while open."""
+        monitor = self.clipboard_monitor
+        if monitor:
+            self.stats_var.set(
+                f"Added: {monitor.added_count}   Duplicates skipped: {monitor.duplicate_count}"
+            )
+        self._stats_after_id = self.after(1000, self._update_stats)
     
     def on_closing(self):
         """Handle window closing - stop monitoring and destroy window."""
+        if self._stats_after_id:
+            self.after_cancel(self._stats_after_id)
+        
         try:
             if self.clipboard_monitor:
                 self.clipboard_monitor.stop()
                 logger.info("Clipboard monitoring stopped")
         except Exception as e:
-            logger.error(f"Error stopping clipboard monitor: {e}")
+            logger.error("Error stopping clipboard monitor: %s", e)
         
         # Call parent callback if provided
         if self.on_close_callback:
             try:
                 self.on_close_callback()
             except Exception as e:
-                logger.error(f"Error in close callback: {e}")
+                logger.error("Error in close callback: %s", e)
         
         self.destroy()
 
@@ -0,0 +1,110 @@
+import queue
+import threading
+import tkinter as tk
+from typing import Any, Callable, Optional
+from app.utils.logger import setup_logging
+
+logger = setup_logging()
+
+class UIDataWorker:
+    """Runs DB queries and actions for the UI on a background thread.
+
+    Results are handed back through a queue that the Tk main loop drains with after(),
+    so callbacks always run on the UI thread. Jobs run one at a time in submission
+    order, which keeps "archive, then refresh" consistent.
+
+    Jobs submitted with a key are coalesced: while a job with that key is still waiting,
+    submitting another one is a no-op. Five F5 presses therefore cost one query; a press
+    while the query is already running queues exactly one follow-up."""
+
+    def __init__(self, root: tk.Misc, on_busy_change: Optional[Callable[[bool], None]] = None, poll_ms: int = 50):
+        self.root = root
+        self.on_busy_change = on_busy_change
+        self.poll_ms = poll_ms
+        self.jobs: queue.Queue = queue.Queue()
+        self.results: queue.Queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.pending_keys = set()
+        self.in_flight = 0
+        self.busy = False
+        self.closed = False
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self._after_id = self.root.after(self.poll_ms, self._drain)
+
+    def submit(self, fn: Callable[..., Any], *args,
+               on_done: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[Exception], None]] = None,
+               key: Optional[str] = None) -> bool:
+        """Queues fn(*args). Returns False if it was coalesced into an already waiting job."""
+        with self.lock:
+            if key is not None:
+                if key in self.pending_keys:
+                    return False
+                self.pending_keys.add(key)
+            self.in_flight += 1
+        self.jobs.put((key, fn, args, on_done, on_error))
+        self._set_busy(True)
+        return True
+
+    def close(self):
+        """Stops the worker thread and the drain loop."""
+        self.closed = True
+        self.jobs.put(None)
+        try:
+            self.root.after_cancel(self._after_id)
+        except tk.TclError:
+            pass
+
+    def _run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+
+            key, fn, args, on_done, on_error = job
+            # Once a job starts, a new submit with its key must queue a fresh run
+            if key is not None:
+                with self.lock:
+                    self.pending_keys.discard(key)
+
+            try:
+                result = fn(*args)
+                self.results.put((on_done, result, None, on_error))
+            except Exception as e:
+                logger.error("UI data job %s failed: %s", getattr(fn, '__name__', fn), e)
+                self.results.put((None, None, e, on_error))
+
+    def _drain(self):
+        """Runs completed callbacks on the Tk thread; reschedules itself."""
+        while True:
+            try:
+                on_done, result, error, on_error = self.results.get_nowait()
+            except queue.Empty:
+                break
+
+            with self.lock:
+                self.in_flight -= 1
+            try:
+                if error is None and on_done:
+                    on_done(result)
+                elif error is not None and on_error:
+                    on_error(error)
+            except Exception as e:
+                logger.error("Error in UI data callback: %s", e)
+
+        with self.lock:
+            busy = self.in_flight > 0
+        self._set_busy(busy)
+
+        if not self.closed:
+            self._after_id = self.root.after(self.poll_ms, self._drain)
+
+    def _set_busy(self, busy: bool):
+        # Only called from the Tk thread (submit and _drain)
+        if busy == self.busy:
+            return
+        self.busy = busy
+        if self.on_busy_change:
+            self.on_busy_change(busy)
@@ -0,0 +1,99 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+from typing import Callable, Dict, Optional
+from app.core.app import YTManagerApp
+from app.ui.data_access import UIDataWorker
+
+class SettingsWindow(tk.Toplevel):
+    """Editor for the runtime settings. A value is applied with Enter or Apply, and
+    takes effect in the running downloader, monitors and daemon without a restart."""
+
+    REFRESH_MS = 1000  # How often changes made elsewhere (CLI, daemon) are shown
+
+    def __init__(self, parent, app_logic: YTManagerApp, data: UIDataWorker,
+                 on_close_callback: Optional[Callable[[], None]] = None):
+        super().__init__(parent)
+        self.app_logic = app_logic
+        self.data = data
+        self.on_close_callback = on_close_callback
+        self.vars: Dict[str, tk.StringVar] = {}
+        self.labels: Dict[str, ttk.Label] = {}
+        self.shown: Dict[str, str] = {}  # Value last put in each entry
+        self._refresh_after_id: Optional[str] = None
+
+        self.title("Settings")
+        self.protocol("WM_DELETE_WINDOW", self.on_closing)
+        self._create_widgets()
+        self._refresh()
+
+    def _create_widgets(self):
+        frame = ttk.Frame(self, padding=10)
+        frame.pack(fill="both", expand=True)
+        frame.columnconfigure(3, weight=1)
+
+        for row, (tunable, _, _) in enumerate(self.app_logic.get_settings()):
+            name = tunable.name
+            label = ttk.Label(frame, text=name)
+            label.grid(row=row, column=0, sticky="w", padx=5, pady=2)
+            var = tk.StringVar()
+            entry = ttk.Entry(frame, textvariable=var, width=30)
+            entry.grid(row=row, column=1, sticky="w", padx=5, pady=2)
+            entry.bind("<Return>", lambda event, n=name: self.apply(n))
+            ttk.Button(frame, text="Default", width=8,
+                       command=lambda n=name: self.reset(n)).grid(row=row, column=2, padx=5, pady=2)
+            ttk.Label(frame, text=tunable.help, foreground="gray").grid(row=row, column=3, sticky="w", padx=5)
+            self.vars[name] = var
+            self.labels[name] = label
+
+        bot_frame = ttk.Frame(self, padding=10)
+        bot_frame.pack(fill="x")
+        ttk.Button(bot_frame, text="Close", command=self.on_closing).pack(side="right", padx=5)
+        ttk.Button(bot_frame, text="Apply", command=self.apply_all).pack(side="right", padx=5)
+        self.status_var = tk.StringVar(value="* = changed from the default")
+        ttk.Label(bot_frame, textvariable=self.status_var).pack(side="left", padx=5)
+
+    def _refresh(self):
+        """Shows current values, except in entries the user has edited and not applied."""
+        for tunable, value, overridden in self.app_logic.get_settings():
+            name = tunable.name
+            self.labels[name].config(text=f"{name} *" if overridden else name)
+            var = self.vars[name]
+            if var.get() == self.shown.get(name, ""):
+                var.set(str(value))
+                self.shown[name] = str(value)
+        self._refresh_after_id = self.after(self.REFRESH_MS, self._refresh)
+
+    def apply_all(self):
+        for name, var in self.vars.items():
+            if var.get() != self.shown.get(name):
+                self.apply(name)
+
+    def apply(self, name: str):
+        # Off the UI thread: it writes the DB and may create a directory
+        text = self.vars[name].get()
+        self.data.submit(
+            self.app_logic.set_setting, name, text,
+            on_done=lambda value: self._applied(name, value),
+            on_error=lambda e: messagebox.showerror("Settings", f"Invalid value for {e}", parent=self)
+        )
+
+    def reset(self, name: str):
+        self.data.submit(
+            self.app_logic.reset_setting, name,
+            on_done=lambda _: self._applied(name, None),
+            on_error=lambda e: messagebox.showerror("Settings", str(e), parent=self)
+        )
+
+    def _applied(self, name: str, value):
+        if not self.winfo_exists():
+            return
+        # Let _refresh put the applied value in the entry
+        self.shown[name] = self.vars[name].get()
+        self.status_var.set(f"{name} reset to its default" if value is None else f"{name} = {value}")
+
+    def on_closing(self):
+        if self._refresh_after_id:
+            self.after_cancel(self._refresh_after_id)
+        if self.on_close_callback:
+            self.on_close_callback()
+        self.destroy()
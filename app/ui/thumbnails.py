@@ -0,0 +1,126 @@
+import io
+import os
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+from PIL import Image, ImageTk
+from app.settings import THUMBNAIL_DIR, THUMBNAIL_URL
+from app.utils.logger import setup_logging
+
+logger = setup_logging()
+
+class ThumbnailCache:
+    """Two-tier thumbnail cache for the queue view.
+
+    Tier 1 is a bounded in-memory LRU of decoded PhotoImages; tier 2 is a directory of
+    thumbnails already resized to display size. Missing thumbnails are downloaded and
+    resized once, on a small background pool; nothing is fetched or decoded for rows
+    the user cannot see.
+
+    photo() creates Tk images and must be called on the Tk thread. Everything else is
+    thread-safe."""
+
+    RETRY_AFTER = 300  # Seconds before a failed fetch is tried again
+
+    def __init__(self, cache_dir: Path = THUMBNAIL_DIR, url_template: str = THUMBNAIL_URL,
+                 size: Tuple[int, int] = (80, 45), memory_items: int = 200, workers: int = 4):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.url_template = url_template
+        self.size = size
+        self.memory_items = memory_items
+        self.photos: "OrderedDict[str, ImageTk.PhotoImage]" = OrderedDict()
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbs")
+        self.lock = threading.Lock()
+        self.in_flight: Set[str] = set()
+        self.failed: Dict[str, float] = {}  # video_id -> monotonic time of the failure
+        self.ready: Set[str] = set()
+
+    def path_for(self, video_id: str) -> Path:
+        return self.cache_dir / f"{video_id}.jpg"
+
+    def photo(self, video_id: str) -> Optional[ImageTk.PhotoImage]:
+        """Returns the thumbnail for a visible row, or None while it is being fetched."""
+        photo = self.photos.get(video_id)
+        if photo is not None:
+            self.photos.move_to_end(video_id)
+            return photo
+
+        image = self.load(video_id)
+        if image is None:
+            self.request(video_id)
+            return None
+
+        photo = ImageTk.PhotoImage(image)
+        self.photos[video_id] = photo
+        while len(self.photos) > self.memory_items:
+            self.photos.popitem(last=False)
+        return photo
+
+    def load(self, video_id: str) -> Optional[Image.Image]:
+        """Decodes the on-disk thumbnail, or returns None if it is not cached yet."""
+        path = self.path_for(video_id)
+        if not path.exists():
+            return None
+        try:
+            with Image.open(path) as image:
+                image.load()
+                return image
+        except Exception as e:
+            logger.warning("Discarding unreadable thumbnail %s: %s", path, e)
+            path.unlink(missing_ok=True)
+            return None
+
+    def request(self, video_id: str):
+        """Schedules a background fetch unless one is running or failed in the last RETRY_AFTER seconds."""
+        with self.lock:
+            if video_id in self.in_flight:
+                return None
+            failed_at = self.failed.get(video_id)
+            if failed_at is not None:
+                if time.monotonic() - failed_at < self.RETRY_AFTER:
+                    return None
+                del self.failed[video_id]
+            self.in_flight.add(video_id)
+        return self.pool.submit(self._fetch, video_id)
+
+    def pop_ready(self) -> Set[str]:
+        """Returns video IDs whose thumbnails landed on disk since the last call."""
+        with self.lock:
+            ready, self.ready = self.ready, set()
+        return ready
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch(self, video_id: str) -> bool:
+        url = self.url_template.format(video_id=video_id)
+        path = self.path_for(video_id)
+        try:
+            with urllib.request.urlopen(url, timeout=10) as response:
+                data = response.read()
+
+            with Image.open(io.BytesIO(data)) as image:
+                image.thumbnail(self.size)
+                thumb = image.convert("RGB")
+
+            # Write then rename, so a reader never sees a half-written file
+            tmp_path = path.with_suffix(".tmp")
+            thumb.save(tmp_path, "JPEG", quality=85)
+            os.replace(tmp_path, path)
+
+            with self.lock:
+                self.ready.add(video_id)
+            return True
+        except Exception as e:
+            logger.debug("Thumbnail fetch failed for %s: %s", video_id, e)
+            with self.lock:
+                self.failed[video_id] = time.monotonic()
+            return False
+        finally:
+            with self.lock:
+                self.in_flight.discard(video_id)
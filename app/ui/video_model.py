@@ -0,0 +1,81 @@
+import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.db.models import Video
+from app.db.video import ACTIVE_STATUSES
+
+class VideoListModel:
+    """In-memory copy of the queue view, keyed by row id.
+
+    The window loads it once, then feeds it rows from get_videos_changed_since(since())
+    and repaints only what apply() reports as inserted, updated or removed."""
+
+    def __init__(self, active_statuses: Iterable[str] = ACTIVE_STATUSES, overlap_seconds: float = 2.0):
+        self.active_statuses = set(active_statuses)
+        self.rows: Dict[int, Video] = {}
+        self.watermark: Optional[datetime.datetime] = None
+        # Writers stamp modified_dt before they commit, so a row can become visible
+        # slightly after a newer one. Re-reading a short window catches those rows.
+        self.overlap = datetime.timedelta(seconds=overlap_seconds)
+
+    @property
+    def loaded(self) -> bool:
+        return self.watermark is not None
+
+    def since(self) -> datetime.datetime:
+        """Lower bound for the next changed-since query."""
+        return self.watermark - self.overlap
+
+    def load(self, videos: List[Video], as_of: datetime.datetime):
+        """Replaces the model with a full result set read at as_of."""
+        self.rows = {v.id: v for v in videos if v.status in self.active_statuses}
+        self.watermark = as_of
+
+    def reset(self):
+        """Forgets all rows; the next refresh must be a full load."""
+        self.rows = {}
+        self.watermark = None
+
+    def extend(self, videos: List[Video]) -> List[Video]:
+        """Adds a page of search results without touching the watermark. Returns the new rows."""
+        added = [v for v in videos if v.id not in self.rows]
+        for video in added:
+            self.rows[video.id] = video
+        return added
+
+    def apply(self, changed: List[Video], advance: bool = True, insert: bool = True) -> Tuple[List[Video], List[Video], List[int]]:
+        """Merges changed rows. Returns (inserted, updated, removed_ids); unchanged rows are skipped.
+
+        Pass advance=False for rows fetched by id (event patches): they say nothing about
+        other rows, so they must not move the watermark past changes not yet read.
+        Pass insert=False when the view is a search result, which new rows may not match."""
+        inserted, updated, removed = [], [], []
+        for video in changed:
+            if advance:
+                self._advance(video.modified_dt)
+            row_id = video.id
+            active = video.status in self.active_statuses
+            current = self.rows.get(row_id)
+
+            if current is None:
+                if active and insert:
+                    self.rows[row_id] = video
+                    inserted.append(video)
+            elif not active:
+                del self.rows[row_id]
+                removed.append(row_id)
+            elif current != video:
+                self.rows[row_id] = video
+                updated.append(video)
+
+        return inserted, updated, removed
+
+    def _advance(self, modified_dt):
+        if not modified_dt:
+            return
+        if isinstance(modified_dt, str):
+            try:
+                modified_dt = datetime.datetime.fromisoformat(modified_dt)
+            except ValueError:
+                return
+        if self.watermark is None or modified_dt > self.watermark:
+            self.watermark = modified_dt
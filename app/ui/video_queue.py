@@ -1,91 +1,75 @@
+import datetime
+import threading
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox
 from typing import Optional
 from app.core.app import YTManagerApp
+from app.core import events, progress
+from app.db.models import Video
+from app.settings import SHOW_THUMBNAILS
 from app.ui.clipmon import ClipboardMonitorWindow
+from app.ui.data_access import UIDataWorker
+from app.ui.settings import SettingsWindow
+from app.ui.thumbnails import ThumbnailCache
+from app.ui.video_model import VideoListModel
+from app.utils import metrics
 from app.utils.logger import setup_logging
+from app.utils.profiling import profiler
 from PIL import Image, ImageTk, ImageDraw
 
 logger = setup_logging()
 
-class ScrollableFrame(ttk.Frame):
-    def __init__(self, container, *args, **kwargs):
-        super().__init__(container, *args, **kwargs)
-        canvas = tk.Canvas(self)
-        scrollbar = ttk.Scrollbar(self, orient="vertical", command=canvas.yview)
-        self.scrollable_frame = ttk.Frame(canvas)
-
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(
-                scrollregion=canvas.bbox("all")
-            )
-        )
-
-        canvas_window = canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        
-        # Ensure frame width matches canvas
-        def configure_frame_width(event):
-            canvas.itemconfig(canvas_window, width=event.width)
-        
-        canvas.bind("<Configure>", configure_frame_width)
-
-        canvas.configure(yscrollcommand=scrollbar.set)
-
-        # Bind mouse wheel events for scrolling
-        def _on_mousewheel(event):
-            # Windows and Linux
-            canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
-        
-        def _on_mousewheel_linux(event):
-            # Linux alternative
-            if event.num == 4:
-                canvas.yview_scroll(-1, "units")
-            elif event.num == 5:
-                canvas.yview_scroll(1, "units")
-        
-        # Bind mouse wheel to canvas and scrollable frame
-        canvas.bind("<MouseWheel>", _on_mousewheel)  # Windows
-        canvas.bind("<Button-4>", _on_mousewheel_linux)  # Linux scroll up
-        canvas.bind("<Button-5>", _on_mousewheel_linux)  # Linux scroll down
-        
-        # Also bind to the scrollable frame so scrolling works when hovering over it
-        self.scrollable_frame.bind("<MouseWheel>", _on_mousewheel)
-        self.scrollable_frame.bind("<Button-4>", _on_mousewheel_linux)
-        self.scrollable_frame.bind("<Button-5>", _on_mousewheel_linux)
-        
-        # Bind to parent window when mouse enters canvas area (for better Windows support)
-        # This ensures mouse wheel works even when canvas doesn't have focus
-        def _on_enter(event):
-            container.bind_all("<MouseWheel>", _on_mousewheel)
-        
-        def _on_leave(event):
-            container.unbind_all("<MouseWheel>")
-        
-        canvas.bind("<Enter>", _on_enter)
-        canvas.bind("<Leave>", _on_leave)
-        self.scrollable_frame.bind("<Enter>", _on_enter)
-        self.scrollable_frame.bind("<Leave>", _on_leave)
-        
-        # Store canvas reference for potential future use
-        self.canvas = canvas
-
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-
 class MainWindow(tk.Tk):
+    COLUMNS = ("video_id", "status", "progress", "speed", "title", "channel", "duration", "published")
+    # Sortable columns -> db.SORT_KEYS name. The default order (newest first) is create_dt.
+    SORTABLE = {"channel": "channel", "duration": "duration", "published": "published_dt"}
+    HEADINGS = {"video_id": "ID", "status": "Status", "progress": "Progress", "speed": "Speed / ETA",
+                "title": "Title", "channel": "Channel", "duration": "Duration", "published": "Published"}
+    PAGE_SIZE = 200
+    PATCH_FPS = 4  # Max repaint rate for rows changed by pipeline events
+    PROGRESS_MS = 500  # How often download progress is read from the in-memory tracker
+    FOOTER_STATUSES = ("new", "open", "down", "error")  # Counted in the footer, from memory
+
     def __init__(self, app_logic: YTManagerApp):
         super().__init__()
         self.app_logic = app_logic
         self.title("YT Manager v1")
         self.geometry("1100x600")
         self.clipmon_window: Optional[ClipboardMonitorWindow] = None
+        self.settings_window: Optional[SettingsWindow] = None
+        self.model = VideoListModel()
+        self.data: Optional[UIDataWorker] = None
+        # Thumbnails: fetched in the background, decoded only for visible rows
+        self.thumbs: Optional[ThumbnailCache] = ThumbnailCache() if SHOW_THUMBNAILS else None
+        self.thumb_rows = set()  # Tree items currently showing an image
+        self._thumb_update_pending = False
+        # Search box and column sorting; any non-default state switches the list to
+        # paginated search results instead of the incrementally refreshed queue
+        self.search_query = ""
+        self.sort = "create_dt"
+        self.sort_desc = True
+        self.page_loading = False
+        self.page_exhausted = False
+        self.page_after: Optional[tuple] = None  # (sort_key, id) of the last loaded row
+        self._search_after_id: Optional[str] = None
+        # Row ids reported by the event bus, repainted by _flush_dirty_rows
+        self.dirty_ids = set()
+        self.dirty_lock = threading.Lock()
+        self.progress_rows = set()  # Tree items currently showing download progress
 
         self._set_icon()
         self._create_widgets()
+        self.data = UIDataWorker(self, on_busy_change=self._on_busy_change)
         self._bind_shortcuts()
         self.refresh_table()
 
+        # Live updates from the metadata and download pipelines
+        self.unsubscribe_events = events.bus.subscribe(self._on_pipeline_event)
+        self.bind("<Destroy>", self._on_destroy)
+        self.after(1000 // self.PATCH_FPS, self._flush_dirty_rows)
+        self.after(self.PROGRESS_MS, self._update_progress)
+
     def _set_icon(self):
         """Sets the window icon by generating a PNG using Pillow."""
         try:
@@ -119,11 +103,14 @@ class MainWindow(tk.Tk):
             self.iconphoto(True, self.icon_photo)
             
         except Exception as e:
-            logger.error(f"Failed to set window icon: {e}")
+            logger.error("Failed to set window icon: %s", e)
 
     def _bind_shortcuts(self):
         """Bind global keyboard shortcuts."""
         self.bind("<F5>", lambda event: self.refresh_table())
+        self.bind("<Control-F5>", lambda event: self.refresh_table(full=True))
+        # Thread stacks and memory top-N to the profile directory, as SIGUSR1 does
+        self.bind("<Control-F12>", lambda event: profiler.dump_async("hotkey"))
         # When the main window gains focus, set focus to the URL entry
         self.bind("<FocusIn>", lambda event: self._on_focus_in(event))
 
@@ -147,37 +134,71 @@ class MainWindow(tk.Tk):
         add_btn = ttk.Button(top_frame, text="Add Video", command=self.add_video)
         add_btn.pack(side="left", padx=5)
 
+        # Search title/channel (FTS); Escape clears
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(top_frame, textvariable=self.search_var, width=30)
+        search_entry.pack(side="right", padx=5)
+        search_entry.bind("<Escape>", lambda event: self.search_var.set(""))
+        ttk.Label(top_frame, text="Search:").pack(side="right", padx=5)
+        self.search_var.trace_add("write", lambda *args: self._schedule_search())
+
         # Middle Frame: Video List
         mid_frame = ttk.Frame(self, padding=10)
         mid_frame.pack(fill="both", expand=True)
 
-        # Headers
-        headers_frame = ttk.Frame(mid_frame)
-        headers_frame.pack(fill="x", pady=(0, 5))
-        
-        # Define Grid Weights for Headers
-        # Adjusted: ID/Status pinned (weight=0), Title expands (weight=1), Channel/Actions pinned (weight=0)
-        headers_frame.columnconfigure(0, weight=0, minsize=120) # ID
-        headers_frame.columnconfigure(1, weight=0, minsize=100) # Status
-        headers_frame.columnconfigure(2, weight=1)              # Title (Expands)
-        headers_frame.columnconfigure(3, weight=0, minsize=150) # Channel
-        headers_frame.columnconfigure(4, weight=0, minsize=200) # Actions
-
-        cols = ["ID", "Status", "Title", "Channel", "Actions"]
-        for i, col in enumerate(cols):
-            lbl = ttk.Label(headers_frame, text=col, font=("Arial", 10, "bold"))
-            lbl.grid(row=0, column=i, sticky="w", padx=5)
-
-        # Scrollable List
-        self.list_frame = ScrollableFrame(mid_frame)
-        self.list_frame.pack(fill="both", expand=True)
-        
-        # Configure inner frame columns to match headers
-        self.list_frame.scrollable_frame.columnconfigure(0, weight=0, minsize=120)
-        self.list_frame.scrollable_frame.columnconfigure(1, weight=0, minsize=100)
-        self.list_frame.scrollable_frame.columnconfigure(2, weight=1)
-        self.list_frame.scrollable_frame.columnconfigure(3, weight=0, minsize=150)
-        self.list_frame.scrollable_frame.columnconfigure(4, weight=0, minsize=200)
+        # Video list: a Treeview only draws the rows that are visible, so the widget
+        # count stays constant no matter how many videos are active
+        show = "tree headings" if self.thumbs else "headings"
+        self.tree = ttk.Treeview(mid_frame, columns=self.COLUMNS, show=show, selectmode="extended",
+                                 style="Queue.Treeview")
+        if self.thumbs:
+            # Column #0 holds the thumbnail; rows must be tall enough for it
+            ttk.Style(self).configure("Queue.Treeview", rowheight=self.thumbs.size[1] + 6)
+            self.tree.heading("#0", text="")
+            self.tree.column("#0", width=self.thumbs.size[0] + 10, minwidth=self.thumbs.size[0] + 10, stretch=False)
+        for col, width, stretch in (
+            ("video_id", 120, False),
+            ("status", 100, False),
+            ("progress", 110, False),
+            ("speed", 120, False),
+            ("title", 400, True),
+            ("channel", 150, False),
+            ("duration", 80, False),
+            ("published", 90, False),
+        ):
+            self.tree.heading(col, text=self.HEADINGS[col], anchor="w")
+            self.tree.column(col, width=width, minwidth=60, stretch=stretch, anchor="w")
+            if col in self.SORTABLE:
+                self.tree.heading(col, command=lambda c=col: self.sort_by(c))
+
+        scrollbar = ttk.Scrollbar(mid_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=lambda first, last: self._on_tree_scroll(scrollbar, first, last))
+        self.tree.bind("<Configure>", lambda event: self._schedule_thumbnail_update())
+        self.tree.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+
+        # Row actions: context menu, keys and double-click
+        self.row_menu = tk.Menu(self, tearoff=0)
+        self.row_menu.add_command(label="Play", accelerator="Enter", command=self.play_selected)
+        self.row_menu.add_command(label="Del", accelerator="Del", command=self.delete_selected)
+        self.row_menu.add_command(label="Archive", accelerator="A", command=self.archive_selected)
+        self.row_menu.add_command(label="Web", accelerator="W", command=self.web_selected)
+
+        self.tree.bind("<Double-1>", lambda event: self.play_selected())
+        self.tree.bind("<Return>", lambda event: self.play_selected())
+        self.tree.bind("<Delete>", lambda event: self.delete_selected())
+        self.tree.bind("a", lambda event: self.archive_selected())
+        self.tree.bind("w", lambda event: self.web_selected())
+        self.tree.bind("<Button-3>", self._show_row_menu)  # Windows / Linux
+        self.tree.bind("<Button-2>", self._show_row_menu)  # macOS
+
+        # Action buttons for the selected row(s)
+        actions_frame = ttk.Frame(self, padding=(10, 0))
+        actions_frame.pack(fill="x")
+        ttk.Button(actions_frame, text="Play", command=self.play_selected, width=6).pack(side="left", padx=2)
+        ttk.Button(actions_frame, text="Del", command=self.delete_selected, width=6).pack(side="left", padx=2)
+        ttk.Button(actions_frame, text="Archive", command=self.archive_selected, width=8).pack(side="left", padx=2)
+        ttk.Button(actions_frame, text="Web", command=self.web_selected, width=6).pack(side="left", padx=2)
 
         # Bottom Frame
         bot_frame = ttk.Frame(self, padding=10)
@@ -198,62 +219,335 @@ class MainWindow(tk.Tk):
         clipmon_btn = ttk.Button(bot_frame, text="Clipboard Monitor", command=self.open_clipboard_monitor)
         clipmon_btn.pack(side="left", padx=5)
 
+        settings_btn = ttk.Button(bot_frame, text="Settings", command=self.open_settings)
+        settings_btn.pack(side="left", padx=5)
+
+        # Busy indicator, shown while DB work runs off the UI thread
+        self.busy_bar = ttk.Progressbar(bot_frame, mode="indeterminate", length=100)
+
+        # Download totals: aggregate speed, queue length and busy slots
+        self.downloads_label = ttk.Label(bot_frame, text="")
+        self.downloads_label.pack(side="right", padx=5)
+
     def add_video(self):
         url = self.url_var.get().strip()
         if url:
-            self.app_logic.add_video(url)
             self.url_var.set("")
-            self.after(100, self.refresh_table)
+            self.data.submit(self.app_logic.add_video, url, on_done=lambda _: self.refresh_table())
+
+    def refresh_table(self, full: bool = False):
+        """Incremental refresh: fetch rows changed since the last one and patch only those.
+        The first call, or full=True (Ctrl+F5), reloads every active row.
+        Queries run on the data worker; repeated presses while one is queued coalesce.
+        While searching or sorting, a refresh re-runs the first page instead."""
+        if self._search_mode():
+            self._load_search_page(reset=True)
+        elif full or not self.model.loaded:
+            self.data.submit(self._load_all, on_done=self._timed("ui.refresh_full", self._apply_full), key="refresh-full")
+        else:
+            self.data.submit(self._load_changes, on_done=self._timed("ui.refresh", self._apply_changes), key="refresh")
+
+    def _timed(self, stage: str, apply):
+        """Wraps a refresh callback so the time from request to repainted rows is recorded."""
+        start = time.perf_counter()
+
+        def on_done(result):
+            with profiler.profiled("refresh"):
+                apply(result)
+            metrics.record(stage, (time.perf_counter() - start) * 1000)
+        return on_done
+
+    def _load_all(self):
+        # Runs on the data worker thread
+        with profiler.profiled("refresh"):
+            as_of = datetime.datetime.now()
+            return as_of, self.app_logic.get_active_videos()
+
+    def _load_changes(self):
+        # Runs on the data worker thread
+        with profiler.profiled("refresh"):
+            return self.app_logic.get_videos_changed_since(self.model.since())
+
+    def _apply_full(self, result):
+        as_of, videos = result
+        self.model.load(videos, as_of)
+        self._repaint_all()
+
+    def _apply_changes(self, changed, advance: bool = True):
+        # Search results only get their existing rows patched, never new ones
+        inserted, updated, removed = self.model.apply(changed, advance=advance, insert=not self._search_mode())
+
+        for row_id in removed:
+            if self.tree.exists(str(row_id)):
+                self.tree.delete(str(row_id))
+        for video in updated:
+            self.tree.item(str(video.id), values=self._row_values(video))
+        for video in sorted(inserted, key=lambda v: v.create_dt or datetime.datetime.min):
+            self.tree.insert("", self._insert_index(video), iid=str(video.id), values=self._row_values(video))
+
+        if inserted or removed:
+            self.thumb_rows -= {str(row_id) for row_id in removed}
+            self._schedule_thumbnail_update()
+
+    def _on_pipeline_event(self, event: events.Event):
+        """Bus subscriber; runs on the publishing thread, so it only records the row id.
+        Progress is read from the tracker by _update_progress, so it needs no DB patch."""
+        if event.video_id is not None and event.type != events.DOWNLOAD_PROGRESS:
+            with self.dirty_lock:
+                self.dirty_ids.add(event.video_id)
+
+    def _flush_dirty_rows(self):
+        """Patches rows touched by pipeline events, at most PATCH_FPS times a second."""
+        with self.dirty_lock:
+            video_ids, self.dirty_ids = list(self.dirty_ids), set()
+        if video_ids and self.model.rows:
+            self.data.submit(
+                self.app_logic.get_videos_by_ids, video_ids,
+                on_done=lambda rows: self._apply_changes(rows, advance=False)
+            )
+        if self.thumbs and self.thumbs.pop_ready():
+            self._schedule_thumbnail_update()
+        self.after(1000 // self.PATCH_FPS, self._flush_dirty_rows)
+
+    def _update_progress(self):
+        """Refreshes the progress cells of downloading rows and the footer totals from
+        the in-memory tracker and status counts; no DB queries, and only rows that are
+        downloading are touched."""
+        downloads, summary = progress.tracker.snapshot()
+        shown = {str(video_id) for video_id in downloads}
+
+        for iid in self.progress_rows - shown:
+            if self.tree.exists(iid):
+                self.tree.set(iid, "progress", "")
+                self.tree.set(iid, "speed", "")
+        self.progress_rows = set()
+        for video_id, current in downloads.items():
+            iid = str(video_id)
+            if self.tree.exists(iid):
+                self.tree.set(iid, "progress", progress.progress_bar(current.percent))
+                self.tree.set(iid, "speed", self._speed_text(current))
+                self.progress_rows.add(iid)
+
+        counts = self.app_logic.get_status_counts()
+        statuses = "   ".join(f"{status.capitalize()}: {counts.get(status, 0)}" for status in self.FOOTER_STATUSES)
+        self.downloads_label.config(
+            text=f"{statuses}   \u2193 {progress.format_bytes(summary.speed)}/s   "
+                 f"Queued: {summary.queued}   Active: {summary.active}/{summary.limit}"
+        )
+        self.after(self.PROGRESS_MS, self._update_progress)
+
+    def _speed_text(self, current: Optional[progress.DownloadProgress]) -> str:
+        if current is None:
+            return ""
+        return f"{progress.format_bytes(current.speed)}/s  {progress.format_eta(current.eta)}"
+
+    def _on_destroy(self, event):
+        if event.widget is self:
+            self.unsubscribe_events()
+            self.data.close()
+            if self.thumbs:
+                self.thumbs.close()
+
+    def _on_tree_scroll(self, scrollbar, first, last):
+        scrollbar.set(first, last)
+        self._schedule_thumbnail_update()
+        # Fetch the next page of search results when the user nears the bottom
+        if self._search_mode() and float(last) >= 0.98:
+            self._load_search_page(reset=False)
+
+    # ----------------------------------------------------------------
+    # Search / Sort
+    # ----------------------------------------------------------------
+
+    def _search_mode(self) -> bool:
+        return bool(self.search_query) or self.sort != "create_dt" or not self.sort_desc
+
+    def _schedule_search(self):
+        """Debounces typing: search 300 ms after the last keystroke."""
+        if self._search_after_id:
+            self.after_cancel(self._search_after_id)
+        self._search_after_id = self.after(300, self._apply_search_text)
+
+    def _apply_search_text(self):
+        self._search_after_id = None
+        query = self.search_var.get().strip()
+        if query != self.search_query:
+            self.search_query = query
+            self._on_view_changed()
+
+    def sort_by(self, col: str):
+        """Heading click: sort by that column, toggling direction; a third click restores the default order."""
+        sort = self.SORTABLE[col]
+        if self.sort != sort:
+            self.sort, self.sort_desc = sort, False
+        elif not self.sort_desc:
+            self.sort_desc = True
+        else:
+            self.sort, self.sort_desc = "create_dt", True
+
+        for name in self.SORTABLE:
+            text = self.HEADINGS[name]
+            if self.SORTABLE[name] == self.sort:
+                text += " \u25bc" if self.sort_desc else " \u25b2"
+            self.tree.heading(name, text=text)
+        self._on_view_changed()
+
+    def _on_view_changed(self):
+        """Search text or sort changed: drop the current rows and load the new view."""
+        self.model.reset()
+        self.tree.delete(*self.tree.get_children())
+        self.thumb_rows = set()
+        self.refresh_table()
 
-    def refresh_table(self):
-        # Clear existing
-        for widget in self.list_frame.scrollable_frame.winfo_children():
-            widget.destroy()
+    def _load_search_page(self, reset: bool):
+        if not reset and (self.page_loading or self.page_exhausted or self.page_after is None):
+            return
 
-        videos = self.app_logic.get_all_videos()
-        
-        # Filter videos based on requirements (new, open, down, error)
-        allowed_statuses = {'new', 'open', 'down', 'error'}
-        active_videos = [v for v in videos if v['status'] in allowed_statuses]
-        
-        # Grid Layout for rows
-        for i, video in enumerate(active_videos):
-            row = i
-            # ID
-            ttk.Label(self.list_frame.scrollable_frame, text=str(video['video_id'])).grid(row=row, column=0, sticky="w", padx=5, pady=5)
-            # Status
-            status = video['status']
-            if video['error_msg']:
-                status += " (!)"
-            ttk.Label(self.list_frame.scrollable_frame, text=status).grid(row=row, column=1, sticky="w", padx=5, pady=5)
-            # Title
-            title = video['title'] or ""
-            if len(title) > 100:
-                title = title[:97] + "..."
-            ttk.Label(self.list_frame.scrollable_frame, text=title).grid(row=row, column=2, sticky="w", padx=5, pady=5)
-            # Channel
-            channel = video['channel'] or ""
-            if len(channel) > 20:
-                channel = channel[:17] + "..."
-            ttk.Label(self.list_frame.scrollable_frame, text=channel).grid(row=row, column=3, sticky="w", padx=5, pady=5)
-            
-            # Actions Frame
-            actions_frame = ttk.Frame(self.list_frame.scrollable_frame)
-            actions_frame.grid(row=row, column=4, sticky="w", padx=5, pady=5)
-            
-            ttk.Button(actions_frame, text="Play", command=lambda v=video['id']: self.app_logic.play_video(v), width=6).pack(side="left", padx=2)
-            ttk.Button(actions_frame, text="Del", command=lambda v=video['id']: self.delete_video(v), width=6).pack(side="left", padx=2)
-            ttk.Button(actions_frame, text="Archive", command=lambda v=video['id']: self.archive_video(v), width=8).pack(side="left", padx=2)
-            ttk.Button(actions_frame, text="Web", command=lambda v=video['id']: self.app_logic.open_web_url(v), width=6).pack(side="left", padx=2)
-
-    def delete_video(self, video_id):
-        if messagebox.askyesno("Confirm", "Delete this video?"):
-            self.app_logic.delete_video(video_id)
+        view = (self.search_query, self.sort, self.sort_desc)
+        after = None if reset else self.page_after
+
+        self.page_loading = True
+        self.data.submit(
+            self.app_logic.search_videos, *view, after, self.PAGE_SIZE,
+            on_done=self._timed("ui.search", lambda rows: self._apply_search_page(view, rows, reset)),
+            on_error=lambda e: setattr(self, 'page_loading', False),
+            key="search" if reset else None
+        )
+
+    def _apply_search_page(self, view: tuple, rows: list, reset: bool):
+        self.page_loading = False
+        if view != (self.search_query, self.sort, self.sort_desc):
+            return  # The user changed the search while this page was loading
+
+        if reset:
+            self.model.reset()
+            self.tree.delete(*self.tree.get_children())
+            self.thumb_rows = set()
+        self.page_exhausted = len(rows) < self.PAGE_SIZE
+        if rows:
+            self.page_after = (rows[-1].sort_key, rows[-1].id)
+        elif reset:
+            self.page_after = None
+
+        for video in self.model.extend(rows):
+            self.tree.insert("", "end", iid=str(video.id), values=self._row_values(video))
+        self._schedule_thumbnail_update()
+
+    def _schedule_thumbnail_update(self):
+        """Coalesces scroll/resize/repaint notifications into one visible-rows pass."""
+        if self.thumbs and not self._thumb_update_pending:
+            self._thumb_update_pending = True
+            self.after_idle(self._update_visible_thumbnails)
+
+    def _visible_rows(self) -> set:
+        rows = set()
+        row_height = self.thumbs.size[1] + 6
+        for y in range(0, self.tree.winfo_height(), row_height):
+            iid = self.tree.identify_row(y)
+            if iid:
+                rows.add(iid)
+        return rows
+
+    def _update_visible_thumbnails(self):
+        """Shows thumbnails for visible rows only and releases them for rows scrolled away,
+        so the memory LRU never has to hold more than a screenful of live images."""
+        self._thumb_update_pending = False
+        visible = self._visible_rows()
+
+        for iid in self.thumb_rows - visible:
+            if self.tree.exists(iid):
+                self.tree.item(iid, image="")
+        self.thumb_rows &= visible
+
+        for iid in visible - self.thumb_rows:
+            video = self.model.rows.get(int(iid))
+            if not video or not video.video_id:
+                continue
+            photo = self.thumbs.photo(video.video_id)
+            if photo is not None:
+                self.tree.item(iid, image=photo)
+                self.thumb_rows.add(iid)
+
+    def _repaint_all(self):
+        selected = self.tree.selection()
+        self.tree.delete(*self.tree.get_children())
+        for video in self.model.rows.values():
+            self.tree.insert("", "end", iid=str(video.id), values=self._row_values(video))
+
+        # Keep the selection across refreshes where the rows still exist
+        still_there = [iid for iid in selected if self.tree.exists(iid)]
+        if still_there:
+            self.tree.selection_set(still_there)
+
+        self.thumb_rows = set()
+        self._schedule_thumbnail_update()
+
+    def _insert_index(self, video: Video) -> int:
+        """Position that keeps the list ordered by create_dt, newest first."""
+        create_dt = video.create_dt or datetime.datetime.min
+        children = self.tree.get_children()
+        for index, iid in enumerate(children):
+            if (self.model.rows[int(iid)].create_dt or datetime.datetime.min) < create_dt:
+                return index
+        return len(children)
+
+    def _row_values(self, video: Video) -> tuple:
+        status = video.status
+        if video.error_msg:
+            status += " (!)"
+        secs = video.duration_secs
+        duration = f"{secs // 3600}:{secs % 3600 // 60:02d}:{secs % 60:02d}" if secs else ""
+        published = video.published_dt.date().isoformat() if video.published_dt else ""
+        current = progress.tracker.get(video.id)
+        bar = progress.progress_bar(current.percent) if current else ""
+        return (video.video_id or "", status, bar, self._speed_text(current),
+                video.title or "", video.channel or "", duration, published)
+
+    def _selected_ids(self) -> list:
+        return [int(iid) for iid in self.tree.selection()]
+
+    def _show_row_menu(self, event):
+        row = self.tree.identify_row(event.y)
+        if not row:
+            return
+        if row not in self.tree.selection():
+            self.tree.selection_set(row)
+        self.tree.focus(row)
+        self.row_menu.tk_popup(event.x_root, event.y_root)
+
+    def play_selected(self):
+        for video_id in self._selected_ids():
+            self.data.submit(self.app_logic.play_video, video_id)
+
+    def web_selected(self):
+        for video_id in self._selected_ids():
+            self.data.submit(self.app_logic.open_web_url, video_id)
+
+    def delete_selected(self):
+        video_ids = self._selected_ids()
+        if not video_ids:
+            return
+        prompt = "Delete this video?" if len(video_ids) == 1 else f"Delete {len(video_ids)} videos?"
+        if messagebox.askyesno("Confirm", prompt):
+            for video_id in video_ids:
+                self.data.submit(self.app_logic.delete_video, video_id)
             self.refresh_table()
 
-    def archive_video(self, video_id):
-        self.app_logic.archive_video(video_id)
-        self.refresh_table()
+    def archive_selected(self):
+        video_ids = self._selected_ids()
+        for video_id in video_ids:
+            self.data.submit(self.app_logic.archive_video, video_id)
+        if video_ids:
+            self.refresh_table()
+
+    def _on_busy_change(self, busy: bool):
+        """Shows the busy indicator while the data worker has jobs in flight."""
+        if busy:
+            self.busy_bar.pack(side="right", padx=5)
+            self.busy_bar.start(15)
+        else:
+            self.busy_bar.stop()
+            self.busy_bar.pack_forget()
 
     def open_db(self):
         self.app_logic.open_db_browser()
@@ -289,3 +583,14 @@ class MainWindow(tk.Tk):
             on_close_callback=on_clipmon_close
         )
 
+    def open_settings(self):
+        """Opens the runtime settings editor, or brings it to the front."""
+        if self.settings_window is not None and self.settings_window.winfo_exists():
+            self.settings_window.lift()
+            self.settings_window.focus()
+            return
+
+        def on_settings_close():
+            self.settings_window = None
+
+        self.settings_window = SettingsWindow(self, self.app_logic, self.data, on_close_callback=on_settings_close)
@@ -1,29 +1,94 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
 import sys
-from pathlib import Path
+import time
+from contextlib import contextmanager
+from typing import Optional
+from app.settings import LOG_DIR, LOG_LEVEL, LOG_JSON, LOG_MAX_BYTES, LOG_BACKUPS
 
-def setup_logging(name: str = "yt_manager", log_file: str = "app.log", level: int = logging.INFO) -> logging.Logger:
-    """Sets up logging to file and screen."""
+# Record attributes that structured (JSON) output copies when a call passes them via extra=
+STRUCTURED_FIELDS = ("video_id", "stage", "duration_ms")
+
+_queue: Optional[queue.Queue] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, thread, message and structured fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                data[field] = value
+        return json.dumps(data, default=str)
+
+def setup_logging(name: str = "yt_manager", log_file: str = "app.log", level: int = LOG_LEVEL,
+                  rotate: bool = True) -> logging.Logger:
+    """Sets up logging to file and screen.
+
+    Loggers only put records on an in-memory queue; a single listener thread formats
+    them and does the file and console I/O, so logging never blocks a download or UI
+    thread on a file lock. The first call in a process picks the file: LOG_DIR/log_file,
+    rotated at LOG_MAX_BYTES unless rotate is False. Rotation renames the file, so only
+    one process at a time may log to a rotated file; others sharing a file only append."""
     logger = logging.getLogger(name)
     logger.setLevel(level)
-    
+
     # Avoid adding handlers multiple times
     if logger.hasHandlers():
         return logger
 
+    logger.addHandler(logging.handlers.QueueHandler(_get_queue(log_file, rotate)))
+    return logger
+
+def _get_queue(log_file: str, rotate: bool) -> queue.Queue:
+    global _queue, _listener
+    if _queue is not None:
+        return _queue
+
     formatter = logging.Formatter(
         "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     )
 
-    # File Handler
-    file_handler = logging.FileHandler(log_file)
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    # File in the log directory, independent of the working directory
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    if rotate:
+        file_handler = logging.handlers.RotatingFileHandler(
+            LOG_DIR / log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8"
+        )
+    else:
+        file_handler = logging.FileHandler(LOG_DIR / log_file, encoding="utf-8")
+    file_handler.setFormatter(JsonFormatter() if LOG_JSON else formatter)
 
     # Stream Handler (Console)
     stream_handler = logging.StreamHandler(sys.stdout)
     stream_handler.setFormatter(formatter)
-    logger.addHandler(stream_handler)
 
-    return logger
+    _queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(_queue, file_handler, stream_handler, respect_handler_level=True)
+    _listener.start()
+    # Flush whatever is still queued when the process exits
+    atexit.register(_listener.stop)
+    return _queue
 
+@contextmanager
+def log_duration(logger: logging.Logger, stage: str, video_id: Optional[int] = None, level: int = logging.INFO):
+    """Logs how long the block took, with video_id/stage/duration_ms as structured fields."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration_ms = round((time.perf_counter() - start) * 1000, 1)
+        if logger.isEnabledFor(level):
+            logger.log(level, "%s for video %s took %.0f ms", stage, video_id, duration_ms,
+                       extra={"video_id": video_id, "stage": stage, "duration_ms": duration_ms})
@@ -0,0 +1,130 @@
+import atexit
+import datetime
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional
+from app.settings import METRICS_ENABLED, METRICS_FLUSH_SECONDS
+from app.utils.logger import setup_logging
+
+logger = setup_logging()
+
+class Sample:
+    """A timing in progress; the timed block may set bytes or mark it failed."""
+    __slots__ = ("bytes", "ok")
+
+    def __init__(self):
+        self.bytes: Optional[int] = None
+        self.ok = True
+
+class MetricsRecorder:
+    """Buffers per-stage timings and counters in memory and writes them to the metrics
+    table in batches, from a background thread, every `flush_seconds` or `max_buffer`
+    samples. Recording costs a perf_counter pair and a list append, so hooks can sit on
+    hot paths (DB calls, API requests). Whatever is buffered is flushed at exit."""
+
+    def __init__(self, enabled: bool = METRICS_ENABLED, flush_seconds: float = METRICS_FLUSH_SECONDS,
+                 max_buffer: int = 1000):
+        self.enabled = enabled
+        self.flush_seconds = flush_seconds
+        self.max_buffer = max_buffer
+        self.lock = threading.Lock()
+        self.buffer: List[tuple] = []
+        self.wake = threading.Event()
+        self.thread = None
+        self.stopped: Optional[threading.Event] = None
+        self.db_ready = False
+
+    def record(self, stage: str, duration_ms: Optional[float] = None, video_id: Optional[int] = None,
+               ok: bool = True, bytes: Optional[int] = None):
+        """Records one sample; without duration_ms it is a plain counter."""
+        if not self.enabled:
+            return
+        sample = (stage, video_id, duration_ms, bytes, ok, datetime.datetime.now())
+        with self.lock:
+            self.buffer.append(sample)
+            size = len(self.buffer)
+            if self.thread is None:
+                self._start()
+        if size >= self.max_buffer:
+            self.wake.set()
+
+    @contextmanager
+    def timed(self, stage: str, video_id: Optional[int] = None):
+        """Times the block; an exception marks the sample failed and propagates."""
+        sample = Sample()
+        start = time.perf_counter()
+        try:
+            yield sample
+        except BaseException:
+            sample.ok = False
+            raise
+        finally:
+            self.record(stage, (time.perf_counter() - start) * 1000, video_id, sample.ok, sample.bytes)
+
+    def timed_call(self, stage: str):
+        """Decorator form of timed() for functions."""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with self.timed(stage):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def flush(self):
+        """Writes buffered samples now."""
+        with self.lock:
+            samples, self.buffer = self.buffer, []
+        if not samples:
+            return
+        # Imported here: app.db.video itself uses this module for its hooks
+        from app.db import metrics as metrics_db, video as video_db
+        try:
+            if not self.db_ready:
+                metrics_db.init_db()
+                self.db_ready = True
+            metrics_db.add_samples(samples)
+        except Exception as e:
+            if not Path(video_db.DB_PATH).exists():
+                # The DB went away under us, e.g. a benchmark's temp DB; nothing to keep them in
+                logger.debug("Dropped %s metric sample(s), %s is gone", len(samples), video_db.DB_PATH)
+            else:
+                logger.error("Failed to write %s metric sample(s): %s", len(samples), e)
+
+    def stop(self):
+        """Flushes what is buffered and stops the background thread, e.g. before the DB it
+        writes to is removed. A later sample starts it again, on whatever DB_PATH is then."""
+        with self.lock:
+            thread, stopped, self.thread = self.thread, self.stopped, None
+        if thread is None:
+            return
+        stopped.set()
+        self.wake.set()
+        thread.join(timeout=5)
+        atexit.unregister(self.flush)
+        self.flush()
+        self.db_ready = False
+
+    def _start(self):
+        # Called with the lock held, on the first sample
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(self.stopped,), daemon=True, name="metrics")
+        self.thread.start()
+        atexit.register(self.flush)
+
+    def _run(self, stopped: threading.Event):
+        while not stopped.is_set():
+            self.wake.wait(self.flush_seconds)
+            self.wake.clear()
+            self.flush()
+
+# Shared recorder for the process
+recorder = MetricsRecorder()
+timed = recorder.timed
+timed_call = recorder.timed_call
+record = recorder.record
@@ -0,0 +1,246 @@
+import atexit
+import cProfile
+import collections
+import gc
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+import traceback
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+from app.settings import PROFILE, PROFILE_DIR, PROFILE_SAMPLE_MS, PROFILE_TOP_N
+from app.utils.logger import setup_logging
+
+logger = setup_logging()
+
+TARGETS = ("startup", "refresh", "memory", "sample")
+
+class StackSampler:
+    """Wall-clock sampling profiler: every interval it reads all thread stacks from
+    sys._current_frames() and counts them in collapsed form ("thread;outer;...;inner N"),
+    the input of flamegraph.pl and speedscope. Threads are never stopped or traced,
+    so the cost is one stack walk per thread per interval."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.counts: collections.Counter = collections.Counter()
+        self.samples = 0
+        self.labels: Dict[object, str] = {}  # Code object -> frame label
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True, name="stack-sampler")
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def write(self, path: Path):
+        with self.lock:
+            counts = sorted(self.counts.items())
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in counts:
+                f.write(f"{stack} {count}\n")
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self.stop_event.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            stacks = [
+                collapse_stack(names.get(ident, str(ident)), frame, self.labels)
+                for ident, frame in sys._current_frames().items() if ident != me
+            ]
+            with self.lock:
+                self.counts.update(stacks)
+                self.samples += 1
+
+def collapse_stack(thread_name: str, frame, labels: Dict[object, str]) -> str:
+    """One stack as 'thread;outermost;...;innermost', each frame 'function (file:line)'."""
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        label = labels.get(code)
+        if label is None:
+            label = labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        frames.append(label)
+        frame = frame.f_back
+    frames.append(thread_name)
+    return ";".join(reversed(frames))
+
+class Profiler:
+    """Opt-in profiling for the GUI and the daemon.
+
+    start() enables targets from PROFILE or --profile: 'startup' and 'refresh' run
+    cProfile around the blocks wrapped in profiled() with that name, 'memory' runs
+    tracemalloc from start() on, 'sample' runs the StackSampler. dump() writes whatever
+    is enabled, plus all thread stacks, to PROFILE_DIR; it runs at exit, on SIGUSR1
+    and from the GUI hotkey. With no targets profiled() is a membership test."""
+
+    def __init__(self):
+        self.targets: Set[str] = set()
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        # One cProfile per target, and one enabled at a time: since Python 3.12 a
+        # profiler is process-wide, so it also records other threads while enabled
+        self.profiles: Dict[str, cProfile.Profile] = {}
+        self.running: Optional[str] = None
+        self.skipped = collections.Counter()  # Target -> blocks not profiled: another one was running
+        self.memory: Dict[str, List[int]] = {}  # Target -> [blocks, net traced bytes]
+        self.sampler: Optional[StackSampler] = None
+
+    def start(self, targets: str = PROFILE):
+        """Enables the comma-separated targets ('all' for every one). Call early, on the
+        main thread: it also installs the SIGUSR1 dump handler, which is always on."""
+        names = {name.strip() for name in targets.split(",") if name.strip()}
+        if "all" in names:
+            names = set(TARGETS)
+        unknown = names - set(TARGETS)
+        if unknown:
+            logger.warning("Unknown profiling target(s): %s", ", ".join(sorted(unknown)))
+        self.targets = names & set(TARGETS)
+
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, lambda signum, frame: self.dump_async("SIGUSR1"))
+        if not self.targets:
+            return
+
+        if "memory" in self.targets and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if "sample" in self.targets:
+            self.sampler = StackSampler(PROFILE_SAMPLE_MS / 1000)
+            self.sampler.start()
+        atexit.register(self.dump, "exit")
+        logger.info("Profiling %s; output in %s", ", ".join(sorted(self.targets)), PROFILE_DIR)
+
+    @contextmanager
+    def profiled(self, target: str):
+        """Profiles the block if target is enabled; calls accumulate until dump().
+        A block that starts while another is profiled, on any thread, is only counted."""
+        if not self.targets or getattr(self.local, "busy", False):
+            yield
+            return
+        cpu = target in self.targets
+        tracing = "memory" in self.targets
+        if not cpu and not tracing:
+            yield
+            return
+
+        profile = None
+        before = tracemalloc.get_traced_memory()[0] if tracing else 0
+        self.local.busy = True
+        if cpu:
+            with self.lock:
+                if self.running is None:
+                    profile = self.profiles.setdefault(target, cProfile.Profile())
+                    try:
+                        profile.enable()
+                        self.running = target
+                    except ValueError:  # Some other profiler is active
+                        profile = None
+                if profile is None:
+                    self.skipped[target] += 1
+        try:
+            yield
+        finally:
+            self.local.busy = False
+            with self.lock:
+                if profile:
+                    profile.disable()
+                    self.running = None
+                if tracing:
+                    totals = self.memory.setdefault(target, [0, 0])
+                    totals[0] += 1
+                    totals[1] += tracemalloc.get_traced_memory()[0] - before
+
+    def dump_async(self, reason: str):
+        """dump() on a fresh thread; safe from signal handlers and Tk callbacks."""
+        threading.Thread(target=self.dump, args=(reason,), daemon=True, name="profile-dump").start()
+
+    def dump(self, reason: str = "request") -> List[Path]:
+        """Writes thread stacks, the memory top-N and any profiles collected so far."""
+        try:
+            PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+            stamp = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+            written = []
+
+            # Memory first, so the report does not count what formatting stacks allocates
+            path = PROFILE_DIR / f"memory-{stamp}.txt"
+            path.write_text(self._memory_report(PROFILE_TOP_N), encoding="utf-8")
+            written.append(path)
+
+            path = PROFILE_DIR / f"threads-{stamp}.txt"
+            path.write_text(format_thread_stacks(), encoding="utf-8")
+            written.append(path)
+
+            with self.lock:
+                targets = sorted(self.profiles)
+            for target in targets:
+                stats = self._stats(target)
+                if stats is None:
+                    continue
+                path = PROFILE_DIR / f"{target}-{stamp}.prof"
+                stats.dump_stats(path)
+                written.append(path)
+                if self.skipped[target]:
+                    logger.info("%s profile: %s block(s) overlapped another and were not profiled",
+                                target, self.skipped[target])
+
+            if self.sampler:
+                path = PROFILE_DIR / f"stacks-{stamp}.folded"
+                self.sampler.write(path)
+                written.append(path)
+
+            logger.info("Profile dump (%s): %s", reason, ", ".join(p.name for p in written))
+            return written
+        except Exception as e:
+            logger.error("Profile dump failed: %s", e)
+            return []
+
+    def _stats(self, target: str) -> Optional[pstats.Stats]:
+        # A profile being filled right now is left for the next dump: reading it would
+        # disable it. The lock keeps it from being enabled again while it is read.
+        with self.lock:
+            if self.running == target:
+                return None
+            return pstats.Stats(self.profiles[target])
+
+    def _memory_report(self, top_n: int) -> str:
+        lines = []
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            lines.append(f"traced now {current / 1024 ** 2:.1f} MiB, peak {peak / 1024 ** 2:.1f} MiB")
+            with self.lock:
+                for target, (blocks, net) in sorted(self.memory.items()):
+                    lines.append(f"{target}: {blocks} block(s), net {net / 1024:+.0f} KiB")
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                (tracemalloc.Filter(False, tracemalloc.__file__),)
+            )
+            lines.append(f"\nTop {top_n} allocation sites:")
+            lines.extend(str(stat) for stat in snapshot.statistics("lineno")[:top_n])
+        else:
+            lines.append("tracemalloc is off (profile target 'memory'); live objects by type:")
+            counts = collections.Counter(type(obj).__name__ for obj in gc.get_objects())
+            lines.extend(f"{count:>10}  {name}" for name, count in counts.most_common(top_n))
+        return "\n".join(lines) + "\n"
+
+def format_thread_stacks() -> str:
+    """Every thread's current stack, innermost call last, like a traceback."""
+    threads = {thread.ident: thread for thread in threading.enumerate()}
+    parts = []
+    for ident, frame in sys._current_frames().items():
+        thread = threads.get(ident)
+        name = thread.name if thread else str(ident)
+        daemon = " (daemon)" if thread and thread.daemon else ""
+        parts.append(f'Thread "{name}"{daemon}:\n' + "".join(traceback.format_stack(frame)))
+    return "\n".join(parts)
+
+# Shared profiler for the process
+profiler = Profiler()
+profiled = profiler.profiled
@@ -0,0 +1,165 @@
+"""Local API load test, fully offline.
+
+Starts ApiServer on a throwaway DB and hammers POST /videos and /videos/batch from
+many concurrent clients while a second thread keeps writing to the same DB through
+its own connections (as the UI and download threads do). Checks that every request
+succeeds, no "database is locked" error surfaces, every unique ID lands exactly once,
+and an SSE client sees one video_added event per inserted row. Then walks GET /videos
+page by page, following `next`, for every sort key in both directions: each walk
+must return every active row exactly once.
+
+Usage: python -m benchmarks.bench_api [--requests 2000] [--clients 50] [--batch 20]
+"""
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from app.db import video as db
+from app.utils import metrics
+
+class OfflineGoogle:
+    """Stands in for GoogleManager: no metadata, no network."""
+    def get_videos_info(self, video_ids):
+        return {}
+
+def make_id(n: int) -> str:
+    return f"t{n:010d}"
+
+def post(base: str, path: str, payload: dict):
+    request = urllib.request.Request(
+        base + path, data=json.dumps(payload).encode(), method="POST",
+        headers={"Content-Type": "application/json"}
+    )
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            body = json.loads(response.read())
+            status = response.status
+    except urllib.error.HTTPError as e:
+        body = json.loads(e.read() or b"{}")
+        status = e.code
+    return status, body, time.perf_counter() - start
+
+def walk_pages(base: str, sort: str, descending: bool, limit: int) -> list:
+    """Row ids of every page of GET /videos, following `next` until it is null."""
+    ids, cursor = [], {}
+    while True:
+        query = urllib.parse.urlencode({"sort": sort, "desc": int(descending), "limit": limit, **cursor})
+        with urllib.request.urlopen(f"{base}/videos?{query}", timeout=60) as response:
+            body = json.loads(response.read())
+        ids.extend(video["id"] for video in body["videos"])
+        if body["next"] is None or len(ids) > 10 * limit + len(set(ids)):
+            return ids  # The second test stops a cursor that repeats a page
+        cursor = {k: v for k, v in body["next"].items() if v is not None}
+
+def background_writer(stop: threading.Event, counter: list, interval: float):
+    """Keeps another writer busy on the DB, like the UI and the download threads."""
+    while not stop.is_set():
+        db.update_video_status(random.randint(1, 50), 'open')
+        counter[0] += 1
+        time.sleep(interval)
+
+def sse_listener(base: str, seen: list, ready: threading.Event):
+    with urllib.request.urlopen(base + "/events", timeout=120) as response:
+        ready.set()
+        for line in response:
+            if line.startswith(b"event: video_added"):
+                seen[0] += 1
+
+def main():
+    parser = argparse.ArgumentParser(description="Local API load test")
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--batch', type=int, default=20, help="URLs per batch request; every 10th request is a batch")
+    parser.add_argument('--duplicates', type=float, default=0.2, help="Share of single adds that repeat an earlier ID")
+    parser.add_argument('--writer-interval', type=float, default=0.002,
+                        help="Seconds between competing writes from the second thread (0 = flat out)")
+    args = parser.parse_args()
+
+    from app.core.api import ApiServer
+    from app.core.videos import VideoManager
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = Path(tmp) / "bench.db"
+        db.init_db()
+
+        server = ApiServer(VideoManager(OfflineGoogle(), None), port=0, token="")
+        if not server.start():
+            raise SystemExit("API server failed to start")
+        base = f"http://127.0.0.1:{server.port}"
+
+        # Payloads: mostly single adds, some batches, some repeats of earlier IDs
+        jobs, next_id = [], 0
+        for i in range(args.requests):
+            if i % 10 == 9:
+                ids = [make_id(next_id + j) for j in range(args.batch)]
+                next_id += args.batch
+                jobs.append(("/videos/batch", {"urls": [f"https://youtu.be/{v}" for v in ids]}))
+            elif next_id and random.random() < args.duplicates:
+                jobs.append(("/videos", {"url": f"https://www.youtube.com/watch?v={make_id(random.randrange(next_id))}"}))
+            else:
+                jobs.append(("/videos", {"url": f"https://youtu.be/{make_id(next_id)}"}))
+                next_id += 1
+
+        sse_seen, sse_ready = [0], threading.Event()
+        threading.Thread(target=sse_listener, args=(base, sse_seen, sse_ready), daemon=True).start()
+        sse_ready.wait(5)
+
+        stop_writer, writes = threading.Event(), [0]
+        writer = threading.Thread(target=background_writer, args=(stop_writer, writes, args.writer_interval), daemon=True)
+        writer.start()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.clients) as pool:
+            results = list(pool.map(lambda job: post(base, *job), jobs))
+        elapsed = time.perf_counter() - start
+        stop_writer.set()
+        writer.join()
+        time.sleep(0.5)  # Let the last events reach the SSE client
+
+        failures = [(status, body) for status, body, _ in results if status != 201]
+        locked = [body for _, body in failures if "locked" in str(body.get("error", ""))]
+        queued = sum(body.get("queued", 0) for status, body, _ in results if status == 201)
+        rows = len(db.get_all_videos())
+        latencies = sorted(latency for _, _, latency in results)
+
+        print(f"requests:        {len(results)} from {args.clients} clients in {elapsed:.2f}s "
+              f"({len(results) / elapsed:.0f} req/s)")
+        print(f"latency:         p50 {statistics.median(latencies) * 1000:.1f} ms, "
+              f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f} ms")
+        print(f"competing writes:{writes[0]:>6}")
+        print(f"failures:        {len(failures)} ({len(locked)} 'database is locked')")
+        print(f"unique IDs:      {next_id}, queued {queued}, rows {rows}, SSE video_added {sse_seen[0]}")
+
+        # Some spread in the sort columns, with ties and NULLs left in
+        conn = db.get_db_connection()
+        conn.execute("UPDATE videos SET duration_secs = id % 7 * 60, channel = 'c' || (id % 5) WHERE id % 3 != 0")
+        conn.commit()
+        conn.close()
+        active = sorted(video.id for video in db.get_videos_by_status(columns=('id',)))
+        walks_ok = True
+        for sort in db.SORT_KEYS:
+            for descending in (True, False):
+                ids = walk_pages(base, sort, descending, 97)
+                same = sorted(ids) == active
+                walks_ok &= same
+                print(f"page walk:       sort={sort} {'desc' if descending else 'asc'}: "
+                      f"{len(ids)} of {len(active)} rows{'' if same else ' MISMATCH'}")
+
+        server.stop()
+        metrics.recorder.stop()  # Before the DB goes away with tmp
+        ok = not failures and queued == next_id == rows == sse_seen[0] and walks_ok
+        print("OK" if ok else "FAILED")
+        if not ok:
+            raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Video lookup cache: speed, and correctness under concurrent writers.
+
+Speed: random get_video_by_id/get_video_by_youtube_id lookups over a hot set of
+rows, with the cache off and on.
+
+Correctness: writer threads and a writer process keep rewriting the titles of their
+own rows with increasing version numbers, while reader threads look the rows up
+through the cache. A read must never return a version older than one whose commit
+had been seen before the read started, nor older than one the same reader saw
+before. At the end every cached row must equal the row in the DB.
+
+Usage: python -m benchmarks.bench_cache [--rows 2000] [--lookups 20000] [--seconds 5]
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from app.db import video as db
+from app.utils import metrics
+
+def version_of(video) -> int:
+    return int(video.title.split()[-1])
+
+def write_versions(ids: list, stop: threading.Event, committed: dict, lock: threading.Lock):
+    """Rewrites each row of ids in turn with the next version; records it once committed."""
+    version = 0
+    while not stop.is_set():
+        version += 1
+        for video_id in ids:
+            db.update_video_metadata(video_id, f"title {version}", "bench", "PT1M", None)
+            with lock:
+                committed[video_id] = version
+
+def writer_process(db_path: str, ids: list, seconds: float):
+    """Body of the writer process: like write_versions, printing 'id version' per commit."""
+    db.DB_PATH = Path(db_path)
+    deadline = time.monotonic() + seconds
+    version = 0
+    while time.monotonic() < deadline:
+        version += 1
+        for video_id in ids:
+            db.update_video_metadata(video_id, f"title {version}", "bench", "PT1M", None)
+            print(video_id, version, flush=True)
+
+def follow_process(process, committed: dict, lock: threading.Lock):
+    for line in process.stdout:
+        video_id, version = map(int, line.split())
+        with lock:
+            committed[video_id] = version
+
+def read_versions(ids: list, youtube_ids: dict, stop: threading.Event, committed: dict,
+                  lock: threading.Lock, errors: list, reads: list):
+    seen = {}
+    while not stop.is_set():
+        video_id = random.choice(ids)
+        with lock:
+            floor = committed.get(video_id, 0)
+        if random.random() < 0.5:
+            video = db.get_video_by_id(video_id)
+        else:
+            video = db.get_video_by_youtube_id(youtube_ids[video_id])
+        version = version_of(video)
+        if version < max(floor, seen.get(video_id, 0)):
+            errors.append((video_id, version, floor, seen.get(video_id, 0)))
+        seen[video_id] = version
+        reads[0] += 1
+
+def bench_lookups(ids: list, youtube_ids: dict, lookups: int, enabled: bool) -> float:
+    db.cache.size = db.VIDEO_CACHE_SIZE if enabled else 0
+    db.cache.clear()
+    start = time.perf_counter()
+    for _ in range(lookups):
+        video_id = random.choice(ids)
+        if random.random() < 0.5:
+            db.get_video_by_id(video_id)
+        else:
+            db.get_video_by_youtube_id(youtube_ids[video_id])
+    return (time.perf_counter() - start) / lookups
+
+def main():
+    parser = argparse.ArgumentParser(description="Video lookup cache benchmark and consistency check")
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--hot', type=int, default=200, help="Rows the lookups pick from")
+    parser.add_argument('--lookups', type=int, default=20000)
+    parser.add_argument('--seconds', type=float, default=5, help="Length of the concurrent phase")
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--writer-process', nargs=2, metavar=("DB", "IDS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.writer_process:
+        db_path, ids = args.writer_process
+        writer_process(db_path, [int(i) for i in ids.split(",")], args.seconds)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = Path(tmp) / "bench.db"
+        db.init_db()
+        inserted = db.add_videos_bulk([(f"https://youtu.be/c{i:010d}", f"c{i:010d}") for i in range(args.rows)])
+        youtube_ids = {db_id: video_id for db_id, video_id, _ in inserted}
+        for video_id in youtube_ids:
+            db.update_video_metadata(video_id, "title 0", "bench", "PT1M", None)
+        hot = random.sample(list(youtube_ids), min(args.hot, len(youtube_ids)))
+
+        uncached = bench_lookups(hot, youtube_ids, args.lookups, False)
+        cached = bench_lookups(hot, youtube_ids, args.lookups, True)
+        stats = db.cache.stats()
+        print(f"lookups:         {args.lookups} over {len(hot)} rows")
+        print(f"uncached:        {uncached * 1e6:8.1f} us/lookup")
+        print(f"cached:          {cached * 1e6:8.1f} us/lookup  ({uncached / cached:.1f}x, hit rate {stats['hit_rate']:.1%})")
+
+        # Concurrent phase: each writer owns a slice of the hot rows, the process the last one
+        stop, lock = threading.Event(), threading.Lock()
+        committed, errors, reads = {}, [], [0]
+        slices = [hot[i::args.writers + 1] for i in range(args.writers + 1)]
+        db.cache.clear()
+        hits, misses = db.cache.hits, db.cache.misses
+
+        env = dict(os.environ, METRICS_ENABLED="no")
+        process = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.bench_cache", "--seconds", str(args.seconds),
+             "--writer-process", str(db.DB_PATH), ",".join(map(str, slices[-1]))],
+            stdout=subprocess.PIPE, text=True, env=env
+        )
+        threads = [threading.Thread(target=follow_process, args=(process, committed, lock))]
+        threads += [threading.Thread(target=write_versions, args=(ids, stop, committed, lock))
+                    for ids in slices[:-1]]
+        threads += [threading.Thread(target=read_versions, args=(hot, youtube_ids, stop, committed, lock, errors, reads))
+                    for _ in range(args.readers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        process.wait()
+        for thread in threads:
+            thread.join()
+
+        # Whatever is cached now must match the DB
+        stale = 0
+        for video_id in hot:
+            cached_row = db.cache.get(video_id)
+            fresh = db._select_videos('SELECT * FROM videos WHERE id = ?', (video_id,))[0]
+            if cached_row is not None and cached_row != fresh:
+                stale += 1
+
+        lookups = db.cache.hits - hits + db.cache.misses - misses
+        print(f"concurrent:      {reads[0]} reads by {args.readers} threads, {sum(committed.values())} writes "
+              f"by {args.writers} threads and 1 process, hit rate {(db.cache.hits - hits) / max(lookups, 1):.1%}")
+        print(f"stale reads:     {len(errors)}, stale rows at the end: {stale}")
+        for error in errors[:5]:
+            print("  id %s read version %s, committed %s, seen before %s" % error)
+
+        metrics.recorder.stop()  # Before the DB goes away with tmp
+        ok = not errors and not stale and process.returncode == 0
+        print("OK" if ok else "FAILED")
+        if not ok:
+            raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
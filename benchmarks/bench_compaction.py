@@ -0,0 +1,86 @@
+"""Hot queries before and after moving closed/archived rows to videos_history.
+
+Builds a throwaway DB (default 200k rows, ~90% closed or archived, as in
+bench_search), times the queries behind the queue view, the download scheduler
+and lookups, runs compact_videos + vacuum_and_analyze, and times them again.
+
+Usage: python -m benchmarks.bench_compaction [--rows 200000] [--repeat 10]
+"""
+import argparse
+import datetime
+import random
+import tempfile
+import time
+from pathlib import Path
+from app.db import video as db
+from app.utils import metrics
+from app.db.models import LIST_COLUMNS
+from benchmarks.bench_search import populate
+
+def measure(fn, repeat: int) -> float:
+    fn()  # Warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+def hot_queries(rows: int) -> list:
+    rng = random.Random(3)
+    # The newest 1% of rows, as populate() spaces them a minute apart
+    recent = datetime.datetime(2020, 1, 1) + datetime.timedelta(minutes=int(rows * 0.99))
+    youtube_ids = [f"v{rng.randrange(rows):010d}" for _ in range(500)]
+    live_id = db.get_videos_by_status(columns=('id',))[0].id
+    old_id = db._select_videos("SELECT id FROM videos WHERE status = 'closed' LIMIT 1")[0].id
+    return [
+        ("active load (get_videos_by_status)", lambda: db.get_videos_by_status(columns=LIST_COLUMNS)),
+        ("changed since (incremental refresh)", lambda: db.get_videos_changed_since(recent)),
+        ("first search page", lambda: db.search_videos()),
+        ("search 'chess'", lambda: db.search_videos("chess")),
+        ("status histogram", db.get_status_histogram),
+        ("count by status", db.count_videos_by_status),
+        ("queued downloads (scheduler)", lambda: db.get_videos_by_download_needed('yes', limit=4)),
+        ("known IDs, 500 (add dedup)", lambda: db.get_existing_youtube_ids(youtube_ids)),
+        ("get_video_by_id, live row", lambda: db.get_video_by_id(live_id)),
+        ("get_video_by_id, closed row", lambda: db.get_video_by_id(old_id)),
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description="Compaction before/after benchmark")
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = Path(tmp) / "bench.db"
+        db.init_db()
+        db.cache.size = 0  # Time the queries, not the lookup cache
+        populate(args.rows)
+        queries = hot_queries(args.rows)
+
+        before = [measure(fn, args.repeat) for _, fn in queries]
+        size_before = db.DB_PATH.stat().st_size
+
+        start = time.perf_counter()
+        moved = db.compact_videos(30)
+        compact_sec = time.perf_counter() - start
+        start = time.perf_counter()
+        db.vacuum_and_analyze()
+        vacuum_sec = time.perf_counter() - start
+        # The second run is what the hourly sweep pays once the DB is converted
+        start = time.perf_counter()
+        db.vacuum_and_analyze()
+        maintain_sec = time.perf_counter() - start
+
+        after = [measure(fn, args.repeat) for _, fn in queries]
+        size_after = db.DB_PATH.stat().st_size
+
+        print(f"{args.rows} rows; moved {moved} to history in {compact_sec:.1f}s, "
+              f"first vacuum+analyze {vacuum_sec:.1f}s, next {maintain_sec * 1000:.0f} ms")
+        print(f"DB file: {size_before / 1024 ** 2:.1f} -> {size_after / 1024 ** 2:.1f} MiB\n")
+        print(f"{'query':<40} {'before ms':>10} {'after ms':>10} {'speedup':>8}")
+        for (label, _), b, a in zip(queries, before, after):
+            print(f"{label:<40} {b * 1000:>10.2f} {a * 1000:>10.2f} {b / a:>7.1f}x")
+        metrics.recorder.stop()  # Before the DB goes away with tmp
+
+if __name__ == "__main__":
+    main()
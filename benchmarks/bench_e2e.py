@@ -0,0 +1,350 @@
+"""End-to-end pipeline benchmark, fully offline.
+
+For each library size it builds a throwaway DB of synthetic videos, then runs the
+real VideoManager / DownloadManager / YTDLPManager code against stand-ins for the
+network: a stub YouTube API resource (with configurable latency) behind
+GoogleManager, and benchmarks/fake_ytdlp.py as the yt-dlp executable, which writes
+files at a configurable rate and runs the --exec completion callback
+(run_cli.py --downloaded) in its own process, as the real one does. Reports:
+
+  adds/sec         single add_video calls and 50-URL add_videos_bulk batches
+  metadata         time until the stub API has filled in every added video
+  DB ops/sec       a read/write mix from several threads, like UI + downloads
+  refresh          refresh_table's data path (query + VideoListModel), full and
+                   incremental; plus the Treeview repaint when a display exists
+  queue drain      time to download --downloads queued videos at the concurrency limit
+  peak RSS         of this process (yt-dlp and callbacks run as children)
+
+Save a run with --json and pass it back as --baseline to fail (exit 1) when a
+metric gets more than --tolerance worse.
+
+Usage: python -m benchmarks.bench_e2e [--rows 1000 10000 100000] [--downloads 40]
+                                      [--json out.json] [--baseline old.json]
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent.resolve()
+
+# (metric, unit, True if higher is better)
+METRICS = (
+    ("populate_rows_per_sec", "rows/s", True),
+    ("single_adds_per_sec", "adds/s", True),
+    ("bulk_adds_per_sec", "adds/s", True),
+    ("metadata_sec", "s", False),
+    ("db_ops_per_sec", "ops/s", True),
+    ("refresh_full_ms", "ms", False),
+    ("refresh_incremental_p50_ms", "ms", False),
+    ("refresh_incremental_p95_ms", "ms", False),
+    ("tree_repaint_ms", "ms", False),
+    ("drain_sec", "s", False),
+    ("drain_downloads_per_sec", "dl/s", True),
+    ("peak_rss_mb", "MiB", False),
+)
+
+class FakeYouTube:
+    """Stands in for the googleapiclient resource: videos().list(id=...).execute()."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def videos(self):
+        return self
+
+    def list(self, part: str, id: str, maxResults: int = 5):
+        # A request object per call: metadata threads share this resource
+        return FakeRequest(self.latency, id.split(","))
+
+class FakeRequest:
+    def __init__(self, latency: float, ids: list):
+        self.latency = latency
+        self.ids = ids
+
+    def execute(self):
+        time.sleep(self.latency)
+        return {"items": [
+            {
+                "id": video_id,
+                "snippet": {"title": f"Stub title for {video_id}", "channelTitle": "Stub Channel",
+                            "publishedAt": "2024-01-01T00:00:00Z"},
+                "contentDetails": {"duration": "PT4M13S"},
+            }
+            for video_id in self.ids
+        ]}
+
+def setup_environment(tmp: Path, args):
+    """Points settings at tmp and yt-dlp at the fake. Must run before app is imported,
+    and is inherited by the yt-dlp and callback processes."""
+    bin_dir = tmp / "bin"
+    bin_dir.mkdir()
+    ytdlp = bin_dir / "yt-dlp"
+    ytdlp.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{ROOT / "benchmarks" / "fake_ytdlp.py"}" "$@"\n')
+    callback = bin_dir / "callback"
+    callback.write_text(f'#!/bin/sh\ncd "{ROOT}" && exec "{sys.executable}" run_cli.py "$@"\n')
+    for script in (ytdlp, callback):
+        script.chmod(0o755)
+
+    for name in ("dl", "archive", "logs", "thumbnails"):
+        (tmp / name).mkdir()
+    os.environ.update({
+        "DB_PATH": str(tmp / "bench.db"),
+        "DOWNLOAD_DIR": str(tmp / "dl"),
+        "ARCHIVE_DIR": str(tmp / "archive"),
+        "LOG_DIR": str(tmp / "logs"),
+        "THUMBNAIL_DIR": str(tmp / "thumbnails"),
+        "DAEMON_HEARTBEAT_FILE": str(tmp / "daemon.heartbeat"),
+        "YTDLP_PATH": str(ytdlp),
+        "YTDLP_CALLBACK": str(callback),
+        "YT_API_KEY": "",
+        "API_ENABLED": "no",
+        "FAKE_YTDLP_BYTES": str(args.file_bytes),
+        "FAKE_YTDLP_RATE": str(args.rate),
+    })
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+def wait_for_threads(before: set, timeout: float = 120):
+    deadline = time.monotonic() + timeout
+    for thread in threading.enumerate():
+        if thread not in before and not thread.daemon:
+            thread.join(max(0.0, deadline - time.monotonic()))
+
+def reset_queue(db):
+    conn = db.get_db_connection()
+    conn.execute("UPDATE videos SET download_needed = 'no' WHERE download_needed IN ('yes', 'downloading')")
+    conn.commit()
+    conn.close()
+    db.cache.clear()
+    db.status_counts.invalidate()
+
+def bench_adds(db, vm, args, results):
+    before = set(threading.enumerate())
+    start = time.perf_counter()
+    for i in range(args.single):
+        video_id = f"s{i:010d}"
+        vm.add_video(f"https://youtu.be/{video_id}", video_id)
+    results["single_adds_per_sec"] = args.single / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for offset in range(0, args.bulk, 50):
+        entries = [(f"https://www.youtube.com/watch?v=b{n:010d}", f"b{n:010d}")
+                   for n in range(offset, min(offset + 50, args.bulk))]
+        vm.add_videos_bulk(entries)
+    results["bulk_adds_per_sec"] = args.bulk / (time.perf_counter() - start)
+
+    # Metadata threads were started by the adds; they finish when the stub has answered
+    wait_for_threads(before)
+    results["metadata_sec"] = time.perf_counter() - start
+    missing = db.get_videos_missing_metadata(limit=args.single + args.bulk)
+    if missing:
+        print(f"  warning: {len(missing)} added video(s) still without metadata")
+    reset_queue(db)
+
+def bench_db_ops(db, args, results, rows: int):
+    stop = threading.Event()
+    counts = []
+
+    def worker(seed: int):
+        rng = random.Random(seed)
+        count = 0
+        while not stop.is_set():
+            op = rng.random()
+            if op < 0.3:
+                db.get_videos_by_ids([rng.randint(1, rows) for _ in range(10)])
+            elif op < 0.5:
+                db.search_videos(sort=rng.choice(list(db.SORT_KEYS)))
+            elif op < 0.7:
+                db.get_videos_changed_since(datetime.datetime.now() - datetime.timedelta(seconds=30))
+            elif op < 0.85:
+                db.count_videos_by_download_needed('yes')
+            else:
+                db.update_video_status(rng.randint(1, rows), 'open')
+            count += 1
+        counts.append(count)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(args.db_threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(args.db_seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    results["db_ops_per_sec"] = sum(counts) / (time.perf_counter() - start)
+
+def row_values(video) -> tuple:
+    # Same shape as MainWindow._row_values, minus the progress lookup
+    secs = video.duration_secs
+    duration = f"{secs // 3600}:{secs % 3600 // 60:02d}:{secs % 60:02d}" if secs else ""
+    published = video.published_dt.date().isoformat() if video.published_dt else ""
+    return (video.video_id or "", video.status, "", "", video.title or "",
+            video.channel or "", duration, published)
+
+def bench_refresh(db, vm, args, results, rows: int):
+    from app.ui.video_model import VideoListModel
+
+    model = VideoListModel()
+    start = time.perf_counter()
+    as_of = datetime.datetime.now()
+    model.load(vm.get_active_videos(), as_of)
+    results["refresh_full_ms"] = (time.perf_counter() - start) * 1000
+
+    rng = random.Random(3)
+    samples = []
+    for _ in range(args.refreshes):
+        for _ in range(20):
+            db.update_video_status(rng.randint(1, rows), rng.choice(('open', 'down', 'closed')))
+        start = time.perf_counter()
+        model.apply(vm.get_videos_changed_since(model.since()))
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    results["refresh_incremental_p50_ms"] = statistics.median(samples)
+    results["refresh_incremental_p95_ms"] = samples[max(0, int(len(samples) * 0.95) - 1)]
+
+    try:
+        import tkinter as tk
+        from tkinter import ttk
+        root = tk.Tk()
+    except Exception:
+        print("  no display: skipping the Treeview repaint")
+        return
+    from app.ui.video_queue import COLUMNS
+    tree = ttk.Treeview(root, columns=COLUMNS, show="headings")
+    tree.pack()
+    start = time.perf_counter()
+    for video in model.rows.values():
+        tree.insert("", "end", iid=str(video.id), values=row_values(video))
+    root.update_idletasks()
+    results["tree_repaint_ms"] = (time.perf_counter() - start) * 1000
+    root.destroy()
+
+def bench_drain(db, args, results, rows: int):
+    from app.core.downloader import DownloadManager
+    from app.core.progress import tracker
+    from app.core.ytdlp import YTDLPManager
+
+    reset_queue(db)
+    ids = random.Random(5).sample(range(1, rows + 1), args.downloads)
+    for video_id in ids:
+        db.set_download_needed(video_id, 'yes')
+
+    dm = DownloadManager(YTDLPManager())
+    start = time.perf_counter()
+    dm.start_if_needed()
+    deadline = time.monotonic() + args.drain_timeout
+    # The callback marks a row done before yt-dlp exits: wait for the threads too
+    while (dm.running or tracker.snapshot()[1].active) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - start
+    dm.stop()
+
+    done = sum(1 for v in db.get_videos_by_ids(ids) if v.download_needed == 'down')
+    if done != len(ids):
+        print(f"  warning: only {done}/{len(ids)} downloads completed")
+    results["drain_sec"] = elapsed
+    results["drain_downloads_per_sec"] = done / elapsed
+
+def peak_rss(results):
+    try:
+        import resource
+    except ImportError:  # Windows
+        return
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    results["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+def run(rows: int, tmp: Path, args) -> dict:
+    from benchmarks.bench_search import populate
+    from app.core.google import GoogleManager
+    from app.core.videos import VideoManager
+    from app.core.ytdlp import YTDLPManager
+    from app.db import video as db
+    from app.db import metrics as metrics_db
+
+    # One DB per size; the callback processes find it through the environment
+    db.DB_PATH = tmp / f"bench-{rows}.db"
+    os.environ["DB_PATH"] = str(db.DB_PATH)
+    db.init_db()
+    metrics_db.init_db()
+
+    results = {}
+    start = time.perf_counter()
+    populate(rows)
+    results["populate_rows_per_sec"] = rows / (time.perf_counter() - start)
+
+    google = GoogleManager()
+    google._youtube, google._initialized = FakeYouTube(args.api_latency), True
+    vm = VideoManager(google, YTDLPManager())
+
+    bench_adds(db, vm, args, results)
+    bench_db_ops(db, args, results, rows)
+    bench_refresh(db, vm, args, results, rows)
+    bench_drain(db, args, results, rows)
+    peak_rss(results)
+    return results
+
+def compare(runs: dict, baseline: dict, tolerance: float) -> list:
+    """Returns a line per metric that is more than tolerance worse than the baseline."""
+    regressions = []
+    for rows, results in runs.items():
+        for name, unit, higher_better in METRICS:
+            old, new = baseline.get(rows, {}).get(name), results.get(name)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_better else change) > tolerance:
+                regressions.append(f"{rows} rows, {name}: {old:.2f} -> {new:.2f} {unit} ({change:+.0%})")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end pipeline benchmark")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000], help="Library sizes to test")
+    parser.add_argument('--single', type=int, default=200, help="Videos added one at a time")
+    parser.add_argument('--bulk', type=int, default=2000, help="Videos added in 50-URL batches")
+    parser.add_argument('--api-latency', type=float, default=0.02, help="Seconds per stub API call")
+    parser.add_argument('--db-threads', type=int, default=4)
+    parser.add_argument('--db-seconds', type=float, default=3)
+    parser.add_argument('--refreshes', type=int, default=50, help="Incremental refreshes to time")
+    parser.add_argument('--downloads', type=int, default=40, help="Videos queued for the drain test")
+    parser.add_argument('--file-bytes', type=int, default=2 * 1024 * 1024, help="Size of each fake download")
+    parser.add_argument('--rate', type=float, default=20 * 1024 * 1024, help="Fake download speed, bytes/s")
+    parser.add_argument('--drain-timeout', type=float, default=600)
+    parser.add_argument('--json', type=Path, help="Write the results here")
+    parser.add_argument('--baseline', type=Path, help="Earlier --json output to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed relative regression (default: 0.25)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        setup_environment(tmp, args)
+        from app.utils import metrics
+        runs = {}
+        for rows in args.rows:
+            print(f"== {rows} rows")
+            runs[str(rows)] = run(rows, tmp, args)
+            metrics.recorder.stop()  # Before the next run's DB, and before tmp goes away
+            for name, unit, _ in METRICS:
+                if name in runs[str(rows)]:
+                    print(f"  {name:<30} {runs[str(rows)][name]:>12.2f} {unit}")
+
+    if args.json:
+        args.json.write_text(json.dumps(runs, indent=2))
+        print(f"results written to {args.json}")
+    if args.baseline:
+        regressions = compare(runs, json.loads(args.baseline.read_text()), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            raise SystemExit(1)
+        print(f"no regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Row materialization: dict(sqlite3.Row) versus Video records, full and projected.
+
+Reads every row of a synthetic library (default 100k rows) three ways and reports
+time per row and the memory the result list holds (tracemalloc):
+
+  dict        SELECT * with sqlite3.Row, then dict(row), as the readers used to
+  Video       all columns as slotted Video records with parsed timestamps
+  projected   the queue view's LIST_COLUMNS only
+
+Usage: python -m benchmarks.bench_records [--rows 100000] [--repeat 5]
+"""
+import argparse
+import gc
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from app.db import video as db
+from app.utils import metrics
+from app.db.models import LIST_COLUMNS, VIDEO_COLUMNS
+from benchmarks.bench_search import populate
+
+def dict_rows() -> list:
+    conn = sqlite3.connect(db.DB_PATH)
+    conn.row_factory = sqlite3.Row
+    rows = [dict(row) for row in conn.execute('SELECT * FROM videos')]
+    conn.close()
+    return rows
+
+def video_rows(columns) -> list:
+    return db._select_videos(f'SELECT {db._columns(columns)} FROM videos')
+
+def measure(label: str, fn, repeat: int, rows: int):
+    fn()  # Warm up the page cache and the loader
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(result) == rows
+    print(f"{label:<12} {best * 1000:9.1f} ms  {best / rows * 1e6:6.2f} us/row  "
+          f"{held / 1024 ** 2:8.1f} MiB  {held / rows:6.0f} B/row")
+    return best, held
+
+def main():
+    parser = argparse.ArgumentParser(description="Row materialization benchmark")
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = Path(tmp) / "bench.db"
+        db.init_db()
+        populate(args.rows)
+
+        print(f"{args.rows} rows, best of {args.repeat}")
+        base_time, base_mem = measure("dict", dict_rows, args.repeat, args.rows)
+        for label, columns in (("Video", VIDEO_COLUMNS), ("projected", LIST_COLUMNS)):
+            elapsed, held = measure(label, lambda: video_rows(columns), args.repeat, args.rows)
+            print(f"{'':<12} {base_time / elapsed:9.2f}x speed  {base_mem / held:25.2f}x less memory")
+        metrics.recorder.stop()  # Before the DB goes away with tmp
+
+if __name__ == "__main__":
+    main()
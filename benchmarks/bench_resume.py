@@ -0,0 +1,191 @@
+"""Interrupted downloads resume where they stopped, and orphaned partials are collected.
+
+Serves a deterministic file from a local HTTP server (Range support, throttled) that
+benchmarks/fake_ytdlp.py downloads from, as yt-dlp would from YouTube. A worker
+process runs the real DownloadManager on one queued video and is killed with
+SIGKILL partway through. Then:
+
+  - the row must still own its .part file, with the bytes of the last checkpoint;
+  - collect_orphaned_parts must delete old leftovers no row owns, and keep that one;
+  - a second worker (after reset_stuck_downloads, as at startup) must ask the server
+    for the rest only, and finish with a file identical to the source.
+
+Usage: python -m benchmarks.bench_resume [--file-bytes 8388608] [--rate 4194304] [--kill-at 0.4]
+"""
+import argparse
+import hashlib
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+from benchmarks.bench_e2e import setup_environment
+
+VIDEO_ID = "resumeTest1"
+CHUNK = 64 * 1024
+
+def content(size: int) -> bytes:
+    """Bytes the server serves: not zeros, so a misplaced resume changes the hash."""
+    block = hashlib.sha256(b"bench_resume").digest() * (CHUNK // 32)
+    return (block * (size // len(block) + 1))[:size]
+
+def make_server(data: bytes, rate: float, served: list) -> ThreadingHTTPServer:
+    """Serves data at any path, honouring `Range: bytes=N-`. Appends [start, bytes sent]
+    to served per request, updated as it goes."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            start = 0
+            ranged = self.headers.get("Range", "")
+            if ranged.startswith("bytes=") and ranged.endswith("-"):
+                start = int(ranged[len("bytes="):-1])
+            self.send_response(206 if start else 200)
+            if start:
+                self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+            self.send_header("Content-Length", str(len(data) - start))
+            self.end_headers()
+
+            entry = [start, 0]
+            served.append(entry)
+            began = time.perf_counter()
+            try:
+                for offset in range(start, len(data), CHUNK):
+                    piece = data[offset:offset + CHUNK]
+                    self.wfile.write(piece)
+                    entry[1] += len(piece)
+                    ahead = entry[1] / rate - (time.perf_counter() - began)
+                    if ahead > 0:
+                        time.sleep(ahead)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # The client was killed
+
+        def log_message(self, *args):
+            pass
+
+    return ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+
+def worker():
+    """Body of the worker process: the startup reset, then downloads until the queue is empty."""
+    from app.db import video as db
+    from app.core.downloader import DownloadManager
+    from app.core.ytdlp import YTDLPManager
+
+    db.init_db()
+    db.reset_stuck_downloads()
+    DownloadManager(YTDLPManager()).start_if_needed()
+    while db.get_videos_by_download_needed('yes', 1) or db.get_videos_by_download_needed('downloading', 1):
+        time.sleep(0.1)
+
+def start_worker() -> subprocess.Popen:
+    # Its own session, so the kill also takes the yt-dlp child, as a crash would
+    return subprocess.Popen([sys.executable, "-m", "benchmarks.bench_resume", "--worker"],
+                            start_new_session=True)
+
+def row(db):
+    return db.get_video_by_youtube_id(VIDEO_ID)
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumable download check")
+    parser.add_argument('--file-bytes', type=int, default=8 * 1024 * 1024)
+    parser.add_argument('--rate', type=float, default=4 * 1024 * 1024, help="Server bytes/s")
+    parser.add_argument('--kill-at', type=float, default=0.4, help="Share served before the kill")
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker()
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        # No rate limit in the fake itself: the server sets the pace
+        setup_environment(tmp, SimpleNamespace(file_bytes=args.file_bytes, rate=0))
+        data = content(args.file_bytes)
+        served = []
+        server = make_server(data, args.rate, served)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        os.environ.update({
+            "FAKE_YTDLP_SOURCE": f"http://127.0.0.1:{server.server_address[1]}",
+            "PARTIAL_CHECKPOINT_SECONDS": "0.2",
+            "PARTIAL_GC_AGE_HOURS": "1",
+        })
+
+        from app.db import video as db
+        from app.core.downloader import DownloadManager
+        from app.core.ytdlp import YTDLPManager
+        from app.utils import metrics
+
+        db.init_db()
+        db.add_video(f"https://www.youtube.com/watch?v={VIDEO_ID}", VIDEO_ID)
+        db.set_download_needed(row(db).id, 'yes')
+        checks = []
+
+        def check(name: str, ok: bool, detail: str = ""):
+            checks.append(ok)
+            print(f"{'ok  ' if ok else 'FAIL'} {name}{': ' + detail if detail else ''}")
+
+        # 1. Interrupted run
+        process = start_worker()
+        target = args.file_bytes * args.kill_at
+        deadline = time.monotonic() + 60
+        while (not served or served[-1][1] < target) and time.monotonic() < deadline:
+            time.sleep(0.02)
+        time.sleep(0.5)  # Past a checkpoint
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+
+        video = row(db)
+        part = Path(video.partial_path) if video.partial_path else None
+        size = part.stat().st_size if part and part.exists() else 0
+        check("row left downloading", video.download_needed == 'downloading', video.download_needed)
+        check(".part file recorded", part is not None and 0 < size < args.file_bytes,
+              f"{part} holds {size} of {args.file_bytes} bytes")
+        check("checkpoint written", bool(video.partial_bytes) and video.partial_bytes <= size,
+              f"{video.partial_bytes} bytes")
+
+        # 2. Orphan collection: old leftovers of other downloads go, the owned one stays
+        old = time.time() - 2 * 3600
+        orphans = [Path(os.environ["DOWNLOAD_DIR"]) / "Gone" / name
+                   for name in ("gone.mp4.part", "gone.mp4.part-Frag3", "gone.mp4.ytdl")]
+        young = Path(os.environ["DOWNLOAD_DIR"]) / "starting.mp4.part"
+        for path in orphans + [young]:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b"x")
+        for path in orphans:
+            os.utime(path, (old, old))
+        if part:
+            os.utime(part, (old, old))
+        removed = DownloadManager(YTDLPManager()).collect_orphaned_parts()
+        check("orphans removed", removed == len(orphans) and not any(p.exists() for p in orphans),
+              f"{removed} removed")
+        check("young and owned partials kept", young.exists() and part is not None and part.exists())
+
+        # 3. Resumed run
+        requests_before = len(served)
+        process = start_worker()
+        process.wait(timeout=120)
+        video = row(db)
+        resumed = served[requests_before:]
+        final = Path(video.file_path) if video.file_path else None
+        same = final is not None and final.exists() and final.read_bytes() == data
+        check("one ranged request from the .part size", len(resumed) == 1 and resumed[0][0] == size,
+              f"requests {resumed}")
+        check("only the rest transferred", sum(sent for _, sent in resumed) == args.file_bytes - size,
+              f"{sum(sent for _, sent in resumed)} of {args.file_bytes - size} bytes")
+        check("file identical to the source", same, str(final))
+        check("row completed", video.download_needed == 'down' and video.partial_path is None
+              and video.partial_bytes is None, f"{video.download_needed}, partial {video.partial_path}")
+        server.shutdown()
+        metrics.recorder.stop()  # Before the DB goes away with tmp
+
+        print("OK" if all(checks) else "FAILED")
+        if not all(checks):
+            raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
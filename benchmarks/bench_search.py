@@ -0,0 +1,98 @@
+"""Search / sort / keyset pagination latency on a large synthetic library.
+
+Builds a throwaway DB (default 100k rows, ~10% active) and times the queries
+behind the queue view's search box and sortable columns.
+
+Usage: python -m benchmarks.bench_search [--rows 100000]
+"""
+import argparse
+import datetime
+import random
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from app.db import video as db
+from app.utils import metrics
+
+WORDS = ("python tutorial review live music lofi chess speedrun cooking travel news "
+         "science history guitar piano drums podcast interview trailer gameplay vlog").split()
+PAGE = 100
+STATUSES = ['open', 'down', 'error', 'new'] + ['closed', 'archive'] * 18
+
+def populate(rows: int, seed: int = 7):
+    rng = random.Random(seed)
+    base = datetime.datetime(2020, 1, 1)
+    conn = db.get_db_connection()
+    batch = []
+    for i in range(rows):
+        dt = base + datetime.timedelta(minutes=i)
+        secs = rng.randint(30, 4 * 3600)
+        batch.append((
+            f"https://www.youtube.com/watch?v=v{i:010d}", f"v{i:010d}",
+            " ".join(rng.choice(WORDS) for _ in range(6)), f"Channel {rng.randint(1, 2000)}",
+            f"PT{secs // 3600}H{secs % 3600 // 60}M{secs % 60}S", secs,
+            rng.choice(STATUSES), dt, dt, dt - datetime.timedelta(days=rng.randint(0, 900)),
+        ))
+    conn.executemany('''
+        INSERT INTO videos (url, video_id, title, channel, duration, duration_secs, status,
+                            create_dt, modified_dt, published_dt)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', batch)
+    conn.commit()
+    conn.execute('ANALYZE')
+    conn.close()
+
+def timed(label: str, fn, repeat: int = 20):
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<48} {elapsed * 1000:8.2f} ms  ({len(result)} rows)")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Queue search benchmark")
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = Path(tmp) / "bench.db"
+        db.init_db()
+        start = time.perf_counter()
+        populate(args.rows)
+        print(f"populated {args.rows} rows in {time.perf_counter() - start:.1f}s (fts5: {db.fts_enabled})")
+
+        for sort in db.SORT_KEYS:
+            page = timed(f"first page sorted by {sort}", lambda: db.search_videos(sort=sort, limit=PAGE))
+            # Walk up to 20 pages deep with keysets, then time page 21; a small
+            # library runs out of pages first
+            pages = 1
+            while pages < 20 and len(page) == PAGE:
+                last = page[-1]
+                page = db.search_videos(sort=sort, after=(last.sort_key, last.id), limit=PAGE)
+                pages += 1
+            if len(page) < PAGE:
+                print(f"{'':<48} (sorted by {sort}: last page is {pages}, {len(page)} rows)")
+                continue
+            last = page[-1]
+            timed(f"page {pages + 1} sorted by {sort} (keyset)",
+                  lambda: db.search_videos(sort=sort, after=(last.sort_key, last.id), limit=PAGE))
+
+        timed("search 'chess'", lambda: db.search_videos("chess"))
+        timed("search 'pia gui' (prefix, two terms)", lambda: db.search_videos("pia gui"))
+        timed("search 'Channel 42' sorted by duration", lambda: db.search_videos("Channel 42", sort='duration'))
+        timed("full active load (get_videos_by_status)", db.get_videos_by_status, repeat=3)
+
+        conn = sqlite3.connect(db.DB_PATH)
+        plan = conn.execute(
+            f"EXPLAIN QUERY PLAN SELECT * FROM videos WHERE {db._active_filter()} "
+            f"ORDER BY {db._sort_expr('channel')} DESC, id DESC LIMIT 100"
+        ).fetchall()
+        print("plan (channel sort):", "; ".join(row[3] for row in plan))
+        conn.close()
+        metrics.recorder.stop()  # Before the DB goes away with tmp
+
+if __name__ == "__main__":
+    main()
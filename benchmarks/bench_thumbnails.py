@@ -0,0 +1,103 @@
+"""Thumbnail cache benchmark, fully offline.
+
+Serves locally generated JPEGs from a stub HTTP server and measures the three
+paths of ThumbnailCache: cold fetch+resize on the pool, warm decode from the
+disk tier, and memory-tier hits (the last one needs a display for Tk).
+
+Usage: python -m benchmarks.bench_thumbnails [--count 500]
+"""
+import argparse
+import http.server
+import io
+import tempfile
+import threading
+import time
+from concurrent.futures import wait
+from PIL import Image
+from app.ui.thumbnails import ThumbnailCache
+
+def make_jpeg(seed: int) -> bytes:
+    """A 320x180 gradient JPEG, the size of a YouTube mqdefault thumbnail."""
+    image = Image.linear_gradient("L").resize((320, 180)).convert("RGB")
+    image = Image.merge("RGB", [band.point(lambda v, s=seed + i: (v + s * 37) % 256) for i, band in enumerate(image.split())])
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+def start_stub_server(images: dict) -> http.server.ThreadingHTTPServer:
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            # /vi/<video_id>/mqdefault.jpg
+            parts = self.path.strip("/").split("/")
+            body = images.get(parts[1]) if len(parts) == 3 else None
+            if body is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Thumbnail cache benchmark")
+    parser.add_argument('--count', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    video_ids = [f"vid{i:08d}" for i in range(args.count)]
+    images = {video_id: make_jpeg(i) for i, video_id in enumerate(video_ids)}
+    server = start_stub_server(images)
+    url = f"http://127.0.0.1:{server.server_address[1]}/vi/{{video_id}}/mqdefault.jpg"
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ThumbnailCache(cache_dir=cache_dir, url_template=url, workers=args.workers)
+
+        start = time.perf_counter()
+        wait([cache.request(video_id) for video_id in video_ids])
+        cold = time.perf_counter() - start
+        print(f"cold fetch+resize ({args.workers} workers): {cold * 1000:.0f} ms total, "
+              f"{args.count / cold:.0f} thumbs/s")
+
+        start = time.perf_counter()
+        for video_id in video_ids:
+            cache.load(video_id)
+        warm = time.perf_counter() - start
+        print(f"disk tier decode: {warm / args.count * 1e6:.0f} us per thumbnail")
+
+        start = time.perf_counter()
+        for video_id in video_ids:
+            with Image.open(io.BytesIO(images[video_id])) as image:
+                image.thumbnail(cache.size)
+        naive = time.perf_counter() - start
+        print(f"naive decode+resize of full JPEG (no network): {naive / args.count * 1e6:.0f} us per row")
+
+        try:
+            import tkinter as tk
+            root = tk.Tk()
+        except Exception as e:
+            print(f"memory tier: skipped ({e})")
+        else:
+            visible = video_ids[:cache.memory_items]
+            for video_id in visible:
+                cache.photo(video_id)
+            start = time.perf_counter()
+            for _ in range(100):
+                for video_id in visible:
+                    cache.photo(video_id)
+            hits = time.perf_counter() - start
+            print(f"memory tier hit: {hits / (100 * len(visible)) * 1e9:.0f} ns per thumbnail")
+            root.destroy()
+
+        cache.close()
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
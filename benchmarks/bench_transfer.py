@@ -0,0 +1,113 @@
+"""Library export/import: throughput, peak memory, and a lossless round trip.
+
+Builds a throwaway DB (default 1M rows as in bench_search, with the old closed and
+archived ones moved to history), then for each of JSON Lines and CSV, plain and
+gzipped, runs the CLI `export` and `import` commands as child processes, each
+into a fresh DB. Peak RSS is the child's own, so it shows whether memory stays
+flat as the library grows. Each import must write every row and re-export
+exactly what was exported, ids and modified_dt (stamped by the import) aside,
+also after importing the same file a second time.
+
+Usage: python -m benchmarks.bench_transfer [--rows 1000000] [--formats jsonl jsonl.gz csv csv.gz]
+"""
+import argparse
+import gzip
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from app.db import video as db
+from app.utils import metrics
+from benchmarks.bench_search import populate
+
+def run_cli(db_path: Path, *args: str):
+    """Runs a CLI command on db_path in a child process; returns (seconds, peak RSS in MiB)."""
+    env = dict(os.environ, DB_PATH=str(db_path), METRICS_ENABLED="no")
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-m", "benchmarks.bench_transfer", "--cli", *args],
+                            stdout=subprocess.PIPE, text=True, env=env)
+    elapsed = time.perf_counter() - start
+    if result.returncode:
+        raise SystemExit(f"{' '.join(args)} exited with {result.returncode}")
+    return elapsed, int(result.stdout.split()[-1]) / 1024
+
+def cli_child(args: list):
+    """Body of the child: the CLI command, then its peak RSS in KiB as the last word.
+    VmHWM belongs to the process image, unlike ru_maxrss, which a child inherits
+    from the (much bigger) benchmark process."""
+    from app.cli import main as cli
+
+    sys.argv = ["cli", *args]
+    cli.main()
+    with open("/proc/self/status") as status:
+        peak = next(line.split()[1] for line in status if line.startswith("VmHWM:"))
+    print(peak)
+
+def lines_without_id(path: Path):
+    with gzip.open(path, 'rt') if path.suffix == '.gz' else open(path) as stream:
+        for line in stream:
+            row = json.loads(line)
+            del row['id'], row['modified_dt']
+            yield row
+
+def main():
+    parser = argparse.ArgumentParser(description="Library export/import benchmark")
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--formats', nargs='+', default=['jsonl', 'jsonl.gz', 'csv', 'csv.gz'])
+    parser.add_argument('--cli', nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cli:
+        cli_child(args.cli)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        db.DB_PATH = tmp / "source.db"
+        db.init_db()
+        start = time.perf_counter()
+        populate(args.rows)
+        moved = db.compact_videos(30)
+        print(f"{args.rows} rows, {moved} in history, built in {time.perf_counter() - start:.1f}s\n")
+
+        reference = tmp / "reference.jsonl"
+        run_cli(db.DB_PATH, "export", str(reference))
+
+        ok = True
+        print(f"{'format':<10} {'MiB':>7} {'export s':>9} {'rows/s':>9} {'RSS MiB':>8} "
+              f"{'import s':>9} {'rows/s':>9} {'RSS MiB':>8} {'again s':>8}  round trip")
+        for fmt in args.formats:
+            backup = tmp / f"backup.{fmt}"
+            export_sec, export_rss = run_cli(db.DB_PATH, "export", str(backup))
+
+            target = tmp / f"import-{fmt}.db"
+            import_sec, import_rss = run_cli(target, "import", str(backup))
+            again_sec, _ = run_cli(target, "import", str(backup))
+
+            db.DB_PATH = target
+            written = db.count_videos_by_status()
+            roundtrip = tmp / f"roundtrip-{fmt}.jsonl"
+            run_cli(target, "export", str(roundtrip))
+            same = sum(written.values()) == args.rows and all(
+                a == b for a, b in zip(lines_without_id(reference), lines_without_id(roundtrip))
+            )
+            ok &= same
+            db.DB_PATH = tmp / "source.db"
+
+            print(f"{fmt:<10} {backup.stat().st_size / 1024 ** 2:>7.1f} {export_sec:>9.1f} "
+                  f"{args.rows / export_sec:>9.0f} {export_rss:>8.1f} {import_sec:>9.1f} "
+                  f"{args.rows / import_sec:>9.0f} {import_rss:>8.1f} {again_sec:>8.1f}  "
+                  f"{'same' if same else 'DIFFERENT'}")
+            for path in (backup, target, roundtrip):
+                path.unlink()
+
+        metrics.recorder.stop()  # Before the DB goes away with tmp
+        print("OK" if ok else "FAILED")
+        if not ok:
+            raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Throughput of YouTube video ID extraction over large text blobs.
+
+Usage: python -m benchmarks.bench_urls [--mb 8]
+"""
+import argparse
+import random
+import string
+import time
+from app.core import urls
+
+URL_SHAPES = [
+    "https://www.youtube.com/watch?v={id}",
+    "https://youtube.com/watch?feature=share&v={id}&t=42",
+    "https://m.youtube.com/watch?v={id}",
+    "https://music.youtube.com/watch?v={id}&list=RDAMVM",
+    "https://youtu.be/{id}?si=abc",
+    "https://www.youtube.com/shorts/{id}",
+    "https://www.youtube.com/embed/{id}",
+    "https://www.youtube.com/live/{id}",
+    "youtube.com/watch?v={id}",
+]
+ID_CHARS = string.ascii_letters + string.digits + "-_"
+
+def make_blob(size_bytes: int, link_every: int = 40, seed: int = 1) -> tuple:
+    """Builds filler text with a link every `link_every` words. Returns (text, expected_ids)."""
+    rng = random.Random(seed)
+    words = ["lorem", "ipsum", "https://example.com/watch?v=nope", "youtube", "video", "clip,", "see:"]
+    parts, expected, size, n = [], [], 0, 0
+    while size < size_bytes:
+        n += 1
+        if n % link_every == 0:
+            video_id = "".join(rng.choice(ID_CHARS) for _ in range(11))
+            word = rng.choice(URL_SHAPES).format(id=video_id)
+            expected.append(video_id)
+        else:
+            word = rng.choice(words)
+        parts.append(word)
+        size += len(word) + 1
+    return " ".join(parts), list(dict.fromkeys(expected))
+
+def main():
+    parser = argparse.ArgumentParser(description="Video ID extraction throughput")
+    parser.add_argument('--mb', type=float, default=8.0, help="Blob size in MiB")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    text, expected = make_blob(int(args.mb * 1024 * 1024))
+    assert urls.extract_video_ids(text) == expected, "extraction mismatch"
+
+    best = float('inf')
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        ids = urls.extract_video_ids(text)
+        best = min(best, time.perf_counter() - start)
+
+    mib = len(text) / (1024 * 1024)
+    print(f"blob: {mib:.1f} MiB, {len(ids)} ids")
+    print(f"best of {args.repeat}: {best * 1000:.1f} ms  ({mib / best:.1f} MiB/s, {len(ids) / best:,.0f} ids/s)")
+
+    # A typical "40 links in one paste" clipboard
+    paste, _ = make_blob(40 * 60, link_every=1)
+    start = time.perf_counter()
+    for _ in range(10000):
+        urls.extract_video_ids(paste)
+    per_call = (time.perf_counter() - start) / 10000
+    print(f"40-link paste: {per_call * 1e6:.1f} us per extraction")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Refresh time and widget count of the video list at 100 / 1,000 / 10,000 rows.
+
+Compares the Treeview used by MainWindow with the old per-row widget grid
+(five labels, a frame and four buttons per row). Needs a display; on a
+headless box run it under Xvfb:
+
+    xvfb-run python -m benchmarks.bench_video_list
+"""
+import argparse
+import time
+import tkinter as tk
+from tkinter import ttk
+
+COLUMNS = ("video_id", "status", "title", "channel")
+
+def make_videos(count: int) -> list:
+    return [
+        {
+            'id': i,
+            'video_id': f"vid{i:08d}",
+            'status': ('open', 'down', 'error')[i % 3],
+            'error_msg': "boom" if i % 3 == 2 else None,
+            'title': f"Synthetic video title number {i} with a reasonably long name",
+            'channel': f"Channel {i % 97}",
+        }
+        for i in range(count)
+    ]
+
+def count_widgets(widget) -> int:
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+def legacy_refresh(frame: ttk.Frame, videos: list):
+    """The pre-Treeview refresh_table: destroy everything, rebuild ~10 widgets per row."""
+    for widget in frame.winfo_children():
+        widget.destroy()
+    for row, video in enumerate(videos):
+        ttk.Label(frame, text=str(video['video_id'])).grid(row=row, column=0, sticky="w")
+        ttk.Label(frame, text=video['status']).grid(row=row, column=1, sticky="w")
+        ttk.Label(frame, text=video['title']).grid(row=row, column=2, sticky="w")
+        ttk.Label(frame, text=video['channel']).grid(row=row, column=3, sticky="w")
+        actions = ttk.Frame(frame)
+        actions.grid(row=row, column=4, sticky="w")
+        for text in ("Play", "Del", "Archive", "Web"):
+            ttk.Button(actions, text=text).pack(side="left")
+
+def tree_refresh(tree: ttk.Treeview, videos: list):
+    """Same work MainWindow.refresh_table does on a full refresh."""
+    tree.delete(*tree.get_children())
+    for video in videos:
+        status = video['status'] + (" (!)" if video['error_msg'] else "")
+        tree.insert("", "end", iid=str(video['id']),
+                    values=(video['video_id'], status, video['title'], video['channel']))
+
+def timed(root: tk.Tk, fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    root.update()  # include layout/paint, not just widget creation
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Video list refresh benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--legacy-max', type=int, default=2000,
+                        help="Skip the legacy grid above this many rows (it takes minutes)")
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    root.geometry("1100x600")
+
+    print(f"{'rows':>7} | {'view':<8} | {'refresh ms':>10} | {'widgets':>8}")
+    for size in args.sizes:
+        videos = make_videos(size)
+
+        tree = ttk.Treeview(root, columns=COLUMNS, show="headings")
+        tree.pack(fill="both", expand=True)
+        elapsed = timed(root, tree_refresh, tree, videos)
+        print(f"{size:>7} | {'treeview':<8} | {elapsed * 1000:>10.1f} | {count_widgets(root):>8}")
+        tree.destroy()
+
+        if size <= args.legacy_max:
+            frame = ttk.Frame(root)
+            frame.pack(fill="both", expand=True)
+            elapsed = timed(root, legacy_refresh, frame, videos)
+            print(f"{size:>7} | {'grid':<8} | {elapsed * 1000:>10.1f} | {count_widgets(root):>8}")
+            frame.destroy()
+
+    root.destroy()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Stand-in for the yt-dlp executable, for offline benchmarks.
+
+Understands the subset of the command line YTDLPManager uses:
+
+  --print filename URL   prints HOME/<id>.mp4 and exits
+  --paths home:DIR       download directory
+  --output PATH          the file to write instead (a literal path, not a template)
+  --progress-template T  progress lines, rendered from the template's progress fields
+  --exec CMD             run through the shell once the file is written, {} -> file path
+
+and writes FAKE_YTDLP_BYTES bytes at FAKE_YTDLP_RATE bytes/s, failing a
+FAKE_YTDLP_FAIL share of downloads with exit code 1. With FAKE_YTDLP_SOURCE set
+to a base URL, the bytes are fetched from SOURCE/<id> instead. Like yt-dlp it
+writes to FILE.part first and continues an existing one, asking the source for
+the rest with a Range request. Standalone on purpose:
+it only needs the standard library, so starting it costs no more than yt-dlp's
+own interpreter start would.
+
+Usage: python benchmarks/fake_ytdlp.py [yt-dlp options] URL
+"""
+import os
+import random
+import re
+import shlex
+import subprocess
+import sys
+import time
+import urllib.request
+
+CHUNK = 256 * 1024
+FIELD = re.compile(r"%\(([^)]+)\)s")
+
+def video_id_from(url: str) -> str:
+    match = re.search(r"(?:v=|youtu\.be/|shorts/)([\w-]{6,})", url)
+    return match.group(1) if match else re.sub(r"\W", "_", url)[-20:]
+
+def render(template: str, fields: dict) -> str:
+    # "a,b" in a field means the first of a and b that is known, as in yt-dlp
+    def value(match):
+        for name in match.group(1).split(","):
+            if fields.get(name) is not None:
+                return str(fields[name])
+        return "NA"
+    return FIELD.sub(value, template.split(":", 1)[1] if template.startswith("download:") else template)
+
+def parse(argv: list) -> dict:
+    options = {"home": ".", "output": None, "print": None, "exec": None, "template": None, "url": None}
+    args = iter(argv)
+    for arg in args:
+        if arg == "--paths":
+            value = next(args)
+            if value.startswith("home:"):
+                options["home"] = value[5:]
+        elif arg in ("--output", "-o"):
+            options["output"] = next(args).replace("%%", "%")
+        elif arg == "--print":
+            options["print"] = next(args)
+        elif arg == "--exec":
+            options["exec"] = next(args)
+        elif arg == "--progress-template":
+            options["template"] = next(args)
+        elif arg in ("--config-location", "--playlist-end"):
+            next(args)
+        elif not arg.startswith("-"):
+            options["url"] = arg
+    return options
+
+def zeros(size: int, offset: int):
+    chunk = b"\0" * CHUNK
+    while offset < size:
+        n = min(CHUNK, size - offset)
+        yield chunk[:n]
+        offset += n
+
+def fetch(url: str, offset: int):
+    """(total size, chunks from offset on), or from 0 if the server ignores the Range."""
+    response = urllib.request.urlopen(urllib.request.Request(url, headers={"Range": f"bytes={offset}-"}))
+    if response.status == 206:
+        total = int(response.headers["Content-Range"].rsplit("/", 1)[1])
+    else:
+        offset, total = 0, int(response.headers["Content-Length"])
+
+    def chunks():
+        with response:
+            while True:
+                data = response.read(CHUNK)
+                if not data:
+                    return
+                yield data
+    return total, offset, chunks()
+
+def download(path: str, size: int, rate: float, template: str, source: str = None):
+    part = path + ".part"
+    written = os.path.getsize(part) if os.path.exists(part) else 0
+    if source:
+        size, written, chunks = fetch(source, written)
+    else:
+        written = min(written, size)
+        chunks = zeros(size, written)
+    resumed = written
+    start = time.perf_counter()
+    with open(part, "r+b" if written else "wb") as f:
+        f.truncate(written)
+        f.seek(written)
+        for data in chunks:
+            f.write(data)
+            written += len(data)
+            elapsed = time.perf_counter() - start
+            # Hold the configured rate
+            if rate and (written - resumed) / rate > elapsed:
+                time.sleep((written - resumed) / rate - elapsed)
+                elapsed = (written - resumed) / rate
+            if template:
+                speed = (written - resumed) / elapsed if elapsed else None
+                eta = int((size - written) / speed) if speed else None
+                print(render(template, {
+                    "progress.downloaded_bytes": written, "progress.total_bytes": size,
+                    "progress.speed": speed, "progress.eta": eta,
+                }), flush=True)
+    os.replace(path + ".part", path)
+
+def main(argv: list) -> int:
+    options = parse(argv)
+    if not options["url"]:
+        print("ERROR: no URL given", file=sys.stderr)
+        return 2
+    path = options["output"] or os.path.join(options["home"], video_id_from(options["url"]) + ".mp4")
+
+    if options["print"] == "filename":
+        print(path)
+        return 0
+
+    if random.random() < float(os.getenv("FAKE_YTDLP_FAIL", "0")):
+        print(f"ERROR: [youtube] {video_id_from(options['url'])}: simulated failure", flush=True)
+        return 1
+
+    source = os.getenv("FAKE_YTDLP_SOURCE")
+    download(path, int(os.getenv("FAKE_YTDLP_BYTES", str(2 * 1024 * 1024))),
+             float(os.getenv("FAKE_YTDLP_RATE", str(20 * 1024 * 1024))), options["template"],
+             f"{source}/{video_id_from(options['url'])}" if source else None)
+
+    if options["exec"]:
+        command = options["exec"].replace("{}", shlex.quote(path))
+        if subprocess.run(command, shell=True).returncode != 0:
+            print("ERROR: Command returned error", flush=True)
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,11 +1,21 @@
-from app.core.app import YTManagerApp
-from app.ui.video_queue import MainWindow
+import argparse
+from app.settings import PROFILE
+from app.utils.profiling import profiler
 
 def main():
-    app = YTManagerApp()
-    root = MainWindow(app)
+    parser = argparse.ArgumentParser(description="YT Manager")
+    parser.add_argument('--profile', metavar='TARGETS', default=PROFILE,
+                        help="Profile startup,refresh,memory,sample or all (default: $PROFILE)")
+    args = parser.parse_args()
+
+    # The app is imported after profiling starts, so a startup profile includes imports
+    profiler.start(args.profile)
+    with profiler.profiled("startup"):
+        from app.core.app import YTManagerApp
+        from app.ui.video_queue import MainWindow
+        app = YTManagerApp()
+        root = MainWindow(app)
     root.mainloop()
 
 if __name__ == "__main__":
     main()
-